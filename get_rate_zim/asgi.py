@@ -3,6 +3,15 @@ ASGI config for get_rate_zim project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server to get the task progress stream
+(/rate_predictor/api/task-progress/stream/), e.g.::
+
+    uvicorn get_rate_zim.asgi:application
+
+Every connection in a server process shares that process's progress
+broadcaster, which is closed on lifespan shutdown so the open streams end and
+the server can exit.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -13,4 +22,22 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'get_rate_zim.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def application(scope, receive, send):
+    if scope['type'] != 'lifespan':
+        await django_application(scope, receive, send)
+        return
+
+    # Django does not handle lifespan events itself
+    from rate_predictor.progress import broadcaster
+
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await broadcaster.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
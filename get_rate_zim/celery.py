@@ -2,7 +2,7 @@ import os
 import logging
 from celery import Celery
 from celery.utils.log import get_task_logger
-from celery.signals import setup_logging
+from celery.signals import setup_logging, worker_process_init
 
 # Configure root logger
 logging.basicConfig(
@@ -28,6 +28,12 @@ app.autodiscover_tasks()
 def configure_logging(sender=None, **kwargs):
     pass  # Let Django handle the logging configuration
 
+# Load the active model once per worker process, before the first task
+@worker_process_init.connect
+def warm_up_model(sender=None, **kwargs):
+    from rate_predictor.prediction.registry import warm_up
+    warm_up()
+
 @app.task(bind=True)
 def debug_task(self):
     """Task to help debug celery configuration"""
@@ -37,5 +43,8 @@ def debug_task(self):
 @app.on_after_configure.connect
 def setup_periodic_tasks(sender, **kwargs):
     """Set up periodic tasks if needed"""
+    from django.conf import settings
     logger.info("Setting up periodic tasks for Celery")
-    # Add periodic tasks here if needed
\ No newline at end of file
+    # The task skips itself while another refresh runs or one completed within the interval
+    interval = getattr(settings, 'REFRESH', {}).get('INTERVAL', 60 * 60)
+    sender.add_periodic_task(interval, sender.signature('rate_predictor.tasks.update_model_periodic'), name='refresh model')
\ No newline at end of file
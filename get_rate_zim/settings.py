@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'rate_predictor.ratelimit.RateLimitMiddleware',  # Early, so refused requests cost little
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -151,6 +152,30 @@ CACHES = {
     }
 }
 
+# Cached API responses, pages and fragments are keyed by data version, so these only bound memory use
+API_RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Cursor pagination and NDJSON export for /api/rates/ and /api/posts/
+API_PAGINATION = {
+    'DEFAULT_LIMIT': 100,
+    'MAX_LIMIT': 1000,
+    'EXPORT_CHUNK_SIZE': 2000,  # Rows fetched per round trip while streaming an export
+}
+
+# Bulk exports (/api/export/<dataset>/ and the export_history command)
+EXPORTS = {
+    'CHUNK_SIZE': 50000,  # Rows per query; also one Parquet row group / Arrow record batch
+    'COMPRESSION': 'zstd',  # Parquet and Arrow IPC compression
+    'CACHE_MAX_BYTES': 16 * 1024 * 1024,  # Larger exports are streamed every time instead of cached
+}
+
+# Downsampled rate history for the dashboard chart (/api/chart/rates/)
+CHARTS = {
+    'DEFAULT_POINTS': 500,
+    'MAX_POINTS': 2000,  # Largest points value a client may ask for
+}
+
 # Celery Configuration
 CELERY_BROKER_URL = 'memory://'  # Use in-memory broker for development
 CELERY_BROKER_CONNECTION_RETRY = True
@@ -170,6 +195,22 @@ CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes timeout
 # Celery Beat Settings
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
+# Single-flight data refreshes (dashboard, beat, update_model, update_news_scraper)
+REFRESH = {
+    'INTERVAL': 60 * 60,  # At most one refresh per hour; also the beat schedule
+    'LOCK_TIMEOUT': CELERY_TASK_TIME_LIMIT + 5 * 60,  # A crashed run frees the lock after this
+}
+
+# Task progress pushed to the dashboard over Server-Sent Events (served by get_rate_zim.asgi)
+TASK_PROGRESS = {
+    'POLL_INTERVAL': 1,  # Seconds between checks for progress published by other processes
+    'KEEPALIVE': 15,  # Seconds of silence before a keep-alive comment is sent
+    'IDLE_RETRY': 60,  # Seconds before a WSGI dashboard reconnects when no task is active
+}
+
+# Serve latest-rate, predictions and task-progress with their async views; enable when running under ASGI
+ASYNC_API_VIEWS = config('ASYNC_API_VIEWS', default=False, cast=bool)
+
 # Login Settings
 LOGIN_REDIRECT_URL = 'rate_predictor:dashboard'
 LOGOUT_REDIRECT_URL = 'rate_predictor:home'
@@ -202,10 +243,36 @@ if not DEBUG:
     }
 
 # Rate Scraping Settings
+# A {date} placeholder in a URL makes the ingester request one page per missing date
 RATE_SOURCES = {
-    'rbz': 'https://www.rbz.co.zw/index.php/research/markets/exchange-rates',
-    'interbank': 'https://www.bankers.org.zw/market-rates',
-    'parallel': None  # Will require manual input or alternative sources
+    'rbz': config('RBZ_RATES_URL', default='https://www.rbz.co.zw/index.php/research/markets/exchange-rates'),
+    'interbank': config('INTERBANK_RATES_URL', default='https://www.bankers.org.zw/market-rates'),
+    'parallel': None  # Estimated from rate quotes in posts (see PARALLEL_RATE_ESTIMATION)
+}
+
+# Official rate ingestion from RATE_SOURCES
+RATE_INGESTION = {
+    'SOURCES': ['rbz', 'interbank'],  # Tried in order; later sources only fill remaining gaps
+    'CURRENCY': 'USD',  # Row picked from per-currency tables
+    'RATE_COLUMN': r'mid|average|rate',  # First matching table column holds the rate
+    'DATE_FORMAT': '%Y-%m-%d',  # Format of {date} in source URLs
+    'BACKFILL_DAYS': 30,  # Days checked for missing rates on each run
+    'SKIP_WEEKENDS': True,
+}
+
+# Backfills from downloaded RBZ sheets (`manage.py import_rate_sheets`)
+RATE_SHEETS = {
+    'CACHE_PATH': config('RATE_SHEET_CACHE_PATH', default=os.path.join(BASE_DIR, 'rate_sheet_cache')),
+    'WORKERS': None,  # Defaults to the CPU count
+}
+
+# Parallel rate estimation from quotes like "1 USD = 350 ZWL" in posts
+PARALLEL_RATE_ESTIMATION = {
+    'MIN_RATE': 1.0,  # Quotes at or below this are ignored
+    'MAX_RATE': 10000000.0,  # Quotes at or above this are ignored
+    'ESTIMATOR': config('PARALLEL_RATE_ESTIMATOR', default='median'),  # 'median' or 'trimmed_mean'
+    'TRIM_FRACTION': 0.1,  # Fraction cut from each tail for 'trimmed_mean'
+    'MIN_OBSERVATIONS': 2,  # Quotes needed before a day gets an estimate
 }
 SCRAPER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
 SCRAPER_TIMEOUT = 30  # seconds
@@ -223,6 +290,14 @@ SCRAPING = {
     'ASYNC_SCRAPING': config('ASYNC_SCRAPING', default=False, cast=bool),
 }
 
+# NLP Configuration (spaCy is only loaded by workers that process posts)
+NLP = {
+    'ENABLED': config('NLP_ENABLED', default=False, cast=bool),
+    'SPACY_MODEL': config('SPACY_MODEL', default='en_core_web_sm'),
+    'BATCH_SIZE': config('NLP_BATCH_SIZE', default=64, cast=int),
+    'N_PROCESS': config('NLP_N_PROCESS', default=1, cast=int),
+}
+
 # Twitter API credentials
 TWITTER_API_KEY = config('TWITTER_API_KEY', default='')
 TWITTER_API_SECRET = config('TWITTER_API_SECRET', default='')
@@ -232,12 +307,15 @@ TWITTER_ACCESS_SECRET = config('TWITTER_ACCESS_SECRET', default='')
 # Proxy configuration (if needed)
 PROXY_LIST = config('PROXY_LIST', default='', cast=Csv())
 
-# Rate limiting settings for API
+# Rate limiting settings for API (per client IP, enforced by rate_predictor.ratelimit; 'none' disables a budget)
 API_RATE_LIMIT = {
     'DEFAULT': config('API_RATE_DEFAULT', default='100/hour'),
     'LATEST_RATE': config('API_RATE_LATEST', default='1000/day'),
     'PREDICTIONS': config('API_RATE_PREDICTIONS', default='2000/day'),
 }
+# request.META key holding the client address when behind a proxy, e.g. HTTP_X_REAL_IP; for a list like
+# HTTP_X_FORWARDED_FOR the last address (the one the proxy saw) is used
+API_RATE_LIMIT_IP_HEADER = config('API_RATE_LIMIT_IP_HEADER', default='')
 
 # Rate Alert Settings
 RATE_CHANGE_ALERT_THRESHOLD = 0.05  # 5% change triggers alert
@@ -254,7 +332,79 @@ PREDICTION_WINDOW = 7  # Days ahead to predict
 HISTORICAL_WINDOW = 60  # Days of historical data to use
 ML_MODEL_TYPE = 'arima'  # Statistical model type
 MODEL_RETRAINING_FREQUENCY = 7  # Days between model retraining
-PREDICTION_CONFIDENCE_THRESHOLD = 0.85
+PREDICTION_CONFIDENCE_THRESHOLD = 0.85  # Coverage of the prediction interval reported with each forecast
+
+# Forecasting model settings (ARIMAX on log rates with daily sentiment)
+FORECASTING = {
+    'AR_ORDER': 3,  # Lags of the differenced log rate
+    'DIFFERENCE': 1,  # Order of differencing
+    'MA_ORDER': 1,  # Lagged residual terms
+    'SENTIMENT_LAGS': 2,  # Lags of daily mean sentiment
+    'RIDGE': 1e-4,
+    'MIN_TRAINING_SAMPLES': 20,
+    'CONFIDENCE_SCALE': 10.0,  # confidence = exp(-scale * residual std)
+    'FORGETTING_FACTOR': 1.0 - 1.0 / HISTORICAL_WINDOW,  # Online update memory
+    # Candidates searched by `manage.py tune_model`
+    'TUNING_GRID': {
+        'AR_ORDER': [1, 2, 3, 5],
+        'DIFFERENCE': [0, 1],
+        'MA_ORDER': [0, 1, 2],
+        'SENTIMENT_LAGS': [0, 1, 2],
+    },
+}
+
+# Bootstrapped prediction intervals
+PREDICTION_INTERVALS = {
+    'N_PATHS': 5000,  # Simulated paths per forecast
+    'QUANTILES': [0.05, 0.25, 0.5, 0.75, 0.95],  # Stored per prediction, plus the interval bounds
+    'SEED': None,
+}
+
+# Prediction accuracy reports
+BACKTEST = {
+    'CALIBRATION_TOLERANCE': 0.02,  # A prediction within 2% of the realized rate counts as a hit
+    'CALIBRATION_BINS': 5,
+    'CACHE_TIMEOUT': 60 * 60,
+}
+
+# Posts recorded as influencing each prediction
+ATTRIBUTION = {
+    'TOP_K': 10,
+    'WINDOW_DAYS': 7,  # Posts published in the days up to the last observed rate
+    'SENTIMENT_WEIGHT': 1.0,  # weight = impact * (1 + SENTIMENT_WEIGHT * |sentiment|) * recency
+    'HALF_LIFE_DAYS': 3.0,
+}
+
+# Latest prediction per target date, served by the prediction API and home page
+CURRENT_FORECAST = {
+    'MAX_DAYS': 30,  # Hard cap on the `days` parameter of /api/predictions/
+    'CACHE_TIMEOUT': 60 * 60 * 24,
+}
+
+# Dashboard numbers, precomputed when rates, predictions or posts change
+DASHBOARD_SNAPSHOT = {
+    'HISTORY_DAYS': 90,  # Rates shown in the history chart
+    'TREND_DAYS': 30,
+    'PREDICTION_DAYS': 30,
+    'SENTIMENT_DAYS': 7,
+    'ANNOUNCEMENT_IMPACT': 0.7,  # Posts at or above this impact count as announcements
+    'CACHE_TIMEOUT': 60 * 60 * 24,
+}
+
+# Versioned model artifacts
+MODEL_REGISTRY = {
+    'PATH': config('MODEL_REGISTRY_PATH', default=os.path.join(BASE_DIR, 'model_registry')),
+    'AUTO_PROMOTE': config('MODEL_AUTO_PROMOTE', default=True, cast=bool),  # Promote new refits automatically
+    'KEEP_VERSIONS': 20,
+    'MMAP_MIN_BYTES': 64 * 1024,  # Arrays at least this large are memory-mapped
+}
+
+# Daily feature matrix shared by training, backtesting and the dashboard
+FEATURE_STORE = {
+    'PATH': config('FEATURE_STORE_PATH', default=os.path.join(BASE_DIR, 'feature_store')),
+    'RATE_LAGS': 3,  # Lagged rate columns per series
+    'REFRESH_DAYS': 7,  # Trailing days recomputed on each update (late posts)
+}
 
 # Logging
 LOGGING = {
@@ -4,7 +4,9 @@ from .models import (
     NewsSource,
     Post,
     ExchangeRate,
+    RateObservation,
     RatePrediction,
+    PredictionInfluence,
     UserAlert
 )
 
@@ -37,12 +39,26 @@ class ExchangeRateAdmin(admin.ModelAdmin):
     date_hierarchy = 'date'
 
 
+@admin.register(RateObservation)
+class RateObservationAdmin(admin.ModelAdmin):
+    list_display = ('observed_on', 'rate', 'matched_text', 'post')
+    list_filter = ('observed_on',)
+    date_hierarchy = 'observed_on'
+    raw_id_fields = ('post',)
+
+
+class PredictionInfluenceInline(admin.TabularInline):
+    model = PredictionInfluence
+    raw_id_fields = ('post',)
+    extra = 0
+
+
 @admin.register(RatePrediction)
 class RatePredictionAdmin(admin.ModelAdmin):
-    list_display = ('prediction_date', 'target_date', 'predicted_official_rate', 'confidence_score')
-    list_filter = ('prediction_date', 'target_date')
+    list_display = ('prediction_date', 'target_date', 'predicted_official_rate', 'confidence_score', 'model_version')
+    list_filter = ('prediction_date', 'target_date', 'model_version')
     date_hierarchy = 'target_date'
-    filter_horizontal = ('influencing_posts',)
+    inlines = [PredictionInfluenceInline]
 
 
 @admin.register(UserAlert)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class RatePredictorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'rate_predictor'
+
+    def ready(self):
+        # Connect the data version signal handlers
+        from rate_predictor import signals  # noqa: F401
@@ -0,0 +1,206 @@
+"""
+API server benchmarks for ZimRate Predictor
+
+This module load-tests the polled JSON endpoints (latest rate, predictions
+and task progress) under the two ways the project can be deployed: gunicorn
+serving the WSGI application with the sync views, and uvicorn serving the
+ASGI application with the async views (ASYNC_API_VIEWS). Each server runs in
+a subprocess against the current settings and database, and an aiohttp
+client keeps a fixed number of requests in flight for a set time, recording
+requests/sec and p50/p99 latency.
+
+The client shares the machine with the server, so compare runs made on the
+same host only.
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import platform
+import datetime
+import subprocess
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import aiohttp
+import numpy as np
+from django.conf import settings
+
+ENDPOINTS = {
+    'latest_rate': '/rate_predictor/api/latest-rate/',
+    'predictions': '/rate_predictor/api/predictions/?days=7',
+    'task_progress': '/rate_predictor/api/task-progress/',
+}
+
+SERVERS = ('wsgi', 'asgi')
+
+
+def server_command(kind: str, port: int, workers: int, threads: int) -> List[str]:
+    """
+    Command line that serves the project on a local port.
+
+    Args:
+        kind: 'wsgi' (gunicorn) or 'asgi' (uvicorn)
+        port: Port to bind on 127.0.0.1
+        workers: Worker processes
+        threads: Threads per gunicorn worker (uvicorn workers run one event loop)
+    """
+    if kind == 'wsgi':
+        return [
+            sys.executable, '-m', 'gunicorn', 'get_rate_zim.wsgi:application',
+            '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--threads', str(threads),
+            '--log-level', 'warning',
+        ]
+    if kind == 'asgi':
+        return [
+            sys.executable, '-m', 'uvicorn', 'get_rate_zim.asgi:application',
+            '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+            '--log-level', 'warning', '--no-access-log',
+        ]
+    raise ValueError(f"Unknown server kind: {kind}")
+
+
+def _wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not start listening on port {port}")
+
+
+@contextmanager
+def run_server(kind: str, port: int, workers: int, threads: int) -> Iterator[str]:
+    """
+    Run a server in a subprocess for the duration of the block.
+
+    The ASGI server gets ASYNC_API_VIEWS, so it serves the async views.
+    API rate limits are turned off for both.
+
+    Yields:
+        Base URL of the server
+    """
+    env = dict(
+        os.environ,
+        ASYNC_API_VIEWS='True' if kind == 'asgi' else 'False',
+        # Every request comes from one address, which would be refused after a few hundred
+        API_RATE_DEFAULT='none',
+        API_RATE_LATEST='none',
+        API_RATE_PREDICTIONS='none',
+    )
+    process = subprocess.Popen(server_command(kind, port, workers, threads), env=env, cwd=settings.BASE_DIR)
+    try:
+        _wait_for_port(port, process)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def load_test(url: str, concurrency: int, duration: float) -> Dict[str, Any]:
+    """
+    Keep a number of requests to a URL in flight for a while.
+
+    Responses with a 5xx status and failed requests count as errors and are
+    left out of the latencies.
+
+    Args:
+        url: URL to request
+        concurrency: Requests in flight at any time
+        duration: Seconds to run for
+
+    Returns:
+        Dictionary with request and error counts, requests/sec and p50/p99
+        latency in milliseconds
+    """
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30)) as session:
+        async def client():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter_ns()
+                try:
+                    async with session.get(url) as response:
+                        await response.read()
+                        failed = response.status >= 500
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    failed = True
+                if failed:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter_ns() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    timings = np.array(latencies or [0], dtype=np.int64)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(float(np.percentile(timings, 50)) / 1e6, 2),
+        'p99_ms': round(float(np.percentile(timings, 99)) / 1e6, 2),
+    }
+
+
+def run_benchmarks(
+    concurrency: int = 200,
+    duration: float = 10,
+    workers: int = 2,
+    threads: int = 4,
+    servers: Optional[List[str]] = None,
+    endpoints: Optional[List[str]] = None,
+    port: int = 8765,
+    warmup: float = 2
+) -> Dict[str, Any]:
+    """
+    Benchmark the JSON endpoints under each server.
+
+    Args:
+        concurrency: Requests in flight at any time
+        duration: Seconds each endpoint is measured for
+        workers: Worker processes per server
+        threads: Threads per gunicorn worker
+        servers: Servers to run ('wsgi', 'asgi'; defaults to both)
+        endpoints: Endpoint names from ENDPOINTS (defaults to all)
+        port: Local port the servers bind
+        warmup: Untimed seconds per endpoint, which also fill each worker's caches
+
+    Returns:
+        Dictionary with run metadata and results per server and endpoint
+    """
+    results = {}
+    for kind in servers or SERVERS:
+        results[kind] = {}
+        with run_server(kind, port, workers, threads) as base_url:
+            for name, path in ENDPOINTS.items():
+                if endpoints and name not in endpoints:
+                    continue
+                if warmup:
+                    asyncio.run(load_test(base_url + path, concurrency, warmup))
+                results[kind][name] = asyncio.run(load_test(base_url + path, concurrency, duration))
+
+    return {
+        'run_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'concurrency': concurrency,
+        'duration': duration,
+        'workers': workers,
+        'threads': threads,
+        'servers': results,
+    }
@@ -0,0 +1,160 @@
+"""
+Text path micro-benchmarks for ZimRate Predictor
+
+This module times the per-document stages of the scraping hot path
+(article extraction, date parsing, relevance, sentiment, the single-pass
+analysis kernel and rate quote extraction) over the checked-in corpus of
+Herald, NewsDay and ZimEye pages and tweets.
+"""
+
+import json
+import time
+import platform
+import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from rate_predictor.scrapers.news_scraper import extract_article_text, extract_date
+from rate_predictor.scrapers.relevance_detector import is_relevant
+from rate_predictor.scrapers.sentiment_analyzer import analyze_sentiment
+from rate_predictor.scrapers.text_analysis import analyze_post
+from rate_predictor.scrapers.rate_extractor import extract_rate_mentions
+
+CORPUS_DIR = Path(__file__).resolve().parent / 'corpus'
+
+
+def load_corpus(corpus_dir: Path = CORPUS_DIR) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Load the benchmark corpus from disk.
+
+    Args:
+        corpus_dir: Directory containing manifest.json, the pages and the tweets
+
+    Returns:
+        Dictionary with 'pages' (manifest entries plus raw HTML and extracted
+        text) and 'tweets'
+    """
+    manifest = json.loads((corpus_dir / 'manifest.json').read_text(encoding='utf-8'))
+
+    pages = []
+    for entry in manifest['pages']:
+        page = dict(entry)
+        page['html'] = (corpus_dir / entry['file']).read_text(encoding='utf-8')
+        page['content'] = extract_article_text(page['html'], page['content_selector'])
+        pages.append(page)
+
+    tweets = json.loads((corpus_dir / manifest['tweets']).read_text(encoding='utf-8'))
+    return {'pages': pages, 'tweets': tweets}
+
+
+def get_stages(corpus: Dict[str, List[Dict[str, Any]]]) -> Dict[str, tuple]:
+    """
+    Build the benchmark stages over a loaded corpus.
+
+    Returns:
+        Mapping of stage name to (function taking one document, documents)
+    """
+    pages = corpus['pages']
+    # Relevance and sentiment see both article bodies and tweets in production
+    texts = [{'title': p['title'], 'content': p['content']} for p in pages]
+    texts += [{'title': f"Tweet by {t['screen_name']}", 'content': t['text']} for t in corpus['tweets']]
+
+    return {
+        'extract_article_text': (lambda p: extract_article_text(p['html'], p['content_selector']), pages),
+        'extract_date': (lambda p: extract_date(p['date_text'], p['date_format']), pages),
+        'is_relevant': (lambda d: is_relevant(d['title'], d['content']), texts),
+        'analyze_sentiment': (lambda d: analyze_sentiment(d['content']), texts),
+        'analyze_post': (analyze_post, texts),
+        'extract_rate_mentions': (lambda d: extract_rate_mentions(d['content']), texts),
+    }
+
+
+def time_stage(func: Callable, documents: List[Any], iterations: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time a stage over every document, repeated a number of times.
+
+    Args:
+        func: Stage function taking a single document
+        documents: Documents to process
+        iterations: Passes over the documents
+        warmup: Untimed passes before measuring
+
+    Returns:
+        Dictionary with document count, docs/sec and p50/p99 latency in microseconds
+    """
+    for _ in range(warmup):
+        for document in documents:
+            func(document)
+
+    timings = np.empty(len(documents) * iterations, dtype=np.int64)
+    i = 0
+    for _ in range(iterations):
+        for document in documents:
+            start = time.perf_counter_ns()
+            func(document)
+            timings[i] = time.perf_counter_ns() - start
+            i += 1
+
+    total_seconds = timings.sum() / 1e9
+    return {
+        'docs': int(len(timings)),
+        'docs_per_sec': round(len(timings) / total_seconds, 1) if total_seconds else 0.0,
+        'p50_us': round(float(np.percentile(timings, 50)) / 1e3, 2),
+        'p99_us': round(float(np.percentile(timings, 99)) / 1e3, 2),
+    }
+
+
+def run_benchmarks(iterations: int = 50, stages: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Run the text path benchmarks.
+
+    Args:
+        iterations: Passes over the corpus per stage
+        stages: Optional list of stage names to run (defaults to all)
+
+    Returns:
+        Dictionary with run metadata and per-stage results
+    """
+    corpus = load_corpus()
+    all_stages = get_stages(corpus)
+
+    results = {}
+    for name, (func, documents) in all_stages.items():
+        if stages and name not in stages:
+            continue
+        results[name] = time_stage(func, documents, iterations)
+
+    return {
+        'run_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'iterations': iterations,
+        'stages': results,
+    }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """
+    Find stages whose median latency regressed beyond the allowed fraction.
+
+    Args:
+        results: Output of run_benchmarks
+        baseline: Earlier output of run_benchmarks
+        max_regression: Allowed slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        List of human readable regression descriptions
+    """
+    regressions = []
+    for name, stage in results['stages'].items():
+        previous = baseline.get('stages', {}).get(name)
+        if not previous or not previous.get('p50_us'):
+            continue
+        change = (stage['p50_us'] - previous['p50_us']) / previous['p50_us']
+        if change > max_regression:
+            regressions.append(
+                f"{name}: p50 {previous['p50_us']}us -> {stage['p50_us']}us (+{change * 100:.0f}%)"
+            )
+    return regressions
@@ -0,0 +1,262 @@
+"""
+Response caching for ZimRate Predictor
+
+This module keeps a data version per model in the configured cache backend
+and uses it to cache API responses. A version is the time the model's data
+last changed; it is bumped by the post_save/post_delete handlers in
+signals.py and, for bulk writes that skip those signals, by the writers
+themselves through bump_data_version(). The feature store is versioned the
+same way, as 'FeatureStore', and bumped by each update.
+
+Cached responses are keyed by the versions they depend on, so nothing has to
+be deleted when data changes: the next request simply misses. The versions
+also give every response an ETag and Last-Modified header, and clients that
+send them back get a bodyless 304 without the view running at all.
+
+Public pages use VersionedCacheMixin the same way: anonymous visitors get the
+whole page from the cache, and everyone else gets a freshly rendered page
+whose expensive parts come from {% cache %} fragments keyed on the same
+versions (the view's 'cache_version' context variable).
+"""
+
+import time
+import hashlib
+import logging
+import datetime
+from functools import wraps
+from typing import Dict, Iterable, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+logger = logging.getLogger("caching")
+
+VERSION_KEY_PREFIX = 'data_version'
+RESPONSE_KEY_PREFIX = 'api_response'
+PAGE_KEY_PREFIX = 'page'
+
+
+def get_response_cache_timeout() -> int:
+    """Seconds a cached response is kept (it is never served after a version bump)."""
+    return getattr(settings, 'API_RESPONSE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def get_page_cache_timeout() -> int:
+    """Seconds a cached page or fragment is kept (it is never served after a version bump)."""
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def get_data_versions(models: Iterable[str]) -> Dict[str, float]:
+    """
+    Get the current data version of each model in one cache round trip.
+
+    Models without a version yet (or after the cache was cleared) start at
+    the current time, which only costs one extra miss per cached response.
+
+    Args:
+        models: Model names, e.g. 'ExchangeRate'
+
+    Returns:
+        Mapping of model name to version
+    """
+    models = list(models)
+    keys = {f'{VERSION_KEY_PREFIX}:{name}': name for name in models}
+    versions = {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+    for key, name in keys.items():
+        if name not in versions:
+            cache.add(key, time.time(), None)
+            versions[name] = cache.get(key, time.time())
+    return versions
+
+
+async def aget_data_versions(models: Iterable[str]) -> Dict[str, float]:
+    """Async version of get_data_versions()."""
+    models = list(models)
+    keys = {f'{VERSION_KEY_PREFIX}:{name}': name for name in models}
+    versions = {keys[key]: value for key, value in (await cache.aget_many(keys)).items()}
+
+    for key, name in keys.items():
+        if name not in versions:
+            await cache.aadd(key, time.time(), None)
+            versions[name] = await cache.aget(key, time.time())
+    return versions
+
+
+def bump_data_version(*models: str) -> None:
+    """
+    Mark models as changed once the current transaction commits.
+
+    Bumping after the commit keeps a request that is running meanwhile from
+    caching the old data under the new version.
+
+    Args:
+        *models: Model names, e.g. 'ExchangeRate'
+    """
+    def bump():
+        now = time.time()
+        cache.set_many({f'{VERSION_KEY_PREFIX}:{name}': now for name in models}, None)
+        logger.debug(f"Bumped data version of {', '.join(models)}")
+
+    transaction.on_commit(bump)
+
+
+def data_version_token(models: Iterable[str]) -> str:
+    """Short token identifying the current versions of some models."""
+    versions = get_data_versions(models)
+    raw = '|'.join(f'{name}:{versions[name]!r}' for name in sorted(versions))
+    return hashlib.md5(raw.encode()).hexdigest()[:16]
+
+
+def _request_versions(request, models) -> Dict[str, float]:
+    # The ETag, Last-Modified and body lookups of one request share one read
+    if not hasattr(request, '_data_versions'):
+        request._data_versions = get_data_versions(models)
+    return request._data_versions
+
+
+def _request_etag(view_name: str, request, models) -> str:
+    versions = _request_versions(request, models)
+    # Today is part of the key too, as views leave out dates that have passed
+    raw = '|'.join(
+        [view_name, request.GET.urlencode(), timezone.localdate().isoformat()]
+        + [f'{name}:{versions[name]!r}' for name in sorted(versions)]
+    )
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def cache_api_response(*models: str, timeout: Optional[int] = None):
+    """
+    Cache a JSON view's responses per data version, with ETag/Last-Modified.
+
+    Only 200 responses are cached. Query parameters are part of the key.
+    Async views are cached with the async cache API, so a hit never blocks
+    the event loop; a view named like a sync one plus '_async' shares its
+    ETags and cached responses. Wrapping async views in condition() needs
+    Django 5.0 or later.
+
+    Args:
+        *models: Names of the models the view reads
+        timeout: Seconds to keep a response (defaults to API_RESPONSE_CACHE_TIMEOUT)
+    """
+    def decorator(view):
+        # The sync and async versions of a view return the same responses
+        view_name = f'{view.__module__}.{view.__name__.removesuffix("_async")}'
+
+        def etag_func(request, *args, **kwargs):
+            return _request_etag(view_name, request, models)
+
+        def last_modified_func(request, *args, **kwargs):
+            changed = datetime.datetime.fromtimestamp(
+                max(_request_versions(request, models).values()), tz=datetime.timezone.utc
+            )
+            today = timezone.make_aware(datetime.datetime.combine(timezone.localdate(), datetime.time()))
+            return max(changed, today)
+
+        def cacheable(response) -> bool:
+            return response.status_code == 200 and not response.streaming
+
+        def cache_timeout() -> int:
+            return timeout if timeout is not None else get_response_cache_timeout()
+
+        if iscoroutinefunction(view):
+            @condition(etag_func=etag_func, last_modified_func=last_modified_func)
+            @wraps(view)
+            async def cached_view(request, *args, **kwargs):
+                key = f'{RESPONSE_KEY_PREFIX}:{etag_func(request)}'
+                cached = await cache.aget(key)
+                if cached is not None:
+                    content, content_type = cached
+                    return HttpResponse(content, content_type=content_type)
+
+                response = await view(request, *args, **kwargs)
+                if cacheable(response):
+                    await cache.aset(key, (response.content, response['Content-Type']), cache_timeout())
+                return response
+
+            @wraps(view)
+            async def wrapped(request, *args, **kwargs):
+                # condition() calls etag_func and last_modified_func synchronously;
+                # with the versions read up front they need no cache access
+                request._data_versions = await aget_data_versions(models)
+                return await cached_view(request, *args, **kwargs)
+
+            return wrapped
+
+        @condition(etag_func=etag_func, last_modified_func=last_modified_func)
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            key = f'{RESPONSE_KEY_PREFIX}:{etag_func(request)}'
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if cacheable(response):
+                cache.set(key, (response.content, response['Content-Type']), cache_timeout())
+            return response
+
+        return wrapped
+    return decorator
+
+
+def _is_anonymous_request(request) -> bool:
+    # Without a session or message cookie there is nothing user-specific to
+    # render, and the session is never loaded
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and 'messages' not in request.COOKIES
+    )
+
+
+class VersionedCacheMixin:
+    """
+    Cache a template view per data version of the models it shows.
+
+    Anonymous requests are answered from a whole-page cache. Other requests
+    render the page, but the template can wrap its expensive parts in
+    {% cache cache_timeout '<name>' cache_version ... %} so they are only
+    rendered once per version.
+    """
+    cache_models: Tuple[str, ...] = ()
+
+    def get_cache_version(self) -> str:
+        """Token that changes when any of cache_models changes, or the day does."""
+        return f'{data_version_token(self.cache_models)}-{timezone.localdate().isoformat()}'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cache_version'] = self.cache_version
+        context['cache_timeout'] = get_page_cache_timeout()
+        return context
+
+    def dispatch(self, request, *args, **kwargs):
+        self.cache_version = self.get_cache_version()
+        if not _is_anonymous_request(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = f'{PAGE_KEY_PREFIX}:{type(self).__name__}:{path}:{self.cache_version}'
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+        else:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code == 200 and hasattr(response, 'render'):
+                response.add_post_render_callback(
+                    lambda rendered: cache.set(
+                        key, (rendered.content, rendered['Content-Type']), get_page_cache_timeout()
+                    )
+                )
+        # Shared caches must not give this page to visitors with a session
+        patch_vary_headers(response, ('Cookie',))
+        return response
@@ -0,0 +1,204 @@
+"""
+Chart data for ZimRate Predictor
+
+This module serves the rate history chart at any zoom level with a bounded
+number of points. The series come straight from the feature store's
+memory-mapped matrix (the rates table is only read until the store is
+built), restricted to days with an observed rate, and are downsampled with
+Largest-Triangle-Three-Buckets (LTTB), which keeps the points that carry
+the visible shape of the line (peaks, troughs, jumps) rather than every
+n-th day.
+
+Payloads are compact: dates are sent once as day offsets from the first
+date and rates are rounded to cents. Built payloads are cached per feature
+store and rates version and query, so a chart of years of history costs the
+same as one of 90 days once it has been drawn. The API view is cached with
+cache_api_response on the ExchangeRate and FeatureStore data versions.
+"""
+
+import json
+import logging
+import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from rate_predictor.caching import data_version_token
+from rate_predictor.prediction.feature_store import get_feature_store
+from rate_predictor.prediction.forecaster import forward_fill
+
+logger = logging.getLogger("charts")
+
+CACHE_KEY_PREFIX = 'chart:rates'
+
+
+def get_chart_config() -> Dict[str, Any]:
+    """Get the chart settings with defaults filled in."""
+    chart_config = getattr(settings, 'CHARTS', {})
+    return {
+        'DEFAULT_POINTS': chart_config.get('DEFAULT_POINTS', 500),
+        'MAX_POINTS': chart_config.get('MAX_POINTS', 2000),
+        'CACHE_TIMEOUT': chart_config.get('CACHE_TIMEOUT', 60 * 60 * 24),
+    }
+
+
+def parse_points(value: Optional[str]) -> int:
+    """Target point count from the points parameter, clamped to 3..MAX_POINTS."""
+    config = get_chart_config()
+    try:
+        points = int(value) if value else config['DEFAULT_POINTS']
+    except ValueError:
+        points = config['DEFAULT_POINTS']
+    return max(3, min(points, config['MAX_POINTS']))
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Downsample a series with Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept. The points in between are split into
+    n_out - 2 buckets, and from each bucket the point forming the largest
+    triangle with the point kept from the previous bucket and the mean of
+    the next bucket is kept.
+
+    Args:
+        x: Increasing x values
+        y: Finite y values
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted indices of the kept points
+    """
+    n = len(x)
+    if n_out >= n or n < 3:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])
+
+    # n_out - 1 edges make n_out - 2 buckets over the points 1..n-2
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket == n_out - 3:
+            next_x, next_y = x[n - 1], y[n - 1]
+        else:
+            next_end = edges[bucket + 2]
+            next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+
+        # Twice the triangle areas; the factor does not change the argmax
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[bucket + 1] = a
+    return kept
+
+
+def _downsample(days: np.ndarray, series: np.ndarray, n_out: int) -> np.ndarray:
+    # LTTB needs finite values: downsample the days that have one
+    finite = np.flatnonzero(np.isfinite(series))
+    return finite[lttb(days[finite], series[finite], n_out)]
+
+
+def _rate_series(
+    start_date: Optional[datetime.date],
+    end_date: Optional[datetime.date]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Dates (datetime64[D]), official and parallel rates of the days with an observed rate."""
+    store = get_feature_store()
+    if store is not None:
+        window = store.window(start_date, end_date)
+        observed = window[:, store.index('rate_observed')] > 0
+        return (
+            store.window_dates(start_date, end_date)[observed],
+            window[observed, store.index('official_rate')],
+            window[observed, store.index('parallel_rate')],
+        )
+
+    # No feature store built yet: read the rates table once
+    from rate_predictor.models import ExchangeRate
+
+    rates = ExchangeRate.objects.order_by('date')
+    if start_date:
+        rates = rates.filter(date__gte=start_date)
+    if end_date:
+        rates = rates.filter(date__lte=end_date)
+    rows = list(rates.values_list('date', 'official_rate', 'parallel_rate'))
+    return (
+        np.array([row[0] for row in rows], dtype='datetime64[D]'),
+        np.array([float(row[1]) for row in rows], dtype=np.float64),
+        # Forward filled like the feature store's rate columns
+        forward_fill(np.array([np.nan if row[2] is None else float(row[2]) for row in rows], dtype=np.float64)),
+    )
+
+
+def chart_version() -> str:
+    """Token that changes whenever the charted rates may have changed."""
+    token = data_version_token(['ExchangeRate'])
+    store = get_feature_store()
+    if store is not None:
+        # The store lags the rates table until its next update
+        return f'fs{store.version}-{token}'
+    return token
+
+
+def _rounded(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(value) else value for value in np.round(values, 2).tolist()]
+
+
+def rate_chart_payload(
+    start_date: Optional[datetime.date] = None,
+    end_date: Optional[datetime.date] = None,
+    points: Optional[int] = None
+) -> bytes:
+    """
+    Build the rate chart API response body.
+
+    Both series are downsampled separately, to half the points each, and the
+    days kept for either are sent, so a move in the parallel rate is not lost
+    where the official rate is flat.
+
+    Args:
+        start_date: First day (defaults to the first day with a rate)
+        end_date: Last day (defaults to the last day with a rate)
+        points: Target number of points (defaults to DEFAULT_POINTS)
+
+    Returns:
+        JSON document with 'status' and 'data': 'start' (ISO date of the
+        first day), 'day' (offsets from start), 'official' and 'parallel'
+        (null where unknown) and 'total' (days with a rate in the range)
+    """
+    config = get_chart_config()
+    points = points or config['DEFAULT_POINTS']
+    key = f'{CACHE_KEY_PREFIX}:{chart_version()}:{start_date}:{end_date}:{points}'
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    dates, official, parallel = _rate_series(start_date, end_date)
+    days = (dates - dates[0]).astype(np.int64) if len(dates) else np.zeros(0, dtype=np.int64)
+    if np.isfinite(parallel).any():
+        kept = np.union1d(
+            _downsample(days, official, points // 2),
+            _downsample(days, parallel, points - points // 2)
+        )
+    else:
+        kept = _downsample(days, official, points)
+
+    data = {
+        'start': str(dates[0]) if len(dates) else None,
+        'day': days[kept].tolist(),
+        'official': _rounded(official[kept]),
+        'parallel': _rounded(parallel[kept]),
+        'total': len(dates),
+    }
+    payload = json.dumps({'status': 'success', 'data': data}, separators=(',', ':')).encode()
+    cache.set(key, payload, config['CACHE_TIMEOUT'])
+    logger.debug(f"Built rate chart with {len(kept)} of {len(dates)} points")
+    return payload
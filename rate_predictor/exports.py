@@ -0,0 +1,318 @@
+"""
+Bulk history exports for ZimRate Predictor
+
+This module exports the whole ExchangeRate, RatePrediction and Post tables
+as gzip CSV, Parquet or Arrow IPC (stream format) for downstream analysis.
+
+Rows are never turned into dicts or model instances: each chunk is read
+with values_list() in primary key order (keyset, no OFFSET), transposed into
+columns and converted one column at a time, then handed to the writer. The
+encoded bytes are streamed as each chunk is written, so memory use depends
+on the chunk size, not on the table size.
+
+Finished exports up to CACHE_MAX_BYTES are kept in the cache under the
+table's data version (see caching.py) and served from there until the
+table changes.
+"""
+
+import csv
+import io
+import zlib
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+
+from rate_predictor.caching import data_version_token
+
+logger = logging.getLogger("exports")
+
+# Flag to track whether the columnar formats can be written
+PYARROW_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    logger.warning("pyarrow not found. Parquet and Arrow exports are disabled.")
+
+EXPORT_KEY_PREFIX = 'export'
+
+# Exported tables: model and (column, type) pairs; the primary key comes first
+DATASETS = {
+    'rates': {
+        'model': 'ExchangeRate',
+        'columns': [
+            ('id', 'int'),
+            ('date', 'date'),
+            ('official_rate', 'float'),
+            ('parallel_rate', 'float'),
+            ('updated_at', 'timestamp'),
+        ],
+    },
+    'predictions': {
+        'model': 'RatePrediction',
+        'columns': [
+            ('id', 'int'),
+            ('prediction_date', 'date'),
+            ('target_date', 'date'),
+            ('predicted_official_rate', 'float'),
+            ('predicted_parallel_rate', 'float'),
+            ('confidence_score', 'float'),
+            ('model_version', 'string'),
+            ('created_at', 'timestamp'),
+        ],
+    },
+    'posts': {
+        'model': 'Post',
+        'columns': [
+            ('id', 'int'),
+            ('published_at', 'timestamp'),
+            ('source_type', 'string'),
+            ('social_source_id', 'int'),
+            ('news_source_id', 'int'),
+            ('url', 'string'),
+            ('content', 'string'),
+            ('sentiment', 'string'),
+            ('sentiment_score', 'float'),
+            ('impact_score', 'float'),
+        ],
+    },
+}
+
+
+def get_export_config() -> Dict[str, Any]:
+    """Get the export settings with defaults filled in."""
+    export_config = getattr(settings, 'EXPORTS', {})
+    return {
+        'CHUNK_SIZE': export_config.get('CHUNK_SIZE', 50000),
+        'COMPRESSION': export_config.get('COMPRESSION', 'zstd'),
+        'CACHE_MAX_BYTES': export_config.get('CACHE_MAX_BYTES', 16 * 1024 * 1024),
+        'CACHE_TIMEOUT': export_config.get('CACHE_TIMEOUT', 60 * 60 * 24),
+    }
+
+
+def _float_column(values: List[Any]) -> List[Optional[float]]:
+    # Decimal fields come back as Decimal
+    return [float(value) if value is not None else None for value in values]
+
+
+_CONVERTERS: Dict[str, Callable[[List[Any]], List[Any]]] = {
+    'int': list,
+    'float': _float_column,
+    'date': list,
+    'timestamp': list,
+    'string': list,
+}
+
+
+def column_chunks(dataset: str, chunk_size: Optional[int] = None) -> Iterator[Dict[str, List[Any]]]:
+    """
+    Read a dataset in primary key order as chunks of columns.
+
+    Args:
+        dataset: Name from DATASETS
+        chunk_size: Rows per query (defaults to CHUNK_SIZE)
+
+    Yields:
+        Mapping of column name to that column's values in the chunk
+    """
+    spec = DATASETS[dataset]
+    model = apps.get_model('rate_predictor', spec['model'])
+    names = [name for name, _ in spec['columns']]
+    chunk_size = chunk_size or get_export_config()['CHUNK_SIZE']
+
+    last_id = 0
+    count = 0
+    while True:
+        rows = list(model.objects.filter(id__gt=last_id).order_by('id').values_list(*names)[:chunk_size])
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        count += len(rows)
+        yield {
+            name: _CONVERTERS[kind](list(values))
+            for (name, kind), values in zip(spec['columns'], zip(*rows))
+        }
+        if len(rows) < chunk_size:
+            break
+    logger.info(f"Exported {count} {spec['model']} rows")
+
+
+def _csv_column(kind: str, values: List[Any]) -> List[str]:
+    if kind in ('date', 'timestamp'):
+        return [value.isoformat() if value is not None else '' for value in values]
+    return ['' if value is None else value for value in values]
+
+
+def csv_gzip_stream(dataset: str, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """Yield a dataset as gzip-compressed CSV with a header row."""
+    columns = DATASETS[dataset]['columns']
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([name for name, _ in columns])
+    for chunk in column_chunks(dataset, chunk_size):
+        writer.writerows(zip(*(_csv_column(kind, chunk[name]) for name, kind in columns)))
+        yield compressor.compress(buffer.getvalue().encode())
+        buffer.seek(0)
+        buffer.truncate()
+    yield compressor.compress(buffer.getvalue().encode()) + compressor.flush()
+
+
+class _StreamSink:
+    """Write-only file that collects what pyarrow writes until it is drained."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def arrow_schema(dataset: str) -> 'pa.Schema':
+    """Arrow schema of a dataset."""
+    types = {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'date': pa.date32(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+        'string': pa.string(),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in DATASETS[dataset]['columns']])
+
+
+def _record_batches(dataset: str, chunk_size: Optional[int]) -> Iterator['pa.RecordBatch']:
+    schema = arrow_schema(dataset)
+    for chunk in column_chunks(dataset, chunk_size):
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(chunk[field.name], type=field.type) for field in schema],
+            schema=schema
+        )
+
+
+def parquet_stream(dataset: str, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """Yield a dataset as a Parquet file, one row group per chunk."""
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, arrow_schema(dataset), compression=get_export_config()['COMPRESSION'])
+    for batch in _record_batches(dataset, chunk_size):
+        writer.write_batch(batch)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def arrow_stream(dataset: str, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """Yield a dataset in the Arrow IPC stream format, one record batch per chunk."""
+    sink = _StreamSink()
+    options = pa.ipc.IpcWriteOptions(compression=get_export_config()['COMPRESSION'])
+    writer = pa.ipc.new_stream(sink, arrow_schema(dataset), options=options)
+    for batch in _record_batches(dataset, chunk_size):
+        writer.write_batch(batch)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+# Format name: (file extension, content type, writer, needs pyarrow)
+FORMATS = {
+    'csv': ('csv.gz', 'application/gzip', csv_gzip_stream, False),
+    'parquet': ('parquet', 'application/vnd.apache.parquet', parquet_stream, True),
+    'arrow': ('arrows', 'application/vnd.apache.arrow.stream', arrow_stream, True),
+}
+
+
+def available_formats() -> List[str]:
+    """Formats that can be written with the installed packages."""
+    return [name for name, (_, _, _, needs_pyarrow) in FORMATS.items() if PYARROW_AVAILABLE or not needs_pyarrow]
+
+
+def export_filename(dataset: str, fmt: str) -> str:
+    return f'{dataset}.{FORMATS[fmt][0]}'
+
+
+def export_stream(dataset: str, fmt: str, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Yield a dataset encoded in a format.
+
+    Raises:
+        ValueError: If the dataset or format is unknown or unavailable
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    if fmt not in available_formats():
+        raise ValueError(f"Unavailable export format: {fmt} (available: {', '.join(available_formats())})")
+    return FORMATS[fmt][2](dataset, chunk_size)
+
+
+def _caching_stream(chunks: Iterator[bytes], key: str, model: str, token: str) -> Iterator[bytes]:
+    config = get_export_config()
+    parts = []
+    size = 0
+    for data in chunks:
+        if parts is not None:
+            size += len(data)
+            if size > config['CACHE_MAX_BYTES']:
+                parts = None
+            else:
+                parts.append(data)
+        yield data
+
+    # Rows read while the table changed may mix both versions
+    if parts is not None and data_version_token([model]) == token:
+        cache.set(key, b''.join(parts), config['CACHE_TIMEOUT'])
+
+
+def export_response(request, dataset: str, fmt: str):
+    """
+    Download response for a dataset, from the cache if this data version was exported before.
+
+    Sends an ETag of the data version, and 304 to a client that already has it.
+
+    Raises:
+        ValueError: If the dataset or format is unknown or unavailable
+    """
+    chunks = export_stream(dataset, fmt)
+    model = DATASETS[dataset]['model']
+    token = data_version_token([model])
+    etag = f'"{dataset}-{fmt}-{token}"'
+    if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+        return HttpResponseNotModified(headers={'ETag': etag})
+
+    content_type = FORMATS[fmt][1]
+    key = f'{EXPORT_KEY_PREFIX}:{dataset}:{fmt}:{token}'
+    content = cache.get(key)
+    if content is not None:
+        response = HttpResponse(content, content_type=content_type)
+    else:
+        response = StreamingHttpResponse(_caching_stream(chunks, key, model, token), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(dataset, fmt)}"'
+    response['ETag'] = etag
+    return response
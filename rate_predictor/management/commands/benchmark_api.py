@@ -0,0 +1,82 @@
+import json
+from django.core.management.base import BaseCommand
+from rate_predictor.benchmarks.api_servers import ENDPOINTS, SERVERS, run_benchmarks
+
+class Command(BaseCommand):
+    help = 'Benchmark the JSON API under gunicorn (WSGI, sync views) and uvicorn (ASGI, async views)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=200,
+            help='Requests in flight at any time',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=10,
+            help='Seconds each endpoint is measured for',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Worker processes per server',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=4,
+            help='Threads per gunicorn worker',
+        )
+        parser.add_argument(
+            '--server',
+            action='append',
+            dest='servers',
+            choices=SERVERS,
+            help='Only run the given server (can be repeated)',
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            dest='endpoints',
+            choices=list(ENDPOINTS),
+            help='Only benchmark the named endpoint (can be repeated)',
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8765,
+            help='Local port the servers bind',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file',
+        )
+
+    def handle(self, *args, **options):
+        results = run_benchmarks(
+            concurrency=options['concurrency'],
+            duration=options['duration'],
+            workers=options['workers'],
+            threads=options['threads'],
+            servers=options['servers'],
+            endpoints=options['endpoints'],
+            port=options['port'],
+        )
+
+        self.stdout.write(
+            f"{'server':<8}{'endpoint':<16}{'requests':>10}{'req/sec':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}{'errors':>8}"
+        )
+        for kind, endpoints in results['servers'].items():
+            for name, stats in endpoints.items():
+                self.stdout.write(
+                    f"{kind:<8}{name:<16}{stats['requests']:>10}{stats['requests_per_sec']:>10}"
+                    f"{stats['p50_ms']:>10}{stats['p99_ms']:>10}{stats['errors']:>8}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
@@ -0,0 +1,56 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from rate_predictor.benchmarks.text_path import run_benchmarks, compare_to_baseline
+
+class Command(BaseCommand):
+    help = 'Benchmark the text processing hot path over the checked-in corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=50,
+            help='Number of passes over the corpus per stage',
+        )
+        parser.add_argument(
+            '--stage',
+            action='append',
+            dest='stages',
+            help='Only run the named stage (can be repeated)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Earlier results JSON to compare against',
+        )
+        parser.add_argument(
+            '--max_regression',
+            type=float,
+            default=0.2,
+            help='Allowed p50 slowdown against the baseline (0.2 = 20%%)',
+        )
+
+    def handle(self, *args, **options):
+        results = run_benchmarks(options['iterations'], options['stages'])
+
+        self.stdout.write(f"{'stage':<24}{'docs':>8}{'docs/sec':>12}{'p50 (us)':>12}{'p99 (us)':>12}")
+        for name, stage in results['stages'].items():
+            self.stdout.write(
+                f"{name:<24}{stage['docs']:>8}{stage['docs_per_sec']:>12}{stage['p50_us']:>12}{stage['p99_us']:>12}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = compare_to_baseline(results, baseline, options['max_regression'])
+            if regressions:
+                raise CommandError('Benchmark regressions found:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
@@ -0,0 +1,44 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from rate_predictor.exports import DATASETS, FORMATS, available_formats, export_filename, export_stream
+
+class Command(BaseCommand):
+    help = 'Export the rate, prediction and post history as gzip CSV, Parquet or Arrow IPC'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dataset',
+            action='append',
+            dest='datasets',
+            choices=list(DATASETS),
+            help='Only export the named dataset (can be repeated)',
+        )
+        parser.add_argument(
+            '--format',
+            default='parquet',
+            choices=list(FORMATS),
+            help='Output format',
+        )
+        parser.add_argument(
+            '--output_dir',
+            default='.',
+            help='Directory to write the files to',
+        )
+        parser.add_argument(
+            '--chunk_size',
+            type=int,
+            help='Rows per query (defaults to EXPORTS["CHUNK_SIZE"])',
+        )
+
+    def handle(self, *args, **options):
+        fmt = options['format']
+        if fmt not in available_formats():
+            raise CommandError(f"The {fmt} format needs pyarrow, which is not installed")
+
+        os.makedirs(options['output_dir'], exist_ok=True)
+        for dataset in options['datasets'] or DATASETS:
+            path = os.path.join(options['output_dir'], export_filename(dataset, fmt))
+            with open(path, 'wb') as f:
+                for data in export_stream(dataset, fmt, options['chunk_size']):
+                    f.write(data)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {path} ({os.path.getsize(path)} bytes)"))
@@ -0,0 +1,51 @@
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from rate_predictor.scrapers.rate_sheets import import_rate_sheets
+
+class Command(BaseCommand):
+    help = 'Backfill exchange rates from a directory of downloaded RBZ rate sheets (XLSX/PDF)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Directory containing the rate sheets')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Worker processes (defaults to RATE_SHEETS WORKERS, then the CPU count)',
+        )
+        parser.add_argument(
+            '--recursive',
+            action='store_true',
+            help='Include sheets in subdirectories',
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Parse every file again instead of reusing cached results',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Parse the sheets without writing to the database',
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options['directory'])
+        if not directory.is_dir():
+            raise CommandError(f"Not a directory: {directory}")
+
+        summary = import_rate_sheets(
+            directory,
+            workers=options['workers'],
+            recursive=options['recursive'],
+            use_cache=not options['no_cache'],
+            dry_run=options['dry_run'],
+        )
+
+        for path, error in summary['failed']:
+            self.stdout.write(self.style.WARNING(f'Failed: {path} ({error})'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['files']} sheets ({summary['cached']} cached, {summary['parsed']} parsed, "
+            f"{len(summary['failed'])} failed): {summary['dates']} dates found, "
+            f"{summary['changed']} new or changed, {summary['written']} rates written"
+        ))
@@ -0,0 +1,53 @@
+import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rate_predictor.scrapers.rate_ingester import get_ingestion_config, ingest_rates
+
+class Command(BaseCommand):
+    help = 'Fetch official exchange rates for the dates missing from the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Number of days back to check (default: RATE_INGESTION BACKFILL_DAYS)',
+        )
+        parser.add_argument(
+            '--start',
+            help='First date to check (YYYY-MM-DD), overrides --days',
+        )
+        parser.add_argument(
+            '--end',
+            help='Last date to check (YYYY-MM-DD, default: today)',
+        )
+        parser.add_argument(
+            '--source',
+            action='append',
+            choices=[name for name, url in getattr(settings, 'RATE_SOURCES', {}).items() if url],
+            help='Source to fetch from (repeatable, default: RATE_INGESTION SOURCES)',
+        )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Re-fetch dates that already have a rate and overwrite them',
+        )
+
+    def _parse_date(self, value):
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"Invalid date: {value}")
+
+    def handle(self, *args, **options):
+        end = self._parse_date(options['end']) if options['end'] else datetime.date.today()
+        if options['start']:
+            start = self._parse_date(options['start'])
+        else:
+            days = options['days'] if options['days'] is not None else get_ingestion_config()['BACKFILL_DAYS']
+            start = end - datetime.timedelta(days=days)
+        if start > end:
+            raise CommandError('--start must not be after --end')
+
+        self.stdout.write(f'Checking exchange rates from {start} to {end}...')
+        written = ingest_rates(start=start, end=end, sources=options['source'], refresh=options['refresh'])
+        self.stdout.write(self.style.SUCCESS(f'Stored {written} exchange rates'))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from rate_predictor.prediction import registry
+
+class Command(BaseCommand):
+    help = 'List, promote and prune versions in the model registry'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--promote',
+            metavar='VERSION',
+            help='Make the given version active',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Delete old versions (the active one is always kept)',
+        )
+        parser.add_argument(
+            '--keep',
+            type=int,
+            help='Number of newest versions kept by --prune (defaults to MODEL_REGISTRY["KEEP_VERSIONS"])',
+        )
+
+    def handle(self, *args, **options):
+        if options['promote']:
+            try:
+                registry.promote(options['promote'])
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Promoted {options['promote']}"))
+            return
+
+        if options['prune']:
+            deleted = registry.prune_versions(options['keep'])
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} versions'))
+            return
+
+        active = registry.get_active_version()
+        versions = registry.list_versions()
+        if not versions:
+            self.stdout.write('No model versions registered')
+            return
+
+        for meta in versions:
+            marker = '*' if meta['version'] == active else ' '
+            window = meta.get('training_window', {})
+            metrics = meta.get('metrics', {})
+            sigma = metrics.get('official_sigma') or []
+            self.stdout.write(
+                f"{marker} {meta['version']}  {meta.get('kind', ''):<7} "
+                f"window {window.get('start')}..{window.get('end')}  "
+                f"n_obs {metrics.get('n_obs')}  "
+                f"sigma(h=1) {sigma[0] if sigma else '-'}  "
+                f"lexicon {meta.get('lexicon_version')}"
+            )
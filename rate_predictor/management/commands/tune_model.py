@@ -0,0 +1,77 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from rate_predictor.prediction.tuning import tune_model, build_candidates, get_tuning_grid
+
+def int_list(value):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+class Command(BaseCommand):
+    help = 'Search forecaster orders and feature sets with rolling-origin backtests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ar', type=int_list, help='AR orders to try, e.g. 1,2,3')
+        parser.add_argument('--difference', type=int_list, help='Differencing orders to try, e.g. 0,1')
+        parser.add_argument('--ma', type=int_list, help='MA orders to try, e.g. 0,1')
+        parser.add_argument('--sentiment_lags', type=int_list, help='Sentiment lag counts to try, e.g. 0,1,2')
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Days of history to backtest on (defaults to the whole feature store)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Worker processes (defaults to the CPU count)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Number of candidates to list',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write all results as JSON to this file',
+        )
+
+    def handle(self, *args, **options):
+        grid = get_tuning_grid()
+        for key, option in (('AR_ORDER', 'ar'), ('DIFFERENCE', 'difference'),
+                            ('MA_ORDER', 'ma'), ('SENTIMENT_LAGS', 'sentiment_lags')):
+            if options[option]:
+                grid[key] = options[option]
+
+        try:
+            report = tune_model(build_candidates(grid), options['days'], options['workers'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"{len(report['results'])} candidates on {report['days']} days, {report['workers']} workers: "
+            f"precompute {report['precompute_seconds']:.3f}s, search {report['search_seconds']:.3f}s "
+            f"({report['cpu_seconds']:.3f}s of candidate time)"
+        )
+        self.stdout.write(f"{'p':>3}{'d':>3}{'q':>3}{'sent':>6}{'origins':>9}{'MAPE %':>10}{'dir acc':>9}{'ms':>9}")
+        for result in report['results'][:options['top']]:
+            config = result['config']
+            scores = result['scores']
+            if scores is None:
+                continue
+            self.stdout.write(
+                f"{config['AR_ORDER']:>3}{config['DIFFERENCE']:>3}{config['MA_ORDER']:>3}"
+                f"{config['SENTIMENT_LAGS']:>6}{scores['origins']:>9}{scores['mape']:>10.4f}"
+                f"{scores['directional_accuracy']:>9.3f}{result['seconds'] * 1000:>9.1f}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        winner = report['winner']
+        if winner is None:
+            raise CommandError('No candidate had enough history to backtest')
+        self.stdout.write(self.style.SUCCESS(
+            f"Winner: {winner['config']} (MAPE {winner['scores']['mape']:.4f}%). "
+            f"Set these in FORECASTING to use them."
+        ))
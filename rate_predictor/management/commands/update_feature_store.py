@@ -0,0 +1,37 @@
+import datetime
+from django.core.management.base import BaseCommand, CommandError
+from rate_predictor.prediction.feature_store import update_feature_store, get_feature_store
+
+class Command(BaseCommand):
+    help = 'Append new days to the daily feature store'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recompute the whole store from the first stored exchange rate',
+        )
+        parser.add_argument(
+            '--since',
+            help='Recompute every day from this date (YYYY-MM-DD), e.g. after backfilling rates',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['since']}")
+
+        written = update_feature_store(since=since, rebuild=options['rebuild'])
+
+        store = get_feature_store()
+        if store is None or not store.n_days:
+            self.stdout.write(self.style.WARNING('Feature store is empty (no exchange rates stored)'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} rows; store covers {store.start_date} to {store.end_date} '
+            f'({store.n_days} days, {len(store.columns)} features)'
+        ))
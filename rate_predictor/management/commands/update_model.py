@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from rate_predictor.tasks import update_model_task
+from rate_predictor.refresh import trigger_refresh
 
 class Command(BaseCommand):
     help = 'Update the prediction model with new data using Celery tasks'
@@ -10,6 +10,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Perform initial training with 2 years of historical data',
         )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Run even if an update completed within REFRESH INTERVAL (never alongside a running one)',
+        )
 
     def handle(self, *args, **options):
         is_initial = options['initial']
@@ -20,12 +25,17 @@ class Command(BaseCommand):
                 f'{"(initial training)" if is_initial else "(incremental update)"}'
             ))
             
-            # Queue the task using Celery
-            task = update_model_task.delay(is_initial=is_initial)
+            # Queue the task using Celery, unless a refresh is running or recently completed
+            task_id = trigger_refresh(initial=is_initial or None, force=options['force'], background=False)
             
-            self.stdout.write(self.style.SUCCESS(
-                f'Task queued successfully (task_id: {task.id})'
-            ))
+            if task_id is None:
+                self.stdout.write(self.style.WARNING(
+                    'Skipped: a model update is already running or completed recently (use --force)'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Task queued successfully (task_id: {task_id})'
+                ))
                 
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error queueing task: {str(e)}'))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f'Error queueing task: {str(e)}'))
@@ -3,6 +3,7 @@ from django.core.management.base import BaseCommand
 from django.core.management import call_command
 from datetime import datetime
 from rate_predictor.scrapers.news_scraper import run_news_scraper, train_model_with_initial_data
+from rate_predictor.refresh import refresh_slot
 
 class Command(BaseCommand):
     help = 'Run the news scraper to collect articles and update the model'
@@ -19,12 +20,24 @@ class Command(BaseCommand):
             action='store_true',
             help='Perform the initial scrape for the last 2 years',
         )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Scrape even if news was scraped within REFRESH INTERVAL',
+        )
 
     def handle(self, *args, **options):
         days_back = options['days_back']
         initial_scrape = options['initial_scrape']
         self.stdout.write(self.style.SUCCESS(f'Starting news scraper for the past {days_back} days...'))
-        saved_count = run_news_scraper(days_back, initial_scrape)
+        # Shares the 'news' refresh with the periodic update, so only one scrape runs at a time
+        with refresh_slot('news', force=options['force'] or initial_scrape) as should_run:
+            if not should_run:
+                self.stdout.write(self.style.WARNING(
+                    'Skipped: news is already being scraped or was scraped recently (use --force)'
+                ))
+                return
+            saved_count = run_news_scraper(days_back, initial_scrape)
         self.stdout.write(self.style.SUCCESS(f'Successfully saved {saved_count} articles.'))
         
         if initial_scrape:
@@ -40,7 +53,7 @@ class Command(BaseCommand):
         current_hour = datetime.now().hour
         
         try:
-            # Run incremental updates every 6 hours
+            # Skipped by update_model if a model update is running or completed recently
             self.stdout.write(self.style.NOTICE('Starting periodic model update...'))
             call_command('update_model')
             self.stdout.write(self.style.SUCCESS('Periodic model update completed'))
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rate_predictor', '0002_taskprogress_alter_rateprediction_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateObservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('observed_on', models.DateField(db_index=True)),
+                ('rate', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('matched_text', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rate_observations', to='rate_predictor.post')),
+            ],
+            options={
+                'ordering': ['-observed_on'],
+            },
+        ),
+    ]
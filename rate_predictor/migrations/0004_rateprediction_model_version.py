@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rate_predictor', '0003_rateobservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rateprediction',
+            name='model_version',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=50),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rate_predictor', '0004_rateprediction_model_version'),
+    ]
+
+    # Adding a through model cannot be done in place; the automatic join
+    # table was never written to, so it is dropped and recreated.
+    operations = [
+        migrations.RemoveField(
+            model_name='rateprediction',
+            name='influencing_posts',
+        ),
+        migrations.CreateModel(
+            name='PredictionInfluence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weight', models.FloatField(default=0.0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='influences', to='rate_predictor.post')),
+                ('prediction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='influences', to='rate_predictor.rateprediction')),
+            ],
+            options={
+                'ordering': ['-weight'],
+            },
+        ),
+        migrations.AddField(
+            model_name='rateprediction',
+            name='influencing_posts',
+            field=models.ManyToManyField(blank=True, through='rate_predictor.PredictionInfluence', to='rate_predictor.post'),
+        ),
+        migrations.AddIndex(
+            model_name='predictioninfluence',
+            index=models.Index(fields=['prediction', '-weight'], name='rate_predic_predict_45383b_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='predictioninfluence',
+            unique_together={('prediction', 'post')},
+        ),
+    ]
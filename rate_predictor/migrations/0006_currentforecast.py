@@ -0,0 +1,56 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_current_forecast(apps, schema_editor):
+    RatePrediction = apps.get_model('rate_predictor', 'RatePrediction')
+    CurrentForecast = apps.get_model('rate_predictor', 'CurrentForecast')
+
+    rows = {}
+    for prediction in RatePrediction.objects.filter(
+        target_date__gte=timezone.now().date()
+    ).order_by('target_date', '-prediction_date', '-id'):
+        horizon = (prediction.target_date - prediction.prediction_date).days
+        rows.setdefault((prediction.target_date, horizon), CurrentForecast(
+            target_date=prediction.target_date,
+            horizon=horizon,
+            prediction=prediction,
+            prediction_date=prediction.prediction_date,
+            predicted_official_rate=prediction.predicted_official_rate,
+            predicted_parallel_rate=prediction.predicted_parallel_rate,
+            confidence_score=prediction.confidence_score,
+            model_version=prediction.model_version
+        ))
+    CurrentForecast.objects.bulk_create(rows.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rate_predictor', '0005_predictioninfluence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrentForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target_date', models.DateField()),
+                ('horizon', models.IntegerField()),
+                ('prediction_date', models.DateField()),
+                ('predicted_official_rate', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('predicted_parallel_rate', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True)),
+                ('confidence_score', models.FloatField(default=0.5)),
+                ('model_version', models.CharField(blank=True, default='', max_length=50)),
+                ('prediction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='rate_predictor.rateprediction')),
+            ],
+            options={
+                'ordering': ['target_date', 'horizon'],
+                'unique_together': {('target_date', 'horizon')},
+            },
+        ),
+        migrations.RunPython(populate_current_forecast, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rate_predictor', '0006_currentforecast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='currentforecast',
+            name='quantiles',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='rateprediction',
+            name='quantiles',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
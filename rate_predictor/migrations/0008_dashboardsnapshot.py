@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rate_predictor', '0007_prediction_quantiles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField()),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-built_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rate_predictor', '0008_dashboardsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['published_at', 'id'], name='rate_predic_publish_da1ae8_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rate_predictor', '0009_post_published_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rateprediction',
+            name='horizon',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -53,6 +53,11 @@ class Post(models.Model):
     sentiment_score = models.FloatField(default=0.0)  # -1.0 to 1.0
     impact_score = models.FloatField(default=0.0)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['published_at', 'id']),  # Keyset pagination in /api/posts/
+        ]
+    
     def __str__(self):
         return f"{self.source_type} post from {self.published_at.strftime('%Y-%m-%d')}"
 
@@ -73,14 +78,32 @@ class ExchangeRate(models.Model):
         return f"Rate on {self.date}: Official {self.official_rate} ZWL/USD"
 
 
+class RateObservation(models.Model):
+    """Model for exchange rate quotes extracted from posts"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='rate_observations')
+    observed_on = models.DateField(db_index=True)
+    rate = models.DecimalField(max_digits=20, decimal_places=2)  # ZWL per 1 USD
+    matched_text = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-observed_on']
+    
+    def __str__(self):
+        return f"Quote on {self.observed_on}: {self.rate} ZWL/USD"
+
+
 class RatePrediction(models.Model):
     """Model for exchange rate predictions"""
     prediction_date = models.DateField()
     target_date = models.DateField()
+    horizon = models.PositiveSmallIntegerField(null=True, blank=True)  # Days from the last rate the model saw to target_date
     predicted_official_rate = models.DecimalField(max_digits=20, decimal_places=2)
     predicted_parallel_rate = models.DecimalField(max_digits=20, decimal_places=2, null=True, blank=True)
     confidence_score = models.FloatField(default=0.5)  # 0.0 to 1.0
-    influencing_posts = models.ManyToManyField(Post, blank=True)
+    model_version = models.CharField(max_length=50, blank=True, default='', db_index=True)
+    quantiles = models.JSONField(default=dict, blank=True)  # {"0.05": rate, "0.5": rate, ...}
+    influencing_posts = models.ManyToManyField(Post, blank=True, through='PredictionInfluence')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now_add=True)
     
@@ -89,6 +112,66 @@ class RatePrediction(models.Model):
     
     def __str__(self):
         return f"Prediction on {self.prediction_date} for {self.target_date}"
+    
+    @property
+    def forecast_horizon(self):
+        """Stored horizon, or the days from prediction_date for predictions saved without one"""
+        if self.horizon is not None:
+            return self.horizon
+        return (self.target_date - self.prediction_date).days
+    
+    @property
+    def interval(self):
+        """Prediction interval at PREDICTION_CONFIDENCE_THRESHOLD, if quantiles were stored"""
+        from rate_predictor.prediction.intervals import interval_from_quantiles
+        return interval_from_quantiles(self.quantiles or {})
+
+
+class PredictionInfluence(models.Model):
+    """Model linking a prediction to the posts that influenced it most"""
+    prediction = models.ForeignKey(RatePrediction, on_delete=models.CASCADE, related_name='influences')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='influences')
+    weight = models.FloatField(default=0.0)  # Share of the prediction's attribution, 0.0 to 1.0
+    
+    class Meta:
+        unique_together = ['prediction', 'post']
+        ordering = ['-weight']
+        indexes = [models.Index(fields=['prediction', '-weight'])]
+    
+    def __str__(self):
+        return f"Post {self.post_id} -> prediction {self.prediction_id} ({self.weight:.2f})"
+
+
+class CurrentForecast(models.Model):
+    """Model holding the latest prediction for each upcoming target date and horizon"""
+    target_date = models.DateField()
+    horizon = models.IntegerField()  # Days from the last rate the model saw to target_date
+    prediction = models.ForeignKey(RatePrediction, on_delete=models.CASCADE, related_name='+')
+    prediction_date = models.DateField()
+    predicted_official_rate = models.DecimalField(max_digits=20, decimal_places=2)
+    predicted_parallel_rate = models.DecimalField(max_digits=20, decimal_places=2, null=True, blank=True)
+    confidence_score = models.FloatField(default=0.5)
+    model_version = models.CharField(max_length=50, blank=True, default='')
+    quantiles = models.JSONField(default=dict, blank=True)
+    
+    class Meta:
+        unique_together = ['target_date', 'horizon']
+        ordering = ['target_date', 'horizon']
+    
+    def __str__(self):
+        return f"Current {self.horizon}-day forecast for {self.target_date}"
+
+
+class DashboardSnapshot(models.Model):
+    """Model holding the dashboard's precomputed numbers, rebuilt after new rates or predictions"""
+    data = models.JSONField()  # JSON-native; see rate_predictor.snapshot
+    built_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-built_at']
+    
+    def __str__(self):
+        return f"Dashboard snapshot built {self.built_at}"
 
 
 class UserAlert(models.Model):
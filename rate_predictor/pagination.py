@@ -0,0 +1,160 @@
+"""
+Keyset pagination and streaming export for ZimRate Predictor
+
+This module pages the history APIs by cursor instead of OFFSET. A page is
+ordered on a key column plus the primary key as a tie-breaker, and the
+cursor is the (key, id) pair of the last row returned, so fetching page N is
+one index range scan no matter how deep N is, and rows inserted meanwhile
+never shift or repeat a page.
+
+Exports skip paging altogether: the rows are streamed as NDJSON (one JSON
+object per line) from QuerySet.iterator(), which reads them in chunks from a
+server-side cursor, so memory use stays flat for multi-year exports.
+"""
+
+import json
+import base64
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date, parse_datetime
+
+logger = logging.getLogger("pagination")
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded."""
+
+
+def get_pagination_config() -> Dict[str, Any]:
+    """Get the API pagination settings with defaults filled in."""
+    pagination_config = getattr(settings, 'API_PAGINATION', {})
+    return {
+        'DEFAULT_LIMIT': pagination_config.get('DEFAULT_LIMIT', 100),
+        'MAX_LIMIT': pagination_config.get('MAX_LIMIT', 1000),
+        'EXPORT_CHUNK_SIZE': pagination_config.get('EXPORT_CHUNK_SIZE', 2000),
+    }
+
+
+def encode_cursor(key: Any, pk: int) -> str:
+    """Opaque, URL-safe cursor for the row with this key and primary key."""
+    # Full isoformat: DjangoJSONEncoder would cut datetimes to milliseconds
+    raw = json.dumps([key.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, parse_key: Callable[[str], Any]) -> Tuple[Any, int]:
+    """
+    Decode a cursor made by encode_cursor.
+
+    Args:
+        cursor: Cursor from a previous page
+        parse_key: Turns the key's JSON string back into a value (parse_date, parse_datetime)
+
+    Returns:
+        (key, primary key)
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key, pk = json.loads(raw)
+        value = parse_key(key)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+    if value is None or not isinstance(pk, int):
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+    return value, pk
+
+
+def parse_limit(value: Optional[str]) -> int:
+    """Page size from the limit parameter, clamped to 1..MAX_LIMIT."""
+    config = get_pagination_config()
+    try:
+        limit = int(value) if value else config['DEFAULT_LIMIT']
+    except ValueError:
+        limit = config['DEFAULT_LIMIT']
+    return max(1, min(limit, config['MAX_LIMIT']))
+
+
+def keyset_page(
+    queryset: QuerySet,
+    key: str,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Get one page of rows ordered on (key, id), starting after the cursor.
+
+    The queryset should already be reduced to dicts with values(), including
+    the key and 'id'.
+
+    Args:
+        queryset: Filtered values() queryset
+        key: Ordering column, e.g. 'date'
+        cursor: Cursor from the previous page, or None for the first page
+        limit: Page size
+        descending: Newest first
+
+    Returns:
+        (rows, cursor for the next page or None on the last page)
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    field = queryset.model._meta.get_field(key)
+    parse_key = parse_datetime if field.get_internal_type() == 'DateTimeField' else parse_date
+
+    if cursor:
+        value, pk = decode_cursor(cursor, parse_key)
+        after = 'lt' if descending else 'gt'
+        queryset = queryset.filter(
+            Q(**{f'{key}__{after}': value}) | Q(**{key: value, f'id__{after}': pk})
+        )
+
+    prefix = '-' if descending else ''
+    # One extra row tells whether there is a next page
+    rows = list(queryset.order_by(f'{prefix}{key}', f'{prefix}id')[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1][key], rows[-1]['id'])
+
+
+def ndjson_rows(
+    queryset: QuerySet,
+    serialize: Callable[[Dict[str, Any]], Dict[str, Any]],
+    chunk_size: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Yield a values() queryset as NDJSON lines, reading it in chunks.
+
+    Args:
+        queryset: Ordered values() queryset
+        serialize: Turns a row into the object written for it
+        chunk_size: Rows fetched per round trip (defaults to EXPORT_CHUNK_SIZE)
+    """
+    chunk_size = chunk_size or get_pagination_config()['EXPORT_CHUNK_SIZE']
+    encoder = DjangoJSONEncoder()
+    count = 0
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield (encoder.encode(serialize(row)) + '\n').encode()
+        count += 1
+    logger.info(f"Exported {count} {queryset.model.__name__} rows")
+
+
+def ndjson_response(
+    queryset: QuerySet,
+    serialize: Callable[[Dict[str, Any]], Dict[str, Any]],
+    filename: str
+) -> StreamingHttpResponse:
+    """Stream a values() queryset as an NDJSON attachment."""
+    response = StreamingHttpResponse(ndjson_rows(queryset, serialize), content_type='application/x-ndjson')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
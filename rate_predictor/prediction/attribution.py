@@ -0,0 +1,152 @@
+"""
+Prediction attribution for ZimRate Predictor
+
+This module picks the posts that most influenced a set of predictions and
+records them as PredictionInfluence rows. Every post published in the
+feature window is weighted by its impact score, the strength of its
+sentiment and its age; the top k are kept with a bounded heap, so selection
+is a single streaming pass over the window whatever its size.
+"""
+
+import heapq
+import logging
+import datetime
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger("attribution")
+
+
+def get_attribution_config() -> Dict[str, Any]:
+    """Get the attribution settings with defaults filled in."""
+    attribution_config = getattr(settings, 'ATTRIBUTION', {})
+    return {
+        'TOP_K': attribution_config.get('TOP_K', 10),
+        'WINDOW_DAYS': attribution_config.get('WINDOW_DAYS', 7),
+        'SENTIMENT_WEIGHT': attribution_config.get('SENTIMENT_WEIGHT', 1.0),
+        'HALF_LIFE_DAYS': attribution_config.get('HALF_LIFE_DAYS', 3.0),
+    }
+
+
+def influence_weight(
+    impact_score: float,
+    sentiment_score: float,
+    age_days: float,
+    sentiment_weight: float,
+    half_life_days: float
+) -> float:
+    """
+    Weight a post by impact, sentiment strength and recency.
+
+    Args:
+        impact_score: Post impact (0.0 to 1.0)
+        sentiment_score: Post sentiment (-1.0 to 1.0); strong either way counts
+        age_days: Days between publication and the end of the window
+        sentiment_weight: How much sentiment strength scales the weight
+        half_life_days: Age at which a post's weight halves
+
+    Returns:
+        Non-negative weight
+    """
+    recency = 0.5 ** (max(age_days, 0.0) / half_life_days) if half_life_days > 0 else 1.0
+    return max(impact_score, 0.0) * (1.0 + sentiment_weight * abs(sentiment_score)) * recency
+
+
+def top_k_posts(rows: Iterable[Tuple[int, datetime.datetime, float, float]],
+                window_end: datetime.datetime,
+                config: Optional[Dict[str, Any]] = None) -> List[Tuple[float, int]]:
+    """
+    Select the k most influential posts with a bounded min-heap.
+
+    Args:
+        rows: (post id, published_at, impact_score, sentiment_score) tuples
+        window_end: End of the feature window; ages are measured from here
+        config: Attribution config
+
+    Returns:
+        (weight, post id) pairs, heaviest first, without zero weights
+    """
+    config = config or get_attribution_config()
+    k = config['TOP_K']
+    if k <= 0:
+        return []
+
+    heap: List[Tuple[float, int]] = []
+    for post_id, published_at, impact_score, sentiment_score in rows:
+        age_days = (window_end - published_at).total_seconds() / 86400
+        weight = influence_weight(
+            impact_score, sentiment_score, age_days,
+            config['SENTIMENT_WEIGHT'], config['HALF_LIFE_DAYS']
+        )
+        if weight <= 0:
+            continue
+        if len(heap) < k:
+            heapq.heappush(heap, (weight, post_id))
+        elif weight > heap[0][0]:
+            heapq.heapreplace(heap, (weight, post_id))
+
+    return sorted(heap, reverse=True)
+
+
+def select_influencing_posts(last_date: datetime.date, config: Optional[Dict[str, Any]] = None) -> List[Tuple[float, int]]:
+    """
+    Select the most influential posts of the feature window ending on a date.
+
+    Args:
+        last_date: Last day of history the forecast was made from
+        config: Attribution config
+
+    Returns:
+        (attribution share, post id) pairs, heaviest first; shares sum to 1.0
+    """
+    from rate_predictor.models import Post
+
+    config = config or get_attribution_config()
+    tz = timezone.get_current_timezone()
+    window_end = timezone.make_aware(
+        datetime.datetime.combine(last_date + datetime.timedelta(days=1), datetime.time.min), tz
+    )
+    window_start = window_end - datetime.timedelta(days=config['WINDOW_DAYS'])
+
+    rows = Post.objects.filter(
+        published_at__gte=window_start,
+        published_at__lt=window_end,
+        impact_score__gt=0
+    ).values_list('id', 'published_at', 'impact_score', 'sentiment_score').order_by()
+
+    selected = top_k_posts(rows.iterator(), window_end, config)
+    total = math.fsum(weight for weight, _ in selected)
+    return [(weight / total, post_id) for weight, post_id in selected] if total else []
+
+
+def record_influences(predictions: List, last_date: datetime.date) -> int:
+    """
+    Link saved predictions to the window's most influential posts.
+
+    All predictions of one run come from the same feature window, so they
+    share the selection; the through rows are written in one bulk insert.
+
+    Args:
+        predictions: Saved RatePrediction instances (with primary keys)
+        last_date: Last day of history the forecasts were made from
+
+    Returns:
+        Number of PredictionInfluence rows written
+    """
+    from rate_predictor.models import PredictionInfluence
+
+    selected = select_influencing_posts(last_date)
+    if not selected or not predictions:
+        return 0
+
+    influences = [
+        PredictionInfluence(prediction_id=prediction.pk, post_id=post_id, weight=weight)
+        for prediction in predictions
+        for weight, post_id in selected
+    ]
+    PredictionInfluence.objects.bulk_create(influences)
+    logger.info(f"Attributed {len(predictions)} predictions to {len(selected)} posts")
+    return len(influences)
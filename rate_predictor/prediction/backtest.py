@@ -0,0 +1,245 @@
+"""
+Prediction backtests for ZimRate Predictor
+
+This module scores stored predictions against the official rates that were
+later realized. The predictions and rates tables are read once each, and
+every prediction is matched to its realized rate and to the last rate the
+model had seen; the error metrics are then computed with NumPy, grouped per
+horizon and per model version, and cached until predictions or rates change.
+"""
+
+import logging
+import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+logger = logging.getLogger("backtest")
+
+CACHE_KEY_PREFIX = 'backtest:report'
+
+
+def get_backtest_config() -> Dict[str, Any]:
+    """Get the backtest settings with defaults filled in."""
+    backtest_config = getattr(settings, 'BACKTEST', {})
+    return {
+        'CALIBRATION_TOLERANCE': backtest_config.get('CALIBRATION_TOLERANCE', 0.02),
+        'CALIBRATION_BINS': backtest_config.get('CALIBRATION_BINS', 5),
+        'CACHE_TIMEOUT': backtest_config.get('CACHE_TIMEOUT', 60 * 60),
+    }
+
+
+def load_scored_predictions() -> Dict[str, np.ndarray]:
+    """
+    Join every prediction to its realized rate.
+
+    Predictions and rates are read with one query each and matched by date
+    with NumPy. A prediction's horizon and base rate are taken from the last
+    rate the model saw (its target date minus the stored horizon), not from
+    the day the forecast ran, which is later whenever rates lag.
+
+    Returns:
+        Dictionary of aligned arrays: 'horizon' (days from the last seen rate
+        to target), 'model_version', 'predicted', 'realized', 'base' (last
+        official rate on or before that day, NaN if none) and 'confidence';
+        only predictions whose target date has a rate are included
+    """
+    from rate_predictor.models import ExchangeRate, RatePrediction
+
+    rates = list(ExchangeRate.objects.order_by('date').values_list('date', 'official_rate'))
+    rows = list(
+        RatePrediction.objects.values_list(
+            'prediction_date', 'target_date', 'horizon', 'model_version',
+            'predicted_official_rate', 'confidence_score'
+        ).order_by()
+    )
+    if not rates or not rows:
+        return {}
+
+    rate_dates = np.array([date for date, _ in rates], dtype='datetime64[D]')
+    rate_values = np.array([rate for _, rate in rates], dtype=np.float64)
+
+    prediction_dates, target_dates, horizons, versions, predicted, confidence = zip(*rows)
+    target = np.array(target_dates, dtype='datetime64[D]')
+    # Predictions saved before horizons were stored count from their prediction date
+    horizon = np.array([
+        h if h is not None else (t - p).days
+        for p, t, h in zip(prediction_dates, target_dates, horizons)
+    ], dtype=np.int64)
+    origin = target - horizon.astype('timedelta64[D]')
+
+    position = np.searchsorted(rate_dates, target)
+    found = position < len(rate_dates)
+    found[found] = rate_dates[position[found]] == target[found]
+    if not found.any():
+        return {}
+
+    # Last rate on or before the origin
+    base_position = np.searchsorted(rate_dates, origin, side='right') - 1
+    base = np.where(base_position >= 0, rate_values[np.maximum(base_position, 0)], np.nan)
+
+    return {
+        'horizon': horizon[found],
+        'model_version': np.array(versions, dtype=object)[found],
+        'predicted': np.array(predicted, dtype=np.float64)[found],
+        'realized': rate_values[position[found]],
+        'base': base[found],
+        'confidence': np.array(confidence, dtype=np.float64)[found],
+    }
+
+
+def _grouped_metrics(keys: np.ndarray, scored: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Compute error metrics for each distinct key with bincount reductions.
+
+    Args:
+        keys: Group key per prediction
+        scored: Arrays from load_scored_predictions
+
+    Returns:
+        One metrics dictionary per group, in key order
+    """
+    groups, inverse = np.unique(keys, return_inverse=True)
+    n_groups = len(groups)
+
+    predicted = scored['predicted']
+    realized = scored['realized']
+    base = scored['base']
+
+    abs_error = np.abs(predicted - realized)
+    pct_error = abs_error / realized * 100
+
+    # Direction only counts when there was a previous rate and the rate moved
+    has_move = np.isfinite(base) & (realized != base)
+    correct = has_move & (np.sign(predicted - base) == np.sign(realized - base))
+
+    counts = np.bincount(inverse, minlength=n_groups)
+    mae = np.bincount(inverse, abs_error, n_groups) / counts
+    mape = np.bincount(inverse, pct_error, n_groups) / counts
+    moves = np.bincount(inverse, has_move, n_groups)
+    hits = np.bincount(inverse, correct, n_groups)
+    directional = np.divide(hits, moves, out=np.full(n_groups, np.nan), where=moves > 0)
+    mean_confidence = np.bincount(inverse, scored['confidence'], n_groups) / counts
+
+    return [
+        {
+            'key': groups[i].item() if hasattr(groups[i], 'item') else groups[i],
+            'count': int(counts[i]),
+            'mae': round(float(mae[i]), 4),
+            'mape': round(float(mape[i]), 4),
+            'directional_accuracy': round(float(directional[i]), 4) if moves[i] else None,
+            'mean_confidence': round(float(mean_confidence[i]), 4),
+        }
+        for i in range(n_groups)
+    ]
+
+
+def calibration_table(scored: Dict[str, np.ndarray], tolerance: float, bins: int) -> List[Dict[str, Any]]:
+    """
+    Compare stated confidence with how often predictions landed close.
+
+    A prediction is a hit when it is within `tolerance` (relative) of the
+    realized rate. For a calibrated model the hit rate in each confidence bin
+    matches the bin's mean confidence.
+
+    Returns:
+        One row per non-empty confidence bin
+    """
+    confidence = np.clip(scored['confidence'], 0.0, 1.0)
+    hits = np.abs(scored['predicted'] - scored['realized']) <= tolerance * scored['realized']
+
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    index = np.minimum(np.searchsorted(edges, confidence, side='right') - 1, bins - 1)
+    counts = np.bincount(index, minlength=bins)
+    hit_counts = np.bincount(index, hits, bins)
+    confidence_sums = np.bincount(index, confidence, bins)
+
+    return [
+        {
+            'range': [round(float(edges[i]), 2), round(float(edges[i + 1]), 2)],
+            'count': int(counts[i]),
+            'mean_confidence': round(float(confidence_sums[i] / counts[i]), 4),
+            'hit_rate': round(float(hit_counts[i] / counts[i]), 4),
+        }
+        for i in range(bins) if counts[i]
+    ]
+
+
+def compute_backtest() -> Dict[str, Any]:
+    """
+    Score all stored predictions.
+
+    Returns:
+        Report with 'overall', 'by_horizon', 'by_model_version' and
+        'by_model_version_horizon' metrics and a 'calibration' table
+    """
+    backtest_config = get_backtest_config()
+    scored = load_scored_predictions()
+    if not scored:
+        return {'count': 0, 'by_horizon': [], 'by_model_version': [],
+                'by_model_version_horizon': [], 'calibration': [], 'overall': None}
+
+    horizon = scored['horizon']
+    versions = scored['model_version'].astype(str)
+
+    by_horizon = _grouped_metrics(horizon, scored)
+    for row in by_horizon:
+        row['horizon'] = row.pop('key')
+
+    by_version = _grouped_metrics(versions, scored)
+    for row in by_version:
+        row['model_version'] = row.pop('key')
+
+    combined = np.char.add(np.char.add(versions, '|'), horizon.astype(str))
+    by_version_horizon = _grouped_metrics(combined, scored)
+    for row in by_version_horizon:
+        version, h = row.pop('key').rsplit('|', 1)
+        row['model_version'] = version
+        row['horizon'] = int(h)
+
+    overall = _grouped_metrics(np.zeros(len(horizon), dtype=np.int64), scored)[0]
+    overall.pop('key')
+
+    return {
+        'count': int(len(horizon)),
+        'overall': overall,
+        'by_horizon': by_horizon,
+        'by_model_version': by_version,
+        'by_model_version_horizon': by_version_horizon,
+        'calibration': calibration_table(
+            scored,
+            backtest_config['CALIBRATION_TOLERANCE'],
+            backtest_config['CALIBRATION_BINS']
+        ),
+        'calibration_tolerance': backtest_config['CALIBRATION_TOLERANCE'],
+        'computed_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+
+def _data_version() -> str:
+    """Cheap fingerprint of the predictions and rates the report depends on."""
+    from rate_predictor.models import ExchangeRate, RatePrediction
+
+    predictions = RatePrediction.objects.aggregate(count=Count('id'), last=Max('id'))
+    rates = ExchangeRate.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    updated = rates['updated'].timestamp() if rates['updated'] else 0
+    return f"{predictions['count']}-{predictions['last']}-{rates['count']}-{updated}"
+
+
+def get_backtest_report() -> Dict[str, Any]:
+    """
+    Get the backtest report, computing it only when the data has changed.
+
+    Returns:
+        Report from compute_backtest
+    """
+    cache_key = f"{CACHE_KEY_PREFIX}:{_data_version()}"
+    report = cache.get(cache_key)
+    if report is None:
+        report = compute_backtest()
+        cache.set(cache_key, report, get_backtest_config()['CACHE_TIMEOUT'])
+        logger.info(f"Computed backtest over {report['count']} predictions")
+    return report
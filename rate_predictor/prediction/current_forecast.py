@@ -0,0 +1,176 @@
+"""
+Current forecast for ZimRate Predictor
+
+This module maintains the CurrentForecast table, which holds only the latest
+prediction for each upcoming target date and horizon, and a cached,
+pre-serialized copy of it for the prediction API and home page. The table
+is rebuilt in one transaction whenever predictions are generated, so
+readers see either the old or the new forecast, never a mix; requests then
+only slice the cached payload.
+"""
+
+import json
+import logging
+import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from rate_predictor.prediction.intervals import interval_from_quantiles
+
+logger = logging.getLogger("current_forecast")
+
+CACHE_KEY = 'forecast:current'
+
+
+def get_current_forecast_config() -> Dict[str, Any]:
+    """Get the current forecast settings with defaults filled in."""
+    forecast_config = getattr(settings, 'CURRENT_FORECAST', {})
+    return {
+        'MAX_DAYS': forecast_config.get('MAX_DAYS', 30),
+        'CACHE_TIMEOUT': forecast_config.get('CACHE_TIMEOUT', 24 * 60 * 60),
+    }
+
+
+def rebuild_current_forecast(today: Optional[datetime.date] = None) -> int:
+    """
+    Replace the CurrentForecast table with the latest predictions.
+
+    Args:
+        today: First target date to keep (defaults to today)
+
+    Returns:
+        Number of rows written
+    """
+    from rate_predictor.models import CurrentForecast, RatePrediction
+
+    today = today or timezone.now().date()
+    predictions = RatePrediction.objects.filter(
+        target_date__gte=today
+    ).order_by('target_date', '-prediction_date', '-id')
+
+    rows = {}
+    for prediction in predictions:
+        horizon = prediction.forecast_horizon
+        key = (prediction.target_date, horizon)
+        if key in rows:
+            continue
+        rows[key] = CurrentForecast(
+            target_date=prediction.target_date,
+            horizon=horizon,
+            prediction=prediction,
+            prediction_date=prediction.prediction_date,
+            predicted_official_rate=prediction.predicted_official_rate,
+            predicted_parallel_rate=prediction.predicted_parallel_rate,
+            confidence_score=prediction.confidence_score,
+            model_version=prediction.model_version,
+            quantiles=prediction.quantiles
+        )
+
+    with transaction.atomic():
+        CurrentForecast.objects.all().delete()
+        CurrentForecast.objects.bulk_create(rows.values())
+        transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+    logger.info(f"Rebuilt current forecast with {len(rows)} rows")
+    return len(rows)
+
+
+def _serialize(forecast) -> bytes:
+    return json.dumps({
+        'prediction_date': forecast.prediction_date.isoformat(),
+        'target_date': forecast.target_date.isoformat(),
+        'horizon': forecast.horizon,
+        'predicted_official_rate': float(forecast.predicted_official_rate),
+        'predicted_parallel_rate': (
+            float(forecast.predicted_parallel_rate) if forecast.predicted_parallel_rate else None
+        ),
+        'confidence_score': forecast.confidence_score,
+        'model_version': forecast.model_version,
+        'quantiles': forecast.quantiles,
+        'interval': interval_from_quantiles(forecast.quantiles),
+    }).encode()
+
+
+def _build_entries(forecasts: Iterable) -> List[Dict[str, Any]]:
+    forecast_config = get_current_forecast_config()
+    entries = []
+    last_target = None
+    for forecast in forecasts:
+        # Rows come per target date with the shortest (most recent) horizon first
+        if forecast.target_date == last_target:
+            continue
+        last_target = forecast.target_date
+        entries.append({
+            'target_date': forecast.target_date,
+            'horizon': forecast.horizon,
+            'predicted_official_rate': forecast.predicted_official_rate,
+            'confidence_score': forecast.confidence_score,
+            'json': _serialize(forecast),
+        })
+        if len(entries) >= forecast_config['MAX_DAYS']:
+            break
+    return entries
+
+
+def _upcoming(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Target dates can pass between rebuilds
+    today = timezone.now().date()
+    return [entry for entry in entries if entry['target_date'] >= today]
+
+
+def get_current_forecast() -> List[Dict[str, Any]]:
+    """
+    Get the latest forecast for each target date, from the cache if possible.
+
+    Returns:
+        Up to MAX_DAYS entries ordered by target date, each with
+        'target_date', 'predicted_official_rate', 'confidence_score', the
+        shortest 'horizon' available and the row pre-serialized as 'json'
+    """
+    entries = cache.get(CACHE_KEY)
+    if entries is None:
+        from rate_predictor.models import CurrentForecast
+
+        entries = _build_entries(CurrentForecast.objects.all())
+        cache.set(CACHE_KEY, entries, get_current_forecast_config()['CACHE_TIMEOUT'])
+    return _upcoming(entries)
+
+
+async def aget_current_forecast() -> List[Dict[str, Any]]:
+    """Async version of get_current_forecast()."""
+    entries = await cache.aget(CACHE_KEY)
+    if entries is None:
+        from rate_predictor.models import CurrentForecast
+
+        # The table only holds upcoming target dates, so reading it whole is cheap
+        entries = _build_entries([forecast async for forecast in CurrentForecast.objects.all()])
+        await cache.aset(CACHE_KEY, entries, get_current_forecast_config()['CACHE_TIMEOUT'])
+    return _upcoming(entries)
+
+
+def _payload(entries: List[Dict[str, Any]], days: int) -> bytes:
+    days = max(0, min(days, get_current_forecast_config()['MAX_DAYS']))
+    rows = b', '.join(entry['json'] for entry in entries[:days])
+    return b'{"status": "success", "data": [' + rows + b']}'
+
+
+def current_forecast_payload(days: int) -> bytes:
+    """
+    Build the prediction API response body from pre-serialized rows.
+
+    Args:
+        days: Number of target dates requested (capped at MAX_DAYS)
+
+    Returns:
+        JSON document with 'status' and 'data'
+    """
+    return _payload(get_current_forecast(), days)
+
+
+async def acurrent_forecast_payload(days: int) -> bytes:
+    """Async version of current_forecast_payload()."""
+    return _payload(await aget_current_forecast(), days)
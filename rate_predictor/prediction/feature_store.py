@@ -0,0 +1,377 @@
+"""
+Daily feature store for ZimRate Predictor
+
+This module keeps one row of features per day on disk as a memory-mapped
+float64 matrix: rates (forward-filled over missing days), lagged rates, log
+returns, and per source_type sentiment counts, mean sentiment, impact sums
+and post volume. Training, backtesting and the dashboard read column and
+date-range views straight out of the mapping, without copying or querying
+the database.
+
+After each scrape only the new days, plus a short tail of recent days that
+late posts can still change, are computed and written. The matrix lives in
+a raw data file next to a small JSON metadata file naming it. Files that
+readers may have mapped are never written to: each update writes a new
+generation of the data file and then replaces the metadata atomically, so
+readers never see a partial row.
+"""
+
+import os
+import json
+import uuid
+import logging
+import datetime
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+from rate_predictor.prediction.forecaster import forward_fill
+
+logger = logging.getLogger("feature_store")
+
+DTYPE = np.float64
+SOURCE_TYPES = ('news', 'social')
+SENTIMENTS = ('positive', 'neutral', 'negative')
+
+
+def get_feature_store_config() -> Dict[str, Any]:
+    """Get the feature store settings with defaults filled in."""
+    store_config = getattr(settings, 'FEATURE_STORE', {})
+    return {
+        'PATH': Path(store_config.get('PATH', Path(settings.BASE_DIR) / 'feature_store')),
+        'RATE_LAGS': store_config.get('RATE_LAGS', 3),
+        'REFRESH_DAYS': store_config.get('REFRESH_DAYS', 7),
+    }
+
+
+def get_columns(rate_lags: int) -> List[str]:
+    """
+    Get the ordered column names of the feature matrix.
+
+    Args:
+        rate_lags: Number of lagged rate columns per series
+
+    Returns:
+        List of column names
+    """
+    columns = []
+    for series in ('official', 'parallel'):
+        columns.append(f'{series}_rate')
+        columns.extend(f'{series}_rate_lag_{lag}' for lag in range(1, rate_lags + 1))
+        columns.append(f'{series}_log_return')
+    columns.append('rate_observed')
+
+    for source_type in SOURCE_TYPES:
+        columns.extend(f'{source_type}_{sentiment}' for sentiment in SENTIMENTS)
+        columns.extend([
+            f'{source_type}_sentiment_mean',
+            f'{source_type}_impact_sum',
+            f'{source_type}_post_count',
+        ])
+    columns.extend(['sentiment_mean', 'impact_sum', 'post_count'])
+    return columns
+
+
+class FeatureStore:
+    """Read-only view of the on-disk daily feature matrix."""
+
+    def __init__(self, path: Path, meta: Dict[str, Any], version: Optional[int] = None):
+        self.path = path
+        self.meta = meta
+        self.version = version  # Metadata file mtime; changes with every write
+        self.columns = meta['columns']
+        self.start_date = datetime.date.fromisoformat(meta['start_date'])
+        self.n_days = meta['n_days']
+        self._index = {name: i for i, name in enumerate(self.columns)}
+
+        if self.n_days:
+            self.matrix = np.memmap(
+                path / meta['data_file'], dtype=DTYPE, mode='r',
+                shape=(self.n_days, len(self.columns))
+            )
+        else:
+            self.matrix = np.empty((0, len(self.columns)), dtype=DTYPE)
+
+    @property
+    def end_date(self) -> Optional[datetime.date]:
+        """Last day stored, or None for an empty store."""
+        if not self.n_days:
+            return None
+        return self.start_date + datetime.timedelta(days=self.n_days - 1)
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Dates of the stored rows as datetime64[D]."""
+        start = np.datetime64(self.start_date, 'D')
+        return np.arange(start, start + self.n_days)
+
+    def row_index(self, date: datetime.date) -> int:
+        """Row number of a date (may fall outside the stored range)."""
+        return (date - self.start_date).days
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one column over all days."""
+        return self.matrix[:, self._index[name]]
+
+    def window(self, start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None) -> np.ndarray:
+        """
+        Zero-copy view of the rows between two dates (inclusive).
+
+        Args:
+            start_date: First day (defaults to the first stored day)
+            end_date: Last day (defaults to the last stored day)
+
+        Returns:
+            Matrix view clipped to the stored range
+        """
+        start = max(self.row_index(start_date), 0) if start_date else 0
+        end = min(self.row_index(end_date) + 1, self.n_days) if end_date else self.n_days
+        return self.matrix[start:max(start, end)]
+
+    def window_dates(self, start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None) -> np.ndarray:
+        """Dates matching window() for the same arguments."""
+        start = max(self.row_index(start_date), 0) if start_date else 0
+        end = min(self.row_index(end_date) + 1, self.n_days) if end_date else self.n_days
+        return self.dates[start:max(start, end)]
+
+    def index(self, name: str) -> int:
+        """Column number of a feature, for slicing window() results."""
+        return self._index[name]
+
+
+# One mapping per process, reopened only when the metadata file changes
+_store = None
+_store_mtime = None
+_store_lock = threading.Lock()
+
+
+def _read_meta(path: Path) -> Optional[Dict[str, Any]]:
+    meta_path = path / 'meta.json'
+    if not meta_path.exists():
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def get_feature_store() -> Optional[FeatureStore]:
+    """
+    Get the feature store for this process.
+
+    The metadata file is stat'ed on every call and the data re-mapped only
+    when a writer has replaced it.
+
+    Returns:
+        FeatureStore or None if the store has not been built yet
+    """
+    global _store, _store_mtime
+
+    path = get_feature_store_config()['PATH']
+    try:
+        mtime = os.stat(path / 'meta.json').st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    if _store is not None and _store_mtime == mtime and _store.path == path:
+        return _store
+
+    with _store_lock:
+        meta = _read_meta(path)
+        if meta is None:
+            return None
+        _store = FeatureStore(path, meta, version=mtime)
+        _store_mtime = mtime
+    return _store
+
+
+def _write_meta(path: Path, meta: Dict[str, Any]) -> None:
+    tmp_path = path / f'meta.{uuid.uuid4().hex}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, path / 'meta.json')
+
+
+def compute_rows(
+    start_date: datetime.date,
+    end_date: datetime.date,
+    columns: List[str],
+    rate_lags: int,
+    previous: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Compute feature rows for a date range with two aggregate queries.
+
+    Args:
+        start_date: First day to compute
+        end_date: Last day to compute
+        columns: Column names from get_columns
+        rate_lags: Number of lagged rate columns per series
+        previous: Up to max(rate_lags, 1) stored rows immediately before
+                  start_date, used to seed forward fills, lags and returns
+
+    Returns:
+        Array of shape (days, len(columns))
+    """
+    from rate_predictor.models import ExchangeRate, Post
+
+    n_days = (end_date - start_date).days + 1
+    index = {name: i for i, name in enumerate(columns)}
+    rows = np.zeros((n_days, len(columns)), dtype=DTYPE)
+    n_previous = 0 if previous is None else len(previous)
+
+    official = np.full(n_days, np.nan)
+    parallel = np.full(n_days, np.nan)
+    for date, official_rate, parallel_rate in ExchangeRate.objects.filter(
+        date__range=(start_date, end_date)
+    ).values_list('date', 'official_rate', 'parallel_rate').order_by():
+        i = (date - start_date).days
+        official[i] = float(official_rate)
+        if parallel_rate is not None:
+            parallel[i] = float(parallel_rate)
+    rows[:, index['rate_observed']] = np.isfinite(official)
+
+    for series, values in (('official', official), ('parallel', parallel)):
+        rate_column = index[f'{series}_rate']
+        history = previous[:, rate_column] if n_previous else np.zeros(0)
+        # Forward fill across the boundary with the stored rows
+        filled = forward_fill(np.concatenate([history, values]))
+        rows[:, rate_column] = filled[n_previous:]
+
+        # Pad so row i of the range always has `offset` earlier values before it
+        offset = max(rate_lags, 1)
+        padded = np.concatenate([np.full(offset - n_previous, np.nan), filled])
+        for lag in range(1, rate_lags + 1):
+            rows[:, index[f'{series}_rate_lag_{lag}']] = padded[offset - lag:len(padded) - lag]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rows[:, index[f'{series}_log_return']] = np.log(padded[offset:] / padded[offset - 1:-1])
+
+    sentiment_counts = {
+        sentiment: Count('id', filter=Q(sentiment=sentiment)) for sentiment in SENTIMENTS
+    }
+    daily_posts = Post.objects.filter(
+        published_at__date__range=(start_date, end_date)
+    ).annotate(day=TruncDate('published_at')).values('day', 'source_type').annotate(
+        count=Count('id'),
+        mean_score=Avg('sentiment_score'),
+        impact=Sum('impact_score'),
+        **sentiment_counts
+    ).order_by()
+
+    sentiment_sum = np.zeros(n_days)
+    for row in daily_posts:
+        if row['source_type'] not in SOURCE_TYPES:
+            continue
+        i = (row['day'] - start_date).days
+        source_type = row['source_type']
+        for sentiment in SENTIMENTS:
+            rows[i, index[f'{source_type}_{sentiment}']] = row[sentiment]
+        rows[i, index[f'{source_type}_sentiment_mean']] = row['mean_score'] or 0.0
+        rows[i, index[f'{source_type}_impact_sum']] = row['impact'] or 0.0
+        rows[i, index[f'{source_type}_post_count']] = row['count']
+        sentiment_sum[i] += (row['mean_score'] or 0.0) * row['count']
+
+    post_count = sum(rows[:, index[f'{source_type}_post_count']] for source_type in SOURCE_TYPES)
+    rows[:, index['post_count']] = post_count
+    rows[:, index['impact_sum']] = sum(rows[:, index[f'{source_type}_impact_sum']] for source_type in SOURCE_TYPES)
+    rows[:, index['sentiment_mean']] = np.divide(
+        sentiment_sum, post_count, out=np.zeros(n_days), where=post_count > 0
+    )
+
+    return rows
+
+
+def update_feature_store(since: Optional[datetime.date] = None, rebuild: bool = False) -> int:
+    """
+    Append new days to the feature store and refresh its recent tail.
+
+    Args:
+        since: Recompute every day from this date on (e.g. after backfilling
+               rates); dates before the first stored day trigger a rebuild
+        rebuild: Recompute the whole store into a fresh data file
+
+    Returns:
+        Number of rows written
+    """
+    from rate_predictor.caching import bump_data_version
+    from rate_predictor.models import ExchangeRate
+
+    store_config = get_feature_store_config()
+    path = store_config['PATH']
+    rate_lags = store_config['RATE_LAGS']
+    columns = get_columns(rate_lags)
+
+    dates = ExchangeRate.objects.order_by('date').values_list('date', flat=True)
+    first_rate = dates.first()
+    last_rate = dates.last()
+    if first_rate is None:
+        logger.info("No exchange rates stored, feature store not updated")
+        return 0
+
+    meta = _read_meta(path)
+    if meta is not None and (meta['columns'] != columns or meta['n_days'] == 0):
+        rebuild = True
+    if meta is not None and not rebuild:
+        stored_start = datetime.date.fromisoformat(meta['start_date'])
+        if first_rate < stored_start or (since and since < stored_start):
+            rebuild = True
+
+    previous_file = meta['data_file'] if meta is not None else None
+    if meta is None or rebuild:
+        start_date = first_rate
+        meta = {
+            'columns': columns,
+            'start_date': start_date.isoformat(),
+            'n_days': 0,
+            'data_file': None,
+        }
+        path.mkdir(parents=True, exist_ok=True)
+        write_from = 0
+    else:
+        start_date = datetime.date.fromisoformat(meta['start_date'])
+        write_from = max(meta['n_days'] - store_config['REFRESH_DAYS'], 0)
+        if since:
+            write_from = min(write_from, (since - start_date).days)
+
+    n_days = max((last_rate - start_date).days + 1, meta['n_days'])
+    if write_from >= n_days:
+        return 0
+
+    # Readers may have the current file mapped: write a new generation
+    data_file = f'features-{uuid.uuid4().hex[:12]}.f64'
+    matrix = np.memmap(path / data_file, dtype=DTYPE, mode='w+', shape=(n_days, len(columns)))
+    if write_from:
+        current = np.memmap(path / previous_file, dtype=DTYPE, mode='r', shape=(meta['n_days'], len(columns)))
+        matrix[:write_from] = current[:write_from]
+        del current
+
+    seed_rows = max(rate_lags, 1)
+    previous = np.array(matrix[max(write_from - seed_rows, 0):write_from]) if write_from else None
+    matrix[write_from:] = compute_rows(
+        start_date + datetime.timedelta(days=write_from),
+        start_date + datetime.timedelta(days=n_days - 1),
+        columns,
+        rate_lags,
+        previous
+    )
+    matrix.flush()
+    del matrix
+
+    meta['n_days'] = n_days
+    meta['data_file'] = data_file
+    _write_meta(path, meta)
+    bump_data_version('FeatureStore')
+
+    # The previous generation is kept for readers that have just read the old
+    # metadata; processes still mapping an older file keep it until they reopen
+    for old_file in path.glob('features-*.f64'):
+        if old_file.name not in (data_file, previous_file):
+            old_file.unlink()
+
+    written = n_days - write_from
+    logger.info(f"Feature store updated: {written} rows written, {n_days} days up to {start_date + datetime.timedelta(days=n_days - 1)}")
+    return written
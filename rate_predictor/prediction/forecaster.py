@@ -0,0 +1,487 @@
+"""
+Exchange rate forecaster for ZimRate Predictor
+
+This module fits an ARIMAX-style model to the daily exchange rate history,
+with daily post sentiment as the exogenous input, and writes the forecasts as
+RatePrediction rows.
+
+The model works on log rates. Its regressors are lags of the d-times
+differenced log rate, lagged one-step residuals standing in for the MA terms
+(Hannan-Rissanen) and lags of the daily mean sentiment. Every horizon gets its
+own coefficient column (direct multi-step forecasting), so fitting is a single
+ridge-regularized least squares solve for all horizons and forecasting is a
+single matrix product. Because all horizons share the same regressors, the
+fitted state is also cheap to update one day at a time (see online.py).
+"""
+
+import logging
+import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from rate_predictor.prediction.intervals import forecast_quantiles
+
+logger = logging.getLogger("forecaster")
+
+SUPPORTED_MODEL_TYPES = ('arima',)
+
+
+def get_forecasting_config() -> Dict[str, Any]:
+    """Get the forecasting settings with defaults filled in."""
+    forecasting_config = getattr(settings, 'FORECASTING', {})
+    return {
+        'MODEL_TYPE': getattr(settings, 'ML_MODEL_TYPE', 'arima'),
+        'HISTORICAL_WINDOW': getattr(settings, 'HISTORICAL_WINDOW', 60),
+        'PREDICTION_WINDOW': getattr(settings, 'PREDICTION_WINDOW', 7),
+        'AR_ORDER': forecasting_config.get('AR_ORDER', 3),
+        'DIFFERENCE': forecasting_config.get('DIFFERENCE', 1),
+        'MA_ORDER': forecasting_config.get('MA_ORDER', 1),
+        'SENTIMENT_LAGS': forecasting_config.get('SENTIMENT_LAGS', 2),
+        'RIDGE': forecasting_config.get('RIDGE', 1e-4),
+        'MIN_TRAINING_SAMPLES': forecasting_config.get('MIN_TRAINING_SAMPLES', 20),
+        'CONFIDENCE_SCALE': forecasting_config.get('CONFIDENCE_SCALE', 10.0),
+        'FORGETTING_FACTOR': forecasting_config.get(
+            'FORGETTING_FACTOR', 1.0 - 1.0 / getattr(settings, 'HISTORICAL_WINDOW', 60)
+        ),
+    }
+
+
+def forward_fill(values: np.ndarray) -> np.ndarray:
+    """Fill NaN gaps with the last observed value (leading NaNs are kept)."""
+    mask = np.isfinite(values)
+    index = np.where(mask, np.arange(len(values)), 0)
+    np.maximum.accumulate(index, out=index)
+    filled = values[index]
+    filled[~mask & (np.cumsum(mask) == 0)] = np.nan
+    return filled
+
+
+def load_daily_history(end_date: Optional[datetime.date] = None, days: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Load rates and daily sentiment onto a continuous daily grid.
+
+    When the feature store covers the requested days the arrays are views of
+    its memory mapping; otherwise they are built from the database.
+
+    Args:
+        end_date: Last day to load (defaults to the latest stored rate)
+        days: Number of days to load (defaults to HISTORICAL_WINDOW)
+
+    Returns:
+        Dictionary of aligned arrays: 'dates', 'official', 'parallel' (rates
+        forward-filled over missing days), 'sentiment' (daily mean score, 0.0
+        on days without posts) and 'post_count'
+    """
+    from rate_predictor.prediction.feature_store import get_feature_store
+
+    days = days or get_forecasting_config()['HISTORICAL_WINDOW']
+
+    store = get_feature_store()
+    if store is not None and store.n_days and (end_date is None or end_date <= store.end_date):
+        end_date = end_date or store.end_date
+        start_date = end_date - datetime.timedelta(days=days - 1)
+        window = store.window(start_date, end_date)
+        if len(window):
+            return {
+                'dates': store.window_dates(start_date, end_date),
+                'official': window[:, store.index('official_rate')],
+                'parallel': window[:, store.index('parallel_rate')],
+                'sentiment': window[:, store.index('sentiment_mean')],
+                'post_count': window[:, store.index('post_count')],
+            }
+
+    from rate_predictor.models import ExchangeRate, Post
+
+    if end_date is None:
+        end_date = ExchangeRate.objects.order_by('-date').values_list('date', flat=True).first()
+        if end_date is None:
+            return {}
+    start_date = end_date - datetime.timedelta(days=days - 1)
+
+    dates = np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1)
+    official = np.full(len(dates), np.nan)
+    parallel = np.full(len(dates), np.nan)
+    sentiment = np.zeros(len(dates))
+    post_count = np.zeros(len(dates), dtype=np.int64)
+
+    for date, official_rate, parallel_rate in ExchangeRate.objects.filter(
+        date__range=(start_date, end_date)
+    ).values_list('date', 'official_rate', 'parallel_rate').order_by():
+        i = (date - start_date).days
+        official[i] = float(official_rate)
+        if parallel_rate is not None:
+            parallel[i] = float(parallel_rate)
+
+    daily_sentiment = Post.objects.filter(
+        published_at__date__range=(start_date, end_date)
+    ).annotate(day=TruncDate('published_at')).values('day').annotate(
+        mean_score=Avg('sentiment_score'), count=Count('id')
+    ).order_by()
+    for row in daily_sentiment:
+        i = (row['day'] - start_date).days
+        sentiment[i] = row['mean_score'] or 0.0
+        post_count[i] = row['count']
+
+    return {
+        'dates': dates,
+        'official': forward_fill(official),
+        'parallel': forward_fill(parallel),
+        'sentiment': sentiment,
+        'post_count': post_count,
+    }
+
+
+def lag_matrix(values: np.ndarray, lags: int) -> np.ndarray:
+    """
+    Build a matrix whose row t holds values[t], values[t-1], ..., values[t-lags+1].
+
+    Rows without a full history are NaN.
+    """
+    matrix = np.full((len(values), lags), np.nan)
+    if lags and len(values) >= lags:
+        matrix[lags - 1:] = sliding_window_view(values, lags)[:, ::-1]
+    return matrix
+
+
+def long_ar_order(config: Dict[str, Any]) -> int:
+    """Order of the long AR fit used to estimate the MA shocks."""
+    return max(config['AR_ORDER'] + config['MA_ORDER'], 4)
+
+
+def difference_series(levels: np.ndarray, d: int) -> np.ndarray:
+    """Difference a series d times, keeping it aligned (the first d values are NaN)."""
+    differenced = np.full(len(levels), np.nan)
+    if len(levels) > d:
+        differenced[d:] = np.diff(levels, n=d)
+    return differenced
+
+
+def one_step_residuals(differenced: np.ndarray, order: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Estimate the shocks of the differenced series (Hannan-Rissanen first stage).
+
+    Args:
+        differenced: Differenced log rates (leading NaN allowed)
+        order: Order of the long AR fit
+
+    Returns:
+        Tuple of the residual series (NaN where unavailable) and the long AR
+        coefficients, intercept first (None if there were too few rows)
+    """
+    residuals = np.full(len(differenced), np.nan)
+    if len(differenced) < 2:
+        return residuals, None
+
+    long_lags = lag_matrix(differenced, order)
+    X = np.column_stack([np.ones(len(differenced) - 1), long_lags[:-1]])
+    y = differenced[1:]
+    rows = np.isfinite(X).all(axis=1) & np.isfinite(y)
+    if rows.sum() <= X.shape[1]:
+        return residuals, None
+
+    beta = np.linalg.lstsq(X[rows], y[rows], rcond=None)[0]
+    residuals[1:][rows] = y[rows] - X[rows] @ beta
+    return residuals, beta
+
+
+def build_features(levels: np.ndarray, sentiment: np.ndarray, config: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Build the regressor matrix for every day of the grid.
+
+    Args:
+        levels: Log rates on the daily grid
+        sentiment: Daily mean sentiment on the same grid
+        config: Forecasting config
+
+    Returns:
+        Tuple of the feature array of shape (days, k), where rows lacking
+        enough history contain NaN, and a dictionary with the 'differenced'
+        series, the one-step 'residuals' and the long AR coefficients 'hr_beta'
+    """
+    d = config['DIFFERENCE']
+    p = config['AR_ORDER']
+    q = config['MA_ORDER']
+
+    differenced = difference_series(levels, d)
+
+    ar_lags = lag_matrix(differenced, p)
+    columns = [np.ones((len(levels), 1)), ar_lags]
+
+    residuals = np.full(len(levels), np.nan)
+    hr_beta = None
+    if q:
+        residuals, hr_beta = one_step_residuals(differenced, long_ar_order(config))
+        columns.append(lag_matrix(residuals, q))
+
+    if config['SENTIMENT_LAGS']:
+        columns.append(lag_matrix(sentiment, config['SENTIMENT_LAGS']))
+
+    parts = {'differenced': differenced, 'residuals': residuals, 'hr_beta': hr_beta}
+    return np.column_stack(columns), parts
+
+
+def build_targets(levels: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Build the cumulative log change targets for every horizon.
+
+    Returns:
+        Array of shape (days, horizon) where row t holds levels[t+h] - levels[t]
+        for h = 1..horizon; the last rows are NaN
+    """
+    targets = np.full((len(levels), horizon), np.nan)
+    if len(levels) > horizon:
+        targets[:-horizon] = sliding_window_view(levels, horizon + 1)[:, 1:] - levels[:-horizon, None]
+    return targets
+
+
+def ridge_penalty(k: int, ridge: float) -> np.ndarray:
+    """Diagonal ridge penalty that leaves the intercept unpenalized."""
+    penalty = np.full(k, ridge)
+    penalty[0] = 0.0
+    return np.diag(penalty)
+
+
+def solve_coefficients(XtX: np.ndarray, XtY: np.ndarray, ridge: float) -> np.ndarray:
+    """Solve the ridge normal equations for all horizons at once."""
+    return np.linalg.solve(XtX + ridge_penalty(XtX.shape[0], ridge), XtY)
+
+
+def fit_model(rates: np.ndarray, sentiment: np.ndarray, config: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Fit the forecaster on a daily rate series.
+
+    Args:
+        rates: Daily rates (forward-filled, leading NaN allowed)
+        sentiment: Daily mean sentiment on the same grid
+        config: Forecasting config (defaults to settings)
+
+    Returns:
+        Model dictionary with 'coefficients' (k x horizons), 'sigma' (residual
+        std per horizon), 'n_obs', 'last_features', 'last_level' and
+        'residual_pool' (residual rows for bootstrapped intervals), plus the
+        state needed for online updates ('P', 'sse', 'weight', 'hr_beta' and
+        the recent 'levels', 'differenced', 'residuals', 'sentiment' and
+        'feature_rows' buffers), or None if there is not enough history
+    """
+    config = config or get_forecasting_config()
+    horizon = config['PREDICTION_WINDOW']
+
+    observed = np.isfinite(rates) & (rates > 0)
+    if not observed.any():
+        return None
+    start = int(np.argmax(observed))
+    levels = np.log(rates[start:])
+    sentiment = sentiment[start:]
+
+    features, parts = build_features(levels, sentiment, config)
+    targets = build_targets(levels, horizon)
+
+    rows = np.isfinite(features).all(axis=1) & np.isfinite(targets).all(axis=1)
+    n_obs = int(rows.sum())
+    if n_obs < max(config['MIN_TRAINING_SAMPLES'], features.shape[1] + 1):
+        logger.warning(f"Not enough history to fit the model ({n_obs} usable days)")
+        return None
+    if not np.isfinite(features[-1]).all():
+        logger.warning("Latest day lacks the history needed for a forecast")
+        return None
+
+    X = features[rows]
+    Y = targets[rows]
+    XtX = X.T @ X
+    XtY = X.T @ Y
+    coefficients = solve_coefficients(XtX, XtY, config['RIDGE'])
+
+    residuals = Y - X @ coefficients
+    sse = (residuals ** 2).sum(axis=0)
+    sigma = np.sqrt(sse / max(n_obs - X.shape[1], 1))
+    # In-sample residuals understate the error; rescale them to the unbiased variance
+    residual_pool = residuals * np.sqrt(n_obs / max(n_obs - X.shape[1], 1))
+
+    q = config['MA_ORDER']
+    sentiment_lags = config['SENTIMENT_LAGS']
+    return {
+        'coefficients': coefficients,
+        'sigma': sigma,
+        'n_obs': n_obs,
+        'last_features': features[-1],
+        'last_level': levels[-1],
+        'residual_pool': residual_pool,
+        'P': np.linalg.inv(XtX + ridge_penalty(X.shape[1], config['RIDGE'])),
+        'sse': sse,
+        'weight': float(n_obs),
+        'hr_beta': parts['hr_beta'] if parts['hr_beta'] is not None else np.zeros(0),
+        'levels': levels[-max(horizon + 1, config['DIFFERENCE'] + 1):],
+        'differenced': parts['differenced'][-long_ar_order(config):],
+        'residuals': parts['residuals'][-q:] if q else np.zeros(0),
+        'sentiment': sentiment[-sentiment_lags:] if sentiment_lags else np.zeros(0),
+        'feature_rows': features[-(horizon + 1):],
+    }
+
+
+def forecast(model: Dict[str, Any]) -> np.ndarray:
+    """
+    Forecast every horizon from the latest day in one call.
+
+    Args:
+        model: Fitted model from fit_model
+
+    Returns:
+        Array of forecast rates, one per horizon
+    """
+    return np.exp(model['last_level'] + model['last_features'] @ model['coefficients'])
+
+
+def confidence_from_sigma(sigma: np.ndarray, scale: float) -> np.ndarray:
+    """Map residual log-rate std per horizon to a 0-1 confidence score."""
+    return np.clip(np.exp(-scale * sigma), 0.0, 1.0)
+
+
+def _to_decimal(value: float) -> Decimal:
+    return Decimal(str(round(float(value), 2)))
+
+
+def save_predictions(
+    prediction_date: datetime.date,
+    last_date: datetime.date,
+    official: np.ndarray,
+    confidence: np.ndarray,
+    parallel: Optional[np.ndarray] = None,
+    model_version: str = '',
+    quantiles: Optional[List[Dict[str, float]]] = None
+) -> int:
+    """
+    Replace the predictions made on a date with a new set, in one bulk insert,
+    link them to the posts that most influenced them and refresh the current
+    forecast.
+
+    Args:
+        prediction_date: Date the predictions are made on
+        last_date: Last observed rate date; horizon h targets last_date + h
+        official: Forecast official rates per horizon
+        confidence: Confidence score per horizon
+        parallel: Forecast parallel rates per horizon, if available
+        model_version: Registry version that made the forecasts
+        quantiles: Official rate quantiles per horizon, from forecast_quantiles
+
+    Returns:
+        Number of predictions written
+    """
+    from rate_predictor.models import RatePrediction
+    from rate_predictor.caching import bump_data_version
+    from rate_predictor.prediction.attribution import record_influences
+    from rate_predictor.prediction.current_forecast import rebuild_current_forecast
+
+    predictions = [
+        RatePrediction(
+            prediction_date=prediction_date,
+            target_date=last_date + datetime.timedelta(days=h + 1),
+            horizon=h + 1,
+            predicted_official_rate=_to_decimal(official[h]),
+            predicted_parallel_rate=_to_decimal(parallel[h]) if parallel is not None else None,
+            confidence_score=float(confidence[h]),
+            model_version=model_version,
+            quantiles=quantiles[h] if quantiles else {}
+        )
+        for h in range(len(official))
+    ]
+
+    with transaction.atomic():
+        RatePrediction.objects.filter(prediction_date=prediction_date).delete()
+        RatePrediction.objects.bulk_create(predictions)
+        record_influences(predictions, last_date)
+        rebuild_current_forecast(prediction_date)
+        # bulk_create sends no post_save
+        bump_data_version('RatePrediction')
+
+    return len(predictions)
+
+
+def fit_forecasters(history: Dict[str, np.ndarray], config: Optional[Dict[str, Any]] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Fit the official and parallel rate models on a loaded history.
+
+    Returns:
+        Dictionary with 'official' and 'parallel' models (None where the
+        series is too short)
+    """
+    config = config or get_forecasting_config()
+    return {
+        'official': fit_model(history['official'], history['sentiment'], config),
+        'parallel': fit_model(history['parallel'], history['sentiment'], config),
+    }
+
+
+def write_forecasts(
+    models: Dict[str, Optional[Dict[str, Any]]],
+    last_date: datetime.date,
+    config: Optional[Dict[str, Any]] = None,
+    model_version: str = ''
+) -> int:
+    """
+    Forecast every horizon from fitted models and store the predictions.
+
+    Args:
+        models: Output of fit_forecasters (or the online state)
+        last_date: Last day the models have seen
+        config: Forecasting config
+        model_version: Registry version of the models, recorded on each prediction
+
+    Returns:
+        Number of predictions written
+    """
+    from rate_predictor.snapshot import rebuild_dashboard_snapshot
+
+    config = config or get_forecasting_config()
+    official_model = models.get('official')
+    if official_model is None:
+        return 0
+
+    official = forecast(official_model)
+    confidence = confidence_from_sigma(official_model['sigma'], config['CONFIDENCE_SCALE'])
+    quantiles = forecast_quantiles(official_model)
+
+    parallel_model = models.get('parallel')
+    parallel = forecast(parallel_model) if parallel_model is not None else None
+
+    saved = save_predictions(
+        timezone.now().date(), last_date, official, confidence, parallel, model_version, quantiles
+    )
+
+    logger.info(
+        f"Stored {saved} predictions (last rate {last_date}, "
+        f"{'with' if parallel is not None else 'without'} parallel rate)"
+    )
+    rebuild_dashboard_snapshot()
+    return saved
+
+
+def run_forecast(end_date: Optional[datetime.date] = None) -> int:
+    """
+    Fit the model on the recent history and store a fresh set of predictions.
+
+    Args:
+        end_date: Last day of history to use (defaults to the latest stored rate)
+
+    Returns:
+        Number of predictions written
+    """
+    config = get_forecasting_config()
+    if config['MODEL_TYPE'] not in SUPPORTED_MODEL_TYPES:
+        logger.error(f"Unsupported ML_MODEL_TYPE '{config['MODEL_TYPE']}'")
+        return 0
+
+    history = load_daily_history(end_date, config['HISTORICAL_WINDOW'])
+    if not history:
+        logger.warning("No exchange rates stored, skipping forecast")
+        return 0
+
+    models = fit_forecasters(history, config)
+    return write_forecasts(models, history['dates'][-1].astype(datetime.date), config)
@@ -0,0 +1,112 @@
+"""
+Prediction intervals for ZimRate Predictor
+
+This module turns a fitted forecaster into a fan of outcomes by bootstrapping
+its residuals. The model predicts the cumulative log change for every
+horizon at once, so one residual row is one plausible error path over the
+whole forecast window. Drawing rows with replacement keeps the correlation
+between horizons, and all paths are built in a single array operation.
+
+The quantiles kept per prediction always include the bounds of the
+PREDICTION_CONFIDENCE_THRESHOLD interval (0.85 gives the 7.5% and 92.5%
+quantiles).
+"""
+
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger("intervals")
+
+
+def get_interval_config() -> Dict[str, Any]:
+    """Get the prediction interval settings with defaults filled in."""
+    interval_config = getattr(settings, 'PREDICTION_INTERVALS', {})
+    level = getattr(settings, 'PREDICTION_CONFIDENCE_THRESHOLD', 0.85)
+    quantiles = set(interval_config.get('QUANTILES', [0.05, 0.25, 0.5, 0.75, 0.95]))
+    quantiles.update(interval_bounds(level))
+    return {
+        'N_PATHS': interval_config.get('N_PATHS', 5000),
+        'QUANTILES': sorted(quantiles),
+        'LEVEL': level,
+        'SEED': interval_config.get('SEED'),
+    }
+
+
+def interval_bounds(level: float) -> List[float]:
+    """Lower and upper quantile of a central interval, e.g. 0.85 -> [0.075, 0.925]."""
+    tail = round((1.0 - level) / 2, 6)
+    return [tail, round(1.0 - tail, 6)]
+
+
+def quantile_key(q: float) -> str:
+    """Key a quantile is stored under, e.g. 0.075 -> '0.075'."""
+    return f'{q:g}'
+
+
+def simulate_paths(model: Dict[str, Any], n_paths: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Simulate forecast rates by resampling residual rows.
+
+    Args:
+        model: Fitted model from fit_model or the online state
+        n_paths: Number of paths to draw
+        rng: NumPy random generator
+
+    Returns:
+        Array of simulated rates, n_paths x horizons
+    """
+    point = model['last_features'] @ model['coefficients']
+    pool = model.get('residual_pool')
+    if pool is not None and len(pool):
+        errors = np.asarray(pool)[rng.integers(0, len(pool), n_paths)]
+    else:
+        # States saved before residuals were kept only have the residual std
+        errors = rng.standard_normal((n_paths, len(point))) * model['sigma']
+    return np.exp(model['last_level'] + point + errors)
+
+
+def forecast_quantiles(model: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> List[Dict[str, float]]:
+    """
+    Compute the configured quantiles of every horizon's forecast.
+
+    Args:
+        model: Fitted model from fit_model or the online state
+        config: Interval config
+
+    Returns:
+        One {quantile key: rate} dictionary per horizon
+    """
+    config = config or get_interval_config()
+    started = time.perf_counter()
+
+    rng = np.random.default_rng(config['SEED'])
+    paths = simulate_paths(model, config['N_PATHS'], rng)
+    values = np.quantile(paths, config['QUANTILES'], axis=0)
+
+    logger.debug(
+        f"Simulated {config['N_PATHS']} paths over {paths.shape[1]} horizons "
+        f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+    keys = [quantile_key(q) for q in config['QUANTILES']]
+    return [
+        {key: round(float(value), 2) for key, value in zip(keys, values[:, h])}
+        for h in range(paths.shape[1])
+    ]
+
+
+def interval_from_quantiles(quantiles: Dict[str, float], level: Optional[float] = None) -> Optional[Dict[str, float]]:
+    """
+    Read the PREDICTION_CONFIDENCE_THRESHOLD interval out of stored quantiles.
+
+    Returns:
+        Dictionary with 'level', 'lower' and 'upper', or None if not stored
+    """
+    level = level if level is not None else getattr(settings, 'PREDICTION_CONFIDENCE_THRESHOLD', 0.85)
+    lower, upper = (quantiles.get(quantile_key(q)) for q in interval_bounds(level))
+    if lower is None or upper is None:
+        return None
+    return {'level': level, 'lower': lower, 'upper': upper}
@@ -0,0 +1,330 @@
+"""
+Online model updates for ZimRate Predictor
+
+This module keeps the fitted forecaster state (coefficients, the inverse
+information matrix of the recursive least squares update, residual sums and
+short buffers of recent levels, shocks, sentiment and feature rows) in the
+model registry and advances it one day at a time. Appending a day costs the same no matter how
+long the history is: new days are read from the feature store rows after
+the state's last day, never from the full history.
+
+A full refit on HISTORICAL_WINDOW days happens when there is no state yet,
+when the model orders in settings change, or every MODEL_RETRAINING_FREQUENCY
+days. Each refit and each update is registered as a new version; updates
+continue the active version and are promoted straight away, while refits are
+promoted only when MODEL_REGISTRY['AUTO_PROMOTE'] is on. A refit waiting to
+be promoted is not repeated: the active version keeps being updated until it
+is promoted.
+"""
+
+import logging
+import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from rate_predictor.prediction.forecaster import (
+    SUPPORTED_MODEL_TYPES,
+    get_forecasting_config,
+    load_daily_history,
+    fit_forecasters,
+    write_forecasts,
+)
+from rate_predictor.prediction.feature_store import get_feature_store, update_feature_store
+from rate_predictor.prediction import registry
+from rate_predictor.scrapers.text_analysis import get_lexicon_version
+
+logger = logging.getLogger("online_model")
+
+# Settings that change the shape of the model; state fitted with others is discarded
+STRUCTURE_KEYS = ('AR_ORDER', 'DIFFERENCE', 'MA_ORDER', 'SENTIMENT_LAGS', 'PREDICTION_WINDOW')
+
+
+def build_metadata(state: Dict[str, Any], kind: str, parent: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Describe a model state for the registry.
+
+    Args:
+        state: Model state with 'models', 'last_date' and 'config'
+        kind: 'refit' or 'update'
+        parent: Version an update continues from
+
+    Returns:
+        Metadata dictionary with the training window, lexicon version and metrics
+    """
+    official = state['models']['official']
+    parallel = state['models']['parallel']
+    window_days = state['config']['HISTORICAL_WINDOW']
+    return {
+        'kind': kind,
+        'parent': parent,
+        'model_type': state['config']['MODEL_TYPE'],
+        'training_window': {
+            'start': (state['last_date'] - datetime.timedelta(days=window_days - 1)).isoformat(),
+            'end': state['last_date'].isoformat(),
+            'days': window_days,
+        },
+        'lexicon_version': get_lexicon_version(),
+        'metrics': {
+            'n_obs': int(official['n_obs']),
+            'official_sigma': [round(float(v), 6) for v in official['sigma']],
+            'parallel_sigma': [round(float(v), 6) for v in parallel['sigma']] if parallel else None,
+        },
+    }
+
+
+def save_state(state: Dict[str, Any], kind: str = 'refit', parent: Optional[str] = None, promote: bool = True) -> str:
+    """
+    Register a model state as a new version.
+
+    Args:
+        state: Dictionary with 'models', 'last_date', 'fitted_on' and 'config'
+        kind: 'refit' or 'update'
+        parent: Version an update continues from
+        promote: Whether to make the new version active
+
+    Returns:
+        The new version name
+    """
+    version = registry.save_version(state, build_metadata(state, kind, parent))
+    if promote:
+        registry.promote(version)
+        registry.prune_versions()
+    return version
+
+
+def load_state() -> Optional[Dict[str, Any]]:
+    """
+    Get a private copy of the active model state.
+
+    The cached arrays are shared with the rest of the process, so the model
+    dictionaries are copied; step_model only ever replaces arrays.
+
+    Returns:
+        State dictionary or None if no version is active
+    """
+    active = registry.get_active_model()
+    if active is None:
+        return None
+
+    state = dict(active)
+    state['models'] = {
+        name: dict(model) if model is not None else None
+        for name, model in active['models'].items()
+    }
+    return state
+
+
+def step_model(model: Dict[str, Any], rate: float, sentiment: float, config: Dict[str, Any]) -> None:
+    """
+    Advance a fitted model by one day in place.
+
+    The new day completes the targets of the feature row from PREDICTION_WINDOW
+    days ago, which is fed to a recursive least squares update with
+    exponential forgetting. All horizons share one inverse information matrix,
+    so the update is a handful of k x k and k x horizons operations.
+
+    Args:
+        model: Model dictionary from fit_model or load_state
+        rate: The day's rate (forward-filled by the caller if missing)
+        sentiment: The day's mean sentiment (0.0 without posts)
+        config: Forecasting config
+    """
+    d = config['DIFFERENCE']
+    p = config['AR_ORDER']
+    q = config['MA_ORDER']
+    horizon = config['PREDICTION_WINDOW']
+    forgetting = config['FORGETTING_FACTOR']
+
+    level = np.log(rate)
+    levels = np.append(model['levels'][1:], level)
+    value = np.diff(levels[-(d + 1):], n=d)[-1] if d else level
+
+    # Most recent first, as in the feature matrix
+    previous = model['differenced'][::-1]
+    residuals = model['residuals']
+    if q:
+        hr_beta = model['hr_beta']
+        shock = value - (hr_beta[0] + previous @ hr_beta[1:])
+        residuals = np.append(residuals[1:], shock)
+    differenced = np.append(model['differenced'][1:], value)
+
+    sentiment_buffer = model['sentiment']
+    if config['SENTIMENT_LAGS']:
+        sentiment_buffer = np.append(sentiment_buffer[1:], sentiment)
+
+    row = np.concatenate([[1.0], differenced[::-1][:p], residuals[::-1], sentiment_buffer[::-1]])
+    feature_rows = np.vstack([model['feature_rows'][1:], row])
+
+    # The row from `horizon` days ago now has every target observed
+    x = feature_rows[0]
+    y = levels[-horizon:] - levels[-horizon - 1]
+    if np.isfinite(x).all() and np.isfinite(y).all():
+        P = model['P']
+        Px = P @ x
+        gain = Px / (forgetting + x @ Px)
+        error = y - x @ model['coefficients']
+
+        model['coefficients'] = model['coefficients'] + np.outer(gain, error)
+        P = (P - np.outer(gain, Px)) / forgetting
+        model['P'] = (P + P.T) / 2
+        model['sse'] = forgetting * model['sse'] + error ** 2
+        model['weight'] = forgetting * model['weight'] + 1.0
+        model['n_obs'] = model['n_obs'] + 1
+        model['sigma'] = np.sqrt(model['sse'] / max(model['weight'] - len(x), 1.0))
+        if 'residual_pool' in model:
+            # The newest error path replaces the oldest one in the bootstrap pool
+            model['residual_pool'] = np.vstack([model['residual_pool'][1:], error])
+
+    model['levels'] = levels
+    model['differenced'] = differenced
+    model['residuals'] = residuals
+    model['sentiment'] = sentiment_buffer
+    model['feature_rows'] = feature_rows
+    model['last_features'] = row
+    model['last_level'] = level
+
+
+def refit_model(end_date: Optional[datetime.date] = None) -> int:
+    """
+    Fit the models from scratch, persist their state and store predictions.
+
+    Args:
+        end_date: Last day of history to use (defaults to the latest stored rate)
+
+    Returns:
+        Number of predictions written
+    """
+    config = get_forecasting_config()
+    if config['MODEL_TYPE'] not in SUPPORTED_MODEL_TYPES:
+        logger.error(f"Unsupported ML_MODEL_TYPE '{config['MODEL_TYPE']}'")
+        return 0
+
+    update_feature_store()
+    history = load_daily_history(end_date, config['HISTORICAL_WINDOW'])
+    if not history:
+        logger.warning("No exchange rates stored, skipping model fit")
+        return 0
+
+    models = fit_forecasters(history, config)
+    if models['official'] is None:
+        return 0
+
+    last_date = history['dates'][-1].astype(datetime.date)
+    auto_promote = registry.get_registry_config()['AUTO_PROMOTE']
+    version = save_state({
+        'models': models,
+        'last_date': last_date,
+        'fitted_on': timezone.now().date(),
+        'config': config,
+    }, kind='refit', promote=auto_promote)
+    logger.info(f"Refit model {version} on {models['official']['n_obs']} training days up to {last_date}")
+
+    if not auto_promote:
+        logger.info(f"Model version {version} registered; promote it to start using it")
+        return 0
+    return write_forecasts(models, last_date, config, model_version=version)
+
+
+def _matches_settings(state: Optional[Dict[str, Any]], config: Dict[str, Any]) -> bool:
+    """Check whether a state exists and was fitted with the current model orders."""
+    if state is None or state['models']['official'] is None:
+        return False
+    return all(state['config'].get(key) == config[key] for key in STRUCTURE_KEYS)
+
+
+def _needs_refit(state: Optional[Dict[str, Any]], config: Dict[str, Any]) -> bool:
+    """Check whether the stored state is missing, stale or shaped differently."""
+    if not _matches_settings(state, config):
+        if state is not None:
+            logger.info("Model settings changed since the last fit")
+        return True
+    retrain_days = getattr(settings, 'MODEL_RETRAINING_FREQUENCY', 7)
+    return (timezone.now().date() - state['fitted_on']).days >= retrain_days
+
+
+def _pending_refit(state: Optional[Dict[str, Any]], config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Find a refit registered after the active state's fit that has not been promoted.
+
+    Without AUTO_PROMOTE a refit waits for someone to promote it; until then
+    the active state keeps being updated instead of being refit again.
+
+    Returns:
+        Metadata of the newest such version, or None
+    """
+    for meta in registry.list_versions():
+        if meta.get('kind') != 'refit':
+            continue
+        if any(meta['config'].get(key) != config[key] for key in STRUCTURE_KEYS):
+            continue
+        if state is None or datetime.date.fromisoformat(meta['fitted_on']) > state['fitted_on']:
+            return meta
+    return None
+
+
+def update_model() -> int:
+    """
+    Feed the days stored since the last update into the persisted models.
+
+    The feature store is brought up to date first; only its rows after the
+    state's last day are read. Those rows are already forward-filled over
+    missing days, exactly as the full fit sees them.
+
+    Returns:
+        Number of predictions written (0 if there were no new days)
+    """
+    config = get_forecasting_config()
+    state = load_state()
+    if _needs_refit(state, config):
+        pending = _pending_refit(state, config)
+        if pending is None:
+            written = refit_model()
+            # An unpromoted refit leaves the active model to take the new days
+            if registry.get_registry_config()['AUTO_PROMOTE'] or not _matches_settings(state, config):
+                return written
+        else:
+            logger.info(f"Model version {pending['version']} is waiting to be promoted")
+            if not _matches_settings(state, config):
+                return 0
+
+    update_feature_store()
+    store = get_feature_store()
+    if store is None:
+        return refit_model()
+
+    last_date = state['last_date']
+    end_date = store.end_date
+    if end_date is None or end_date <= last_date:
+        logger.info(f"No new exchange rates since {last_date}")
+        return 0
+
+    first_new = last_date + datetime.timedelta(days=1)
+    if first_new < store.start_date:
+        return refit_model()
+
+    window = store.window(first_new, end_date)
+    columns = {
+        'official': store.index('official_rate'),
+        'parallel': store.index('parallel_rate'),
+    }
+    sentiment_column = store.index('sentiment_mean')
+
+    models = state['models']
+    for row in window:
+        for name, column in columns.items():
+            model = models[name]
+            if model is None:
+                continue
+            rate = row[column]
+            if not np.isfinite(rate):
+                rate = np.exp(model['last_level'])
+            step_model(model, float(rate), float(row[sentiment_column]), config)
+
+    state['last_date'] = end_date
+    version = save_state(state, kind='update', parent=state['version'])
+
+    logger.info(f"Updated model with {len(window)} new days up to {end_date} as version {version}")
+    return write_forecasts(models, end_date, config, model_version=version)
@@ -0,0 +1,282 @@
+"""
+Model registry for ZimRate Predictor
+
+This module stores fitted forecaster states as immutable, versioned
+artifacts on local disk:
+
+    <MODEL_REGISTRY['PATH']>/
+        ACTIVE                      name of the promoted version
+        versions/<version>/
+            metadata.json           training window, lexicon version, metrics
+            official__P.npy         one .npy file per model array
+            ...
+
+Every array is its own .npy file so it can be memory-mapped on load. A
+version directory is written under a temporary name and renamed into place,
+and promoting a version atomically replaces the ACTIVE file, so processes
+serving the previous version are never interrupted. Each process keeps the
+active version loaded and only re-reads it after a promote.
+"""
+
+import os
+import json
+import uuid
+import shutil
+import logging
+import datetime
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger("model_registry")
+
+# Model entries stored in metadata.json rather than as arrays
+SCALAR_KEYS = ('n_obs', 'last_level', 'weight')
+
+
+def get_registry_config() -> Dict[str, Any]:
+    """Get the model registry settings with defaults filled in."""
+    registry_config = getattr(settings, 'MODEL_REGISTRY', {})
+    return {
+        'PATH': Path(registry_config.get('PATH', Path(settings.BASE_DIR) / 'model_registry')),
+        'AUTO_PROMOTE': registry_config.get('AUTO_PROMOTE', True),
+        'KEEP_VERSIONS': registry_config.get('KEEP_VERSIONS', 20),
+        'MMAP_MIN_BYTES': registry_config.get('MMAP_MIN_BYTES', 64 * 1024),
+    }
+
+
+def _versions_dir() -> Path:
+    return get_registry_config()['PATH'] / 'versions'
+
+
+def _active_path() -> Path:
+    return get_registry_config()['PATH'] / 'ACTIVE'
+
+
+def new_version_id() -> str:
+    """Build a sortable, unique version name."""
+    return f"{timezone.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def save_version(state: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Write a model state as a new immutable version.
+
+    Args:
+        state: Dictionary with 'models', 'last_date', 'fitted_on' and 'config'
+        metadata: Extra metadata (training window, lexicon version, metrics, ...)
+
+    Returns:
+        The new version name
+    """
+    version = new_version_id()
+    versions_dir = _versions_dir()
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    tmp_dir = versions_dir / f'.tmp-{version}'
+    tmp_dir.mkdir()
+
+    scalars = {}
+    for name, model in state['models'].items():
+        if model is None:
+            continue
+        scalars[name] = {}
+        for key, value in model.items():
+            if key in SCALAR_KEYS:
+                scalars[name][key] = float(value)
+            else:
+                np.save(tmp_dir / f'{name}__{key}.npy', np.asarray(value))
+
+    meta = dict(metadata or {})
+    meta.update({
+        'version': version,
+        'created_at': timezone.now().isoformat(),
+        'last_date': state['last_date'].isoformat(),
+        'fitted_on': state['fitted_on'].isoformat(),
+        'config': state['config'],
+        'scalars': scalars,
+    })
+    with open(tmp_dir / 'metadata.json', 'w') as f:
+        json.dump(meta, f, indent=2, default=str)
+
+    # The version only becomes visible once complete
+    os.rename(tmp_dir, versions_dir / version)
+    logger.info(f"Registered model version {version}")
+    return version
+
+
+def get_metadata(version: str) -> Optional[Dict[str, Any]]:
+    """Read a version's metadata, or None if the version does not exist."""
+    try:
+        with open(_versions_dir() / version / 'metadata.json') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def list_versions() -> List[Dict[str, Any]]:
+    """
+    List registered versions, newest first.
+
+    Returns:
+        List of metadata dictionaries
+    """
+    versions_dir = _versions_dir()
+    if not versions_dir.exists():
+        return []
+
+    versions = []
+    for version_dir in versions_dir.iterdir():
+        if version_dir.name.startswith('.'):
+            continue
+        meta = get_metadata(version_dir.name)
+        if meta is not None:
+            versions.append(meta)
+    return sorted(versions, key=lambda meta: meta['created_at'], reverse=True)
+
+
+def get_active_version() -> Optional[str]:
+    """Get the name of the promoted version, if any."""
+    try:
+        return _active_path().read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def promote(version: str) -> None:
+    """
+    Make a version the active one.
+
+    The ACTIVE file is replaced atomically; processes pick the new version up
+    on their next get_active_model() call.
+
+    Args:
+        version: Version name to promote
+
+    Raises:
+        ValueError: If the version does not exist
+    """
+    if get_metadata(version) is None:
+        raise ValueError(f"Unknown model version: {version}")
+
+    active_path = _active_path()
+    tmp_path = active_path.with_name(f'.ACTIVE.{uuid.uuid4().hex}')
+    tmp_path.write_text(version)
+    os.replace(tmp_path, active_path)
+    logger.info(f"Promoted model version {version}")
+
+
+def load_version(version: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a version, memory-mapping its large arrays.
+
+    Args:
+        version: Version name
+
+    Returns:
+        State dictionary as passed to save_version, plus 'version' and
+        'metadata', or None if the version does not exist
+    """
+    meta = get_metadata(version)
+    if meta is None:
+        return None
+
+    version_dir = _versions_dir() / version
+    mmap_min_bytes = get_registry_config()['MMAP_MIN_BYTES']
+
+    models = {'official': None, 'parallel': None}
+    for name, scalars in meta['scalars'].items():
+        models[name] = dict(scalars)
+    for array_path in version_dir.glob('*.npy'):
+        name, key = array_path.stem.split('__', 1)
+        mmap_mode = 'r' if array_path.stat().st_size >= mmap_min_bytes else None
+        models[name][key] = np.load(array_path, mmap_mode=mmap_mode)
+
+    return {
+        'version': version,
+        'metadata': meta,
+        'models': models,
+        'last_date': datetime.date.fromisoformat(meta['last_date']),
+        'fitted_on': datetime.date.fromisoformat(meta['fitted_on']),
+        'config': meta['config'],
+    }
+
+
+# Active version loaded once per process
+_active = None
+_active_lock = threading.Lock()
+
+
+def get_active_model() -> Optional[Dict[str, Any]]:
+    """
+    Get the active version for this process.
+
+    After the first call this costs one small file read to notice promotes;
+    the arrays themselves are only loaded again when the version changes.
+    Callers must not modify the returned arrays in place.
+
+    Returns:
+        State dictionary from load_version, or None if nothing is promoted
+    """
+    global _active
+
+    version = get_active_version()
+    if version is None:
+        return None
+    if _active is not None and _active['version'] == version:
+        return _active
+
+    with _active_lock:
+        if _active is None or _active['version'] != version:
+            loaded = load_version(version)
+            if loaded is None:
+                logger.error(f"Active model version {version} is missing")
+                return None
+            _active = loaded
+            logger.info(f"Loaded model version {version}")
+    return _active
+
+
+def warm_up() -> None:
+    """Load the active version ahead of the first request or task."""
+    try:
+        get_active_model()
+    except Exception as e:
+        logger.error(f"Error warming up model registry: {e}")
+
+
+def prune_versions(keep: Optional[int] = None) -> int:
+    """
+    Delete old versions.
+
+    The active version is always kept, and so are versions created or
+    fitted after it, which may be waiting to be promoted.
+
+    Args:
+        keep: Number of newest versions to keep (defaults to KEEP_VERSIONS)
+
+    Returns:
+        Number of versions deleted
+    """
+    keep = keep if keep is not None else get_registry_config()['KEEP_VERSIONS']
+    active = get_active_version()
+    active_meta = get_metadata(active) if active else None
+
+    deleted = 0
+    for meta in list_versions()[keep:]:
+        if meta['version'] == active:
+            continue
+        if active_meta is None or (
+            meta['created_at'] > active_meta['created_at'] or meta['fitted_on'] > active_meta['fitted_on']
+        ):
+            continue
+        # Processes that mapped these arrays keep their open mappings
+        shutil.rmtree(_versions_dir() / meta['version'], ignore_errors=True)
+        deleted += 1
+
+    if deleted:
+        logger.info(f"Pruned {deleted} old model versions")
+    return deleted
@@ -0,0 +1,353 @@
+"""
+Model order tuning for ZimRate Predictor
+
+This module searches (p, d, q) orders and feature sets for the forecaster.
+Each candidate is scored with a rolling-origin backtest over the exchange
+rate history: at every origin the model is fit on the HISTORICAL_WINDOW days
+before it, as in production (lags may reach back past the window start),
+and its forecasts for the next PREDICTION_WINDOW days are compared with what
+happened.
+
+The expensive parts are shared. Lag matrices of the differenced series and
+sentiment are computed once per distinct setting and sent to each worker
+process once; a candidate's design matrix is then just a column selection.
+Per-row outer products are prefix-summed so every origin's normal equations
+come from a subtraction, and all origins are solved in one batched call.
+
+MA candidates need the one-step shocks, which production estimates with a
+long AR fit (Hannan-Rissanen first stage) on the training window. That fit
+is repeated at every origin on the rows up to it, so no score uses shocks
+estimated from later data. A shock is linear in the long AR coefficients,
+so the normal equations are prefix-summed over the stacked lags of the
+first stage's rows and mapped onto each origin's shock columns.
+"""
+
+import os
+import time
+import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from rate_predictor.prediction.forecaster import (
+    get_forecasting_config,
+    load_daily_history,
+    lag_matrix,
+    difference_series,
+    build_targets,
+    ridge_penalty,
+)
+
+logger = logging.getLogger("model_tuning")
+
+DEFAULT_GRID = {
+    'AR_ORDER': [1, 2, 3, 5],
+    'DIFFERENCE': [0, 1],
+    'MA_ORDER': [0, 1, 2],
+    'SENTIMENT_LAGS': [0, 1, 2],
+}
+
+
+def get_tuning_grid() -> Dict[str, List[int]]:
+    """Get the candidate grid from FORECASTING['TUNING_GRID'] with defaults filled in."""
+    grid = getattr(settings, 'FORECASTING', {}).get('TUNING_GRID', {})
+    return {key: list(grid.get(key, values)) for key, values in DEFAULT_GRID.items()}
+
+
+def build_candidates(grid: Dict[str, List[int]]) -> List[Dict[str, int]]:
+    """Expand a grid into a list of candidate orders."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def precompute_matrices(levels: np.ndarray, sentiment: np.ndarray, candidates: List[Dict[str, int]]) -> Dict[str, Any]:
+    """
+    Build every lag matrix the candidates need, once.
+
+    Args:
+        levels: Log rates on the daily grid
+        sentiment: Daily mean sentiment on the same grid
+        candidates: Candidate orders
+
+    Returns:
+        Dictionary with 'ar' lag matrices per d, 'shocks' first stage rows
+        per (d, long AR order) and the 'sentiment' lag matrix
+    """
+    max_p = max(c['AR_ORDER'] for c in candidates)
+    max_q = max(c['MA_ORDER'] for c in candidates)
+    max_s = max(c['SENTIMENT_LAGS'] for c in candidates)
+
+    matrices = {'ar': {}, 'shocks': {}, 'sentiment': lag_matrix(sentiment, max_s)}
+    for d in sorted({c['DIFFERENCE'] for c in candidates}):
+        differenced = difference_series(levels, d)
+        matrices['ar'][d] = lag_matrix(differenced, max_p)
+
+        orders = {max(c['AR_ORDER'] + c['MA_ORDER'], 4) for c in candidates if c['DIFFERENCE'] == d and c['MA_ORDER']}
+        for order in sorted(orders):
+            matrices['shocks'][(d, order)] = first_stage_rows(differenced, order, max_q)
+
+    return matrices
+
+
+def first_stage_rows(differenced: np.ndarray, order: int, lags: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lay out the long AR fit so shocks can be rebuilt for any coefficients.
+
+    Row t of the first stage is w_t = [y_t, 1, y_{t-1}, ..., y_{t-order}];
+    with long AR coefficients beta the shock at t is w_t @ [1, -beta].
+
+    Args:
+        differenced: Differenced log rates
+        order: Order of the long AR fit
+        lags: Shock lags needed (the largest MA order)
+
+    Returns:
+        Tuple of the first stage rows, shape (days, order + 2), and their
+        lags, shape (days, lags, order + 2), where row t holds w_t, w_{t-1}, ...
+    """
+    n = len(differenced)
+    stage = np.full((n, order + 2), np.nan)
+    stage[:, 0] = differenced
+    stage[:, 1] = 1.0
+    if n > 1:
+        stage[1:, 2:] = lag_matrix(differenced, order)[:-1]
+
+    lagged = np.full((n, lags, order + 2), np.nan)
+    for j in range(lags):
+        lagged[j:, j] = stage[:n - j]
+    return stage, lagged
+
+
+def candidate_features(candidate: Dict[str, int], matrices: Dict[str, Any]) -> np.ndarray:
+    """Assemble a candidate's design matrix, without MA shocks, from the shared lag matrices."""
+    ar = matrices['ar'][candidate['DIFFERENCE']]
+
+    columns = [np.ones((len(ar), 1)), ar[:, :candidate['AR_ORDER']]]
+    if candidate['SENTIMENT_LAGS']:
+        columns.append(matrices['sentiment'][:, :candidate['SENTIMENT_LAGS']])
+    return np.column_stack(columns)
+
+
+def candidate_shocks(candidate: Dict[str, int], matrices: Dict[str, Any]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """First stage rows and their lags for a candidate's MA terms, or None without them."""
+    q = candidate['MA_ORDER']
+    if not q:
+        return None
+    stage, lagged = matrices['shocks'][(candidate['DIFFERENCE'], max(candidate['AR_ORDER'] + q, 4))]
+    return stage, lagged[:, :q]
+
+
+def _prefix_sums(X: np.ndarray, Y: np.ndarray, valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Prefix sums of X'X, X'Y and the row count over the valid rows."""
+    n, k = X.shape
+    X = np.where(valid[:, None], X, 0.0)
+    Y = np.where(valid[:, None], Y, 0.0)
+    cxx = np.zeros((n + 1, k, k))
+    np.cumsum(np.einsum('ni,nj->nij', X, X), axis=0, out=cxx[1:])
+    cxy = np.zeros((n + 1, k, Y.shape[1]))
+    np.cumsum(np.einsum('ni,nh->nih', X, Y), axis=0, out=cxy[1:])
+    counts = np.concatenate([[0], np.cumsum(valid)])
+    return cxx, cxy, counts
+
+
+def rolling_origin_backtest(
+    features: np.ndarray,
+    targets: np.ndarray,
+    window: int,
+    ridge: float,
+    min_rows: int,
+    shocks: Optional[Tuple[np.ndarray, np.ndarray]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Score a design matrix with rolling-origin forecasts.
+
+    Args:
+        features: Regressors for every day, shape (days, k)
+        targets: Cumulative log changes for every day, shape (days, horizons)
+        window: Days of history each fit may use
+        ridge: Ridge penalty
+        min_rows: Minimum complete training rows per origin
+        shocks: First stage rows and lags from first_stage_rows for MA terms,
+                whose shocks are estimated per origin and appended to features
+
+    Returns:
+        Dictionary of scores, or None if no origin had enough history
+    """
+    n, f = features.shape
+    horizon = targets.shape[1]
+
+    base = features
+    k = f
+    if shocks is not None:
+        stage, lagged = shocks
+        q, width = lagged.shape[1:]
+        base = np.column_stack([features, lagged.reshape(n, q * width)])
+        k = f + q
+
+    valid = np.isfinite(base).all(axis=1) & np.isfinite(targets).all(axis=1)
+    cxx, cxy, counts = _prefix_sums(base, targets, valid)
+
+    # An origin's fit sees rows whose targets end on or before the origin
+    origins = np.arange(window - 1, n - horizon)
+    low = origins - window + 1
+    high = origins - horizon + 1
+    keep = ((counts[high] - counts[low]) >= max(min_rows, k + 1)) & np.isfinite(base[origins]).all(axis=1)
+    if shocks is not None:
+        stage_valid = np.isfinite(stage).all(axis=1)
+        czz, czy, stage_counts = _prefix_sums(stage[:, 1:], stage[:, :1], stage_valid)
+        # The first stage is fit on the window's rows up to and including the origin
+        keep &= (stage_counts[origins + 1] - stage_counts[low]) > width - 1
+    origins, low, high = origins[keep], low[keep], high[keep]
+    if not len(origins):
+        return None
+
+    XtX = cxx[high] - cxx[low]
+    XtY = cxy[high] - cxy[low]
+    x_origins = base[origins]
+    if shocks is not None:
+        # Least squares long AR fit per origin (pinv matches lstsq on the normal equations)
+        beta = np.linalg.pinv(czz[origins + 1] - czz[low]) @ (czy[origins + 1] - czy[low])
+        weights = np.concatenate([np.ones((len(origins), 1)), -beta[:, :, 0]], axis=1)
+
+        # Map the stacked first stage lags onto the q shock columns
+        mapping = np.zeros((len(origins), f + q * width, k))
+        mapping[:, np.arange(f), np.arange(f)] = 1.0
+        for j in range(q):
+            mapping[:, f + j * width:f + (j + 1) * width, f + j] = weights
+        XtX = np.einsum('oak,oab,obl->okl', mapping, XtX, mapping)
+        XtY = np.einsum('oak,oah->okh', mapping, XtY)
+        x_origins = np.einsum('oa,oak->ok', x_origins, mapping)
+
+    coefficients = np.linalg.solve(XtX + ridge_penalty(k, ridge), XtY)
+
+    predicted = np.einsum('ok,okh->oh', x_origins, coefficients)
+    realized = targets[origins]
+    errors = predicted - realized
+    ape = np.abs(np.expm1(errors)) * 100
+
+    return {
+        'origins': int(len(origins)),
+        'mape': float(ape.mean()),
+        'mape_by_horizon': [round(float(v), 4) for v in ape.mean(axis=0)],
+        'rmse_log': float(np.sqrt((errors ** 2).mean())),
+        'directional_accuracy': float((np.sign(predicted) == np.sign(realized)).mean()),
+    }
+
+
+# Shared data for pool workers, set once per process by the initializer
+_shared = {}
+
+
+def _init_worker(matrices: Dict[str, Any], targets: np.ndarray, settings_: Dict[str, Any]) -> None:
+    _shared['matrices'] = matrices
+    _shared['targets'] = targets
+    _shared['settings'] = settings_
+
+
+def evaluate_candidate(candidate: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Backtest one candidate against the shared matrices.
+
+    Returns:
+        Dictionary with the candidate, its scores and the seconds it took
+    """
+    start = time.perf_counter()
+    settings_ = _shared['settings']
+    features = candidate_features(candidate, _shared['matrices'])
+    scores = rolling_origin_backtest(
+        features,
+        _shared['targets'],
+        settings_['window'],
+        settings_['ridge'],
+        settings_['min_rows'],
+        candidate_shocks(candidate, _shared['matrices'])
+    )
+    return {
+        'config': candidate,
+        'scores': scores,
+        'seconds': time.perf_counter() - start,
+        'pid': os.getpid(),
+    }
+
+
+def tune_model(
+    candidates: Optional[List[Dict[str, int]]] = None,
+    days: Optional[int] = None,
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Search candidate orders with rolling-origin backtests.
+
+    Args:
+        candidates: Candidate orders (defaults to the settings grid)
+        days: Days of official rate history to backtest on (defaults to all
+              days in the feature store, or two years)
+        workers: Worker processes (defaults to the CPU count; 1 runs inline)
+
+    Returns:
+        Dictionary with the 'winner', all 'results' sorted by MAPE and timings
+    """
+    from rate_predictor.prediction.feature_store import get_feature_store
+
+    config = get_forecasting_config()
+    candidates = candidates or build_candidates(get_tuning_grid())
+    workers = workers or os.cpu_count() or 1
+
+    if days is None:
+        store = get_feature_store()
+        days = store.n_days if store is not None and store.n_days else 365 * 2
+
+    history = load_daily_history(days=days)
+    if not history:
+        raise ValueError("No exchange rates stored")
+
+    rates = np.asarray(history['official'])
+    observed = np.isfinite(rates) & (rates > 0)
+    if not observed.any():
+        raise ValueError("No exchange rates stored")
+    start = int(np.argmax(observed))
+    levels = np.log(rates[start:])
+    sentiment = np.asarray(history['sentiment'])[start:]
+
+    started = time.perf_counter()
+    matrices = precompute_matrices(levels, sentiment, candidates)
+    targets = build_targets(levels, config['PREDICTION_WINDOW'])
+    shared_settings = {
+        'window': config['HISTORICAL_WINDOW'],
+        'ridge': config['RIDGE'],
+        'min_rows': config['MIN_TRAINING_SAMPLES'],
+    }
+    precompute_seconds = time.perf_counter() - started
+
+    logger.info(f"Tuning {len(candidates)} candidates on {len(levels)} days with {workers} workers")
+    started = time.perf_counter()
+    if workers == 1:
+        _init_worker(matrices, targets, shared_settings)
+        results = [evaluate_candidate(candidate) for candidate in candidates]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(matrices, targets, shared_settings)
+        ) as pool:
+            results = list(pool.map(evaluate_candidate, candidates, chunksize=max(1, len(candidates) // (workers * 4))))
+    search_seconds = time.perf_counter() - started
+
+    scored = sorted(
+        (r for r in results if r['scores'] is not None),
+        key=lambda r: r['scores']['mape']
+    )
+    unscored = [r for r in results if r['scores'] is None]
+
+    return {
+        'days': int(len(levels)),
+        'workers': workers,
+        'precompute_seconds': precompute_seconds,
+        'search_seconds': search_seconds,
+        'cpu_seconds': sum(r['seconds'] for r in results),
+        'winner': scored[0] if scored else None,
+        'results': scored + unscored,
+    }
@@ -0,0 +1,209 @@
+"""
+Task progress broadcaster for ZimRate Predictor
+
+This module pushes background task progress to dashboards as Server-Sent
+Events. update_progress() publishes every change; a single ProgressBroadcaster
+per server process fans it out to all the open streams, so the number of
+dashboards watching never changes the number of queries:
+
+- the latest event is kept in the cache, so a new stream (and the polling
+  task_progress API) starts from it instead of reading TaskProgress;
+- events published in this process (eager Celery runs tasks in a thread of
+  the web process) reach the streams immediately;
+- while anyone is subscribed, one watcher task reads the cached event every
+  POLL_INTERVAL seconds, which is how progress from Celery workers in other
+  processes gets through.
+
+TaskProgress is only read when the cache holds no event at all.
+
+Streams need an ASGI server (see get_rate_zim/asgi.py); under WSGI every
+open stream would hold a worker.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger("progress")
+
+CACHE_KEY = 'task_progress:latest'
+
+
+def get_progress_config() -> Dict[str, Any]:
+    """Get the task progress streaming settings with defaults filled in."""
+    progress_config = getattr(settings, 'TASK_PROGRESS', {})
+    return {
+        'POLL_INTERVAL': progress_config.get('POLL_INTERVAL', 1),
+        'KEEPALIVE': progress_config.get('KEEPALIVE', 15),
+        'QUEUE_SIZE': progress_config.get('QUEUE_SIZE', 16),
+        'CACHE_TIMEOUT': progress_config.get('CACHE_TIMEOUT', 60 * 60 * 24),
+        'IDLE_RETRY': progress_config.get('IDLE_RETRY', 60),
+    }
+
+
+def progress_event(task) -> Dict[str, Any]:
+    """
+    Build the event for a TaskProgress row.
+
+    Returns:
+        {'id': increasing event id, 'data': the task_progress API payload}
+    """
+    return {
+        'id': time.time_ns(),
+        'data': {
+            'task_id': task.task_id,
+            'task_type': task.task_type,
+            'status': task.status,
+            'progress': task.progress,
+            'message': task.message,
+            'updated_at': task.updated_at.isoformat(),
+        },
+    }
+
+
+class ProgressBroadcaster:
+    """
+    Fans progress events out to the subscribed streams of one process.
+
+    publish() may be called from any thread; subscribe() runs on the server's
+    event loop.
+    """
+
+    def __init__(self):
+        self._queues: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._watcher: Optional[asyncio.Task] = None
+        self._last_id = 0
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """Hand an event to the subscribers, if this process has any."""
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._queues:
+            return
+        loop.call_soon_threadsafe(self._dispatch, event)
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        # The watcher sees published events again, and may see them late
+        if event['id'] <= self._last_id:
+            return
+        self._last_id = event['id']
+
+        for queue in self._queues:
+            if queue.full():
+                # Only the newest progress matters to a slow client
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def _watch(self) -> None:
+        interval = get_progress_config()['POLL_INTERVAL']
+        while self._queues:
+            try:
+                event = await cache.aget(CACHE_KEY)
+                if event is not None:
+                    self._dispatch(event)
+            except Exception as e:
+                logger.error(f"Error reading task progress: {e}")
+            await asyncio.sleep(interval)
+
+    def subscribe(self, keepalive: Optional[float] = None) -> 'Subscription':
+        """
+        Start receiving events. Must be called on the event loop.
+
+        Args:
+            keepalive: Idle seconds after which the subscription yields None,
+                so the caller can keep the connection open (defaults to KEEPALIVE)
+
+        Returns:
+            Async iterator of events; close() it when done
+        """
+        config = get_progress_config()
+        self._loop = asyncio.get_running_loop()
+
+        queue = asyncio.Queue(maxsize=config['QUEUE_SIZE'])
+        self._queues.add(queue)
+        if self._watcher is None or self._watcher.done():
+            self._watcher = self._loop.create_task(self._watch())
+        return Subscription(self, queue, keepalive or config['KEEPALIVE'])
+
+    async def close(self) -> None:
+        """End every open subscription, e.g. when the server shuts down."""
+        for queue in self._queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+
+class Subscription:
+    """One stream's queue of events, yielded until the broadcaster closes."""
+
+    def __init__(self, broadcaster: ProgressBroadcaster, queue: asyncio.Queue, keepalive: float):
+        self._broadcaster = broadcaster
+        self._queue = queue
+        self._keepalive = keepalive
+
+    def __aiter__(self) -> 'Subscription':
+        return self
+
+    async def __anext__(self) -> Optional[Dict[str, Any]]:
+        try:
+            event = await asyncio.wait_for(self._queue.get(), self._keepalive)
+        except asyncio.TimeoutError:
+            return None
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def close(self) -> None:
+        self._broadcaster._queues.discard(self._queue)
+
+
+broadcaster = ProgressBroadcaster()
+
+
+def publish_progress(task) -> Dict[str, Any]:
+    """
+    Store a TaskProgress row's state as the latest event and broadcast it.
+
+    Args:
+        task: Saved TaskProgress instance
+
+    Returns:
+        The event
+    """
+    event = progress_event(task)
+    cache.set(CACHE_KEY, event, get_progress_config()['CACHE_TIMEOUT'])
+    broadcaster.publish(event)
+    return event
+
+
+def get_latest_progress() -> Optional[Dict[str, Any]]:
+    """Latest progress event, read from TaskProgress only if none is cached."""
+    from rate_predictor.models import TaskProgress
+
+    event = cache.get(CACHE_KEY)
+    if event is None:
+        task = TaskProgress.objects.first()
+        if task is not None:
+            event = progress_event(task)
+            cache.add(CACHE_KEY, event, get_progress_config()['CACHE_TIMEOUT'])
+    return event
+
+
+async def aget_latest_progress() -> Optional[Dict[str, Any]]:
+    """Async version of get_latest_progress()."""
+    from rate_predictor.models import TaskProgress
+
+    event = await cache.aget(CACHE_KEY)
+    if event is None:
+        task = await TaskProgress.objects.afirst()
+        if task is not None:
+            event = progress_event(task)
+            await cache.aadd(CACHE_KEY, event, get_progress_config()['CACHE_TIMEOUT'])
+    return event
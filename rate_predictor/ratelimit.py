@@ -0,0 +1,280 @@
+"""
+API rate limiting for ZimRate Predictor
+
+This module enforces settings.API_RATE_LIMIT on the JSON API. Each client
+(by IP address) has a budget per scope: LATEST_RATE for /api/latest-rate/,
+PREDICTIONS for /api/predictions/ and DEFAULT for the other api_* endpoints.
+Budgets are written like '100/hour' (second, minute, hour or day).
+
+Counting uses a sliding window approximated from two fixed windows kept in
+the configured cache backend: the estimate is the current window's count
+plus the previous window's count weighted by how much of it still overlaps
+the sliding window. The current count is bumped with cache.incr(), which is
+atomic on every backend, so all workers share one count.
+
+A refused request's Retry-After is the time at which a retry fits the
+budget again, counting the retry itself.
+
+Most of the work is kept off the cache:
+
+- a finished window's count no longer changes, so each process reads it
+  once and remembers it;
+- a client that went over its budget is remembered locally until its
+  Retry-After has passed, and is refused without touching the cache;
+- URL paths are matched to scopes once per process.
+
+An allowed request therefore costs one cache.incr(). A refused one gets a
+429 with a Retry-After header.
+"""
+
+import math
+import time
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger("ratelimit")
+
+KEY_PREFIX = 'ratelimit'
+
+# Endpoints with their own budget; other api_* endpoints use DEFAULT
+SCOPES = {
+    'api_latest_rate': 'LATEST_RATE',
+    'api_predictions': 'PREDICTIONS',
+}
+
+PERIODS = {
+    's': 1, 'sec': 1, 'second': 1,
+    'm': 60, 'min': 60, 'minute': 60,
+    'h': 60 * 60, 'hour': 60 * 60,
+    'd': 60 * 60 * 24, 'day': 60 * 60 * 24,
+}
+
+# Bound on each in-process table; they are cleared when it is reached
+MAX_LOCAL_ENTRIES = 10000
+
+
+def parse_rate(rate: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Parse a budget like '100/hour'.
+
+    Returns:
+        (requests allowed, window in seconds), or None for an empty or 'none' budget
+
+    Raises:
+        ValueError: If the budget is malformed
+    """
+    if not rate or rate.strip().lower() == 'none':
+        return None
+    count, _, period = rate.partition('/')
+    period = period.strip().lower()
+    if period.endswith('s') and period not in PERIODS:
+        period = period[:-1]
+    if period not in PERIODS:
+        raise ValueError(f"Invalid rate limit: {rate}")
+    return int(count), PERIODS[period]
+
+
+def get_rate_limits() -> Dict[str, Tuple[int, int]]:
+    """Parsed API_RATE_LIMIT budgets, leaving out disabled ones."""
+    limits = {}
+    for scope, rate in getattr(settings, 'API_RATE_LIMIT', {}).items():
+        parsed = parse_rate(rate)
+        if parsed:
+            limits[scope] = parsed
+    return limits
+
+
+def _remember(table: Dict, key: Any, value: Any) -> None:
+    if len(table) >= MAX_LOCAL_ENTRIES:
+        table.clear()
+    table[key] = value
+
+
+class SlidingWindowLimiter:
+    """Sliding window request counter shared through the cache."""
+
+    def __init__(self):
+        self._blocked: Dict[Tuple[str, str], float] = {}
+        self._finished: Dict[str, int] = {}
+
+    def _increment(self, key: str, window: int) -> int:
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # First request of the window; the key must outlive the next window too
+            if cache.add(key, 1, window * 2):
+                return 1
+            return cache.incr(key)
+
+    async def _aincrement(self, key: str, window: int) -> int:
+        try:
+            return await cache.aincr(key)
+        except ValueError:
+            if await cache.aadd(key, 1, window * 2):
+                return 1
+            return await cache.aincr(key)
+
+    def _blocked_wait(self, scope: str, client: str, now: float) -> Optional[float]:
+        # Seconds left on a remembered block, or None if the client is not blocked
+        blocked_until = self._blocked.get((scope, client))
+        if blocked_until is None:
+            return None
+        if now < blocked_until:
+            return blocked_until - now
+        del self._blocked[(scope, client)]
+        return None
+
+    def _decide(self, scope: str, client: str, limit: int, window: int, now: float, current: int, previous: int) -> float:
+        index = int(now // window)
+        # Share of the previous window still inside the sliding window
+        overlap = 1 - (now - index * window) / window
+        if previous * overlap + current <= limit:
+            return 0.0
+
+        # Solve for when previous * overlap + current + 1 (the retry itself) fits the budget
+        if current < limit:
+            # Later in this window, once enough of the previous one has slid out
+            wait = index * window + window * (1 - (limit - current - 1) / previous) - now
+        else:
+            # In the next window, where this window's count is the previous one
+            wait = (index + 1) * window - now + window * max(0.0, 1 - (limit - 1) / current)
+        wait = max(wait, 1.0)
+        _remember(self._blocked, (scope, client), now + wait)
+        logger.warning(f"Rate limit {scope} exceeded by {client}, blocked for {wait:.0f}s")
+        return wait
+
+    def hit(self, scope: str, client: str, limit: int, window: int, now: Optional[float] = None) -> float:
+        """
+        Count a request and check it against the budget.
+
+        Args:
+            scope: Budget name, e.g. 'DEFAULT'
+            client: Client identifier
+            limit: Requests allowed per window
+            window: Window length in seconds
+            now: Current time (defaults to time.time())
+
+        Returns:
+            0 if the request is allowed, otherwise the seconds until a retry would be
+        """
+        now = now if now is not None else time.time()
+        wait = self._blocked_wait(scope, client, now)
+        if wait is not None:
+            return wait
+
+        index = int(now // window)
+        key = f'{KEY_PREFIX}:{scope}:{client}'
+        current = self._increment(f'{key}:{index}', window)
+        previous = self._finished.get(f'{key}:{index - 1}')
+        if previous is None:
+            # A finished window's count no longer changes
+            previous = cache.get(f'{key}:{index - 1}', 0)
+            _remember(self._finished, f'{key}:{index - 1}', previous)
+        return self._decide(scope, client, limit, window, now, current, previous)
+
+    async def ahit(self, scope: str, client: str, limit: int, window: int, now: Optional[float] = None) -> float:
+        """Async version of hit(), using the async cache API."""
+        now = now if now is not None else time.time()
+        wait = self._blocked_wait(scope, client, now)
+        if wait is not None:
+            return wait
+
+        index = int(now // window)
+        key = f'{KEY_PREFIX}:{scope}:{client}'
+        current = await self._aincrement(f'{key}:{index}', window)
+        previous = self._finished.get(f'{key}:{index - 1}')
+        if previous is None:
+            previous = await cache.aget(f'{key}:{index - 1}', 0)
+            _remember(self._finished, f'{key}:{index - 1}', previous)
+        return self._decide(scope, client, limit, window, now, current, previous)
+
+
+class RateLimitMiddleware:
+    """
+    Refuse API requests over the client's API_RATE_LIMIT budget with a 429.
+
+    Works for sync and async requests alike; async requests use the async
+    cache API, so they never block the event loop on the cache.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limits = get_rate_limits()
+        self.limiter = SlidingWindowLimiter()
+        self.ip_header = getattr(settings, 'API_RATE_LIMIT_IP_HEADER', '') or 'REMOTE_ADDR'
+        self._scopes: Dict[str, Optional[str]] = {}
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def get_scope(self, path: str) -> Optional[str]:
+        """Budget that applies to a path, or None if it is not rate limited."""
+        if path in self._scopes:
+            return self._scopes[path]
+        try:
+            match = resolve(path)
+        except Resolver404:
+            scope = None
+        else:
+            if match.namespace == 'rate_predictor' and (match.url_name or '').startswith('api_'):
+                scope = SCOPES.get(match.url_name, 'DEFAULT')
+            else:
+                scope = None
+        _remember(self._scopes, path, scope)
+        return scope
+
+    def get_client(self, request) -> str:
+        """
+        Client address of a request.
+
+        A proxy appends the address it saw to a header like X-Forwarded-For;
+        the entries before it come from the client and can be forged, so the
+        last one is used.
+        """
+        return request.META.get(self.ip_header, '').split(',')[-1].strip() or 'unknown'
+
+    def _budget(self, request) -> Optional[Tuple[str, str, int, int]]:
+        # (scope, client, limit, window) for a rate limited request, else None
+        scope = self.get_scope(request.path_info)
+        if scope is None or scope not in self.limits:
+            return None
+        return (scope, self.get_client(request)) + self.limits[scope]
+
+    def _refused(self, limit: int, window: int, wait: float) -> JsonResponse:
+        response = JsonResponse(
+            {'status': 'error', 'message': f'Rate limit exceeded: {limit} requests per {window} seconds'},
+            status=429
+        )
+        response['Retry-After'] = str(math.ceil(wait))
+        return response
+
+    def check(self, request) -> Optional[JsonResponse]:
+        """429 response if the request is over budget, else None."""
+        budget = self._budget(request)
+        if budget is None:
+            return None
+        wait = self.limiter.hit(*budget)
+        return self._refused(*budget[2:], wait) if wait else None
+
+    async def acheck(self, request) -> Optional[JsonResponse]:
+        """Async version of check()."""
+        budget = self._budget(request)
+        if budget is None:
+            return None
+        wait = await self.limiter.ahit(*budget)
+        return self._refused(*budget[2:], wait) if wait else None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.check(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.acheck(request) or await self.get_response(request)
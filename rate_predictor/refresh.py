@@ -0,0 +1,184 @@
+"""
+Refresh registry for ZimRate Predictor
+
+This module makes data refreshes single-flight. Each kind of refresh ('model'
+for the full scrape and update, 'news' for the news scrape on its own) has a
+lock and a "last successful run" timestamp in the configured cache backend:
+
+- the lock is taken with cache.add(), which is atomic on every backend, so
+  only one worker, beat run or web request can start a refresh at a time;
+- the timestamp is written when a refresh completes, and a refresh that is
+  not forced is skipped until REFRESH['INTERVAL'] seconds have passed.
+
+The dashboard, the update_model and update_news_scraper commands and the
+periodic beat task all go through here. trigger_refresh() only checks the
+cache and dispatches; with CELERY_TASK_ALWAYS_EAGER the task runs in a
+background thread so the request that triggered it is not held up.
+"""
+
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+logger = logging.getLogger("refresh")
+
+LOCK_KEY_PREFIX = 'refresh:lock'
+LAST_SUCCESS_KEY_PREFIX = 'refresh:last_success'
+
+
+def get_refresh_config() -> Dict[str, Any]:
+    """Get the refresh settings with defaults filled in."""
+    refresh_config = getattr(settings, 'REFRESH', {})
+    return {
+        'INTERVAL': refresh_config.get('INTERVAL', 60 * 60),
+        'LOCK_TIMEOUT': refresh_config.get('LOCK_TIMEOUT', 35 * 60),
+    }
+
+
+def last_success(name: str) -> Optional[float]:
+    """Time the named refresh last completed, or None if it never has."""
+    return cache.get(f'{LAST_SUCCESS_KEY_PREFIX}:{name}')
+
+
+def is_due(name: str) -> bool:
+    """Whether the named refresh has not completed within the interval."""
+    finished = last_success(name)
+    return finished is None or time.time() - finished >= get_refresh_config()['INTERVAL']
+
+
+def is_running(name: str) -> bool:
+    """Whether someone holds the named refresh's lock."""
+    return cache.get(f'{LOCK_KEY_PREFIX}:{name}') is not None
+
+
+def begin_refresh(name: str, force: bool = False) -> Optional[str]:
+    """
+    Claim the named refresh if it is due and nobody else is running it.
+
+    Args:
+        name: Refresh name, e.g. 'model'
+        force: Skip the interval check (the lock still applies)
+
+    Returns:
+        Lock token to pass to finish_refresh, or None if the refresh should be skipped
+    """
+    if not force and not is_due(name):
+        logger.debug(f"Skipping {name} refresh: completed less than an interval ago")
+        return None
+
+    token = uuid.uuid4().hex
+    if not cache.add(f'{LOCK_KEY_PREFIX}:{name}', token, get_refresh_config()['LOCK_TIMEOUT']):
+        logger.info(f"Skipping {name} refresh: already running")
+        return None
+    return token
+
+
+def finish_refresh(name: str, token: str, success: bool = True) -> None:
+    """
+    Release the named refresh's lock, recording the run if it succeeded.
+
+    Args:
+        name: Refresh name
+        token: Token returned by begin_refresh
+        success: Whether the refresh completed
+    """
+    if success:
+        cache.set(f'{LAST_SUCCESS_KEY_PREFIX}:{name}', time.time(), None)
+
+    lock_key = f'{LOCK_KEY_PREFIX}:{name}'
+    # A lock that timed out may have been taken by another run since
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+@contextmanager
+def refresh_slot(name: str, token: Optional[str] = None, force: bool = False) -> Iterator[bool]:
+    """
+    Run a block as the named refresh, if it is due and not already running.
+
+    Yields whether the block should run. The lock is released afterwards and
+    the run recorded unless the block raised.
+
+    Args:
+        name: Refresh name
+        token: Token of a lock already taken for this run (by trigger_refresh)
+        force: Skip the interval check
+    """
+    token = token or begin_refresh(name, force)
+    if token is None:
+        yield False
+        return
+
+    try:
+        yield True
+    except BaseException:
+        finish_refresh(name, token, success=False)
+        raise
+    finish_refresh(name, token)
+
+
+def _run_in_background(task, kwargs: Dict[str, Any], task_id: str) -> None:
+    def run():
+        try:
+            task.apply(kwargs=kwargs, task_id=task_id)
+        finally:
+            close_old_connections()
+
+    threading.Thread(target=run, name=f'refresh-{task_id}', daemon=True).start()
+
+
+def trigger_refresh(initial: Optional[bool] = None, force: bool = False, background: bool = True) -> Optional[str]:
+    """
+    Start a model refresh unless one is running or completed within the interval.
+
+    Args:
+        initial: Run the initial training instead of an update (defaults to
+            whether there are no predictions yet)
+        force: Skip the interval check
+        background: Never run the task in the calling thread, even when
+            Celery runs tasks eagerly
+
+    Returns:
+        The started task's id, or None if no refresh was started
+    """
+    from rate_predictor.models import RatePrediction, TaskProgress
+    from rate_predictor.progress import publish_progress
+    from rate_predictor.tasks import initial_model_training, update_model_periodic, update_progress
+
+    token = begin_refresh('model', force=force or bool(initial))
+    if token is None:
+        return None
+
+    task_id = uuid.uuid4().hex
+    try:
+        if initial is None:
+            initial = not RatePrediction.objects.exists()
+        task = initial_model_training if initial else update_model_periodic
+        kwargs = {'lock_token': token}
+
+        task_type = 'training' if initial else 'scraping'
+        publish_progress(TaskProgress.objects.create(
+            task_id=task_id,
+            task_type=task_type,
+            status='pending',
+            message='Task starting...'
+        ))
+        if background and getattr(settings, 'CELERY_TASK_ALWAYS_EAGER', False):
+            _run_in_background(task, kwargs, task_id)
+        else:
+            task.apply_async(kwargs=kwargs, task_id=task_id)
+    except Exception as e:
+        if TaskProgress.objects.filter(task_id=task_id).exists():
+            update_progress(task_id, task_type, 0, f"Error: {str(e)}", 'failed')
+        finish_refresh('model', token, success=False)
+        raise
+
+    logger.info(f"Started {'initial training' if initial else 'model update'} {task_id}")
+    return task_id
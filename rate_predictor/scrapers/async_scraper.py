@@ -20,7 +20,9 @@ from rate_predictor.scrapers.web_utils import get_random_headers
 from rate_predictor.scrapers.news_scraper import (
     extract_date, extract_article_text, NEWS_SOURCES, get_page_url
 )
-from rate_predictor.scrapers.relevance_detector import is_relevant
+from rate_predictor.scrapers.relevance_detector import filter_relevant
+from rate_predictor.scrapers.text_analysis import analyze_post
+from rate_predictor.scrapers.nlp_pipeline import is_nlp_enabled
 
 # Configure logging
 logger = logging.getLogger("async_scraper")
@@ -71,6 +73,8 @@ async def scrape_articles_async(source: Dict[str, Any], days_back: int) -> List[
     cutoff_date = timezone.now().date() - timezone.timedelta(days=days_back)
     scrape_config = getattr(settings, 'SCRAPING', {})
     max_articles = scrape_config.get('MAX_ARTICLES_PER_SOURCE', 100)
+    relevance_threshold = scrape_config.get('RELEVANCE_THRESHOLD', 0.4)
+    batch_relevance = is_nlp_enabled()
     
     # Connector with connection limiting and other options
     conn = aiohttp.TCPConnector(
@@ -182,18 +186,23 @@ async def scrape_articles_async(source: Dict[str, Any], days_back: int) -> List[
                     # Extract main content
                     content = extract_article_text(html, source["content_selector"])
                     
-                    # Check relevance
-                    if not is_relevant(title, content, scrape_config.get('RELEVANCE_THRESHOLD', 0.4)):
-                        continue
-                    
-                    # Add article to our results
-                    articles.append({
+                    article_data = {
                         "title": title,
                         "content": content,
                         "url": url,
                         "published_at": article_date,
                         "source_name": source["name"]
-                    })
+                    }
+                    
+                    # Score relevance, sentiment and impact in one pass
+                    if not batch_relevance:
+                        analysis = analyze_post(article_data, relevance_threshold)
+                        if not analysis["is_relevant"]:
+                            continue
+                        article_data["analysis"] = analysis
+                    
+                    # Add article to our results
+                    articles.append(article_data)
                     
                     logger.info(f"Scraped article: {title} from {source['name']}")
                     
@@ -203,6 +212,9 @@ async def scrape_articles_async(source: Dict[str, Any], days_back: int) -> List[
             # Add delay between batches
             await asyncio.sleep(random.uniform(1, 2))
     
+    if batch_relevance:
+        articles = filter_relevant(articles, relevance_threshold)
+    
     logger.info(f"Finished scraping {source['name']}. Found {len(articles)} relevant articles")
     return articles
 
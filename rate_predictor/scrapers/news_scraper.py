@@ -17,7 +17,10 @@ from bs4 import BeautifulSoup
 
 from django.conf import settings
 from rate_predictor.scrapers.web_utils import fetch_url, get_retry_session, get_random_headers, safe_get
-from rate_predictor.scrapers.relevance_detector import is_relevant
+from rate_predictor.scrapers.relevance_detector import filter_relevant
+from rate_predictor.scrapers.text_analysis import analyze_post
+from rate_predictor.scrapers.rate_extractor import process_new_posts
+from rate_predictor.scrapers.nlp_pipeline import is_nlp_enabled
 
 # Configure logging
 logging.basicConfig(
@@ -142,6 +145,9 @@ def scrape_articles_from_source(source: Dict[str, Any], days_back: int = 7) -> L
     cutoff_date = timezone.now().date() - datetime.timedelta(days=days_back)
     scrape_config = getattr(settings, 'SCRAPING', {})
     max_articles = scrape_config.get('MAX_ARTICLES_PER_SOURCE', 100)
+    relevance_threshold = scrape_config.get('RELEVANCE_THRESHOLD', 0.4)
+    # With the spaCy stage on, relevance is decided in one batch after fetching
+    batch_relevance = is_nlp_enabled()
     
     try:
         logger.info(f"Starting to scrape articles from {source['name']}")
@@ -217,18 +223,23 @@ def scrape_articles_from_source(source: Dict[str, Any], days_back: int = 7) -> L
                     # Extract main text content
                     content = extract_article_text(article_html, source["content_selector"])
                     
-                    # Check if the article is relevant to our topic using our enhanced detector
-                    if not is_relevant(title, content, scrape_config.get('RELEVANCE_THRESHOLD', 0.4)):
-                        continue
-                    
-                    # Add the article to our results
-                    articles.append({
+                    article_data = {
                         "title": title,
                         "content": content,
                         "url": article_url,
                         "published_at": article_date,
                         "source_name": source["name"]
-                    })
+                    }
+                    
+                    # Score relevance, sentiment and impact in one pass; skip irrelevant articles
+                    if not batch_relevance:
+                        analysis = analyze_post(article_data, relevance_threshold)
+                        if not analysis["is_relevant"]:
+                            continue
+                        article_data["analysis"] = analysis
+                    
+                    # Add the article to our results
+                    articles.append(article_data)
                     
                     logger.info(f"Scraped article: {title} from {source['name']}")
                     
@@ -246,6 +257,9 @@ def scrape_articles_from_source(source: Dict[str, Any], days_back: int = 7) -> L
     except Exception as e:
         logger.error(f"Unexpected error while scraping {source['name']}: {e}")
     
+    if batch_relevance:
+        articles = filter_relevant(articles, relevance_threshold)
+    
     logger.info(f"Finished scraping {source['name']}. Found {len(articles)} relevant articles")
     return articles
 
@@ -294,6 +308,7 @@ def save_articles_to_db(articles: List[Dict[str, Any]]) -> int:
     from django.utils import timezone
     
     saved_count = 0
+    saved_posts = []
     
     for article in articles:
         try:
@@ -309,8 +324,11 @@ def save_articles_to_db(articles: List[Dict[str, Any]]) -> int:
                     }  
                 )
                 
+                # Articles scraped by this module are already scored
+                analysis = article.get('analysis') or analyze_post(article)
+                
                 # Create the post
-                Post.objects.create(
+                post = Post.objects.create(
                     source_type='news',
                     news_source=source,
                     content=article['content'],
@@ -318,15 +336,20 @@ def save_articles_to_db(articles: List[Dict[str, Any]]) -> int:
                     published_at=timezone.make_aware(
                         datetime.datetime.combine(article['published_at'], datetime.time())
                     ),
-                    sentiment='neutral',  # Default sentiment
-                    sentiment_score=0.0   # Will be updated by sentiment analyzer
+                    sentiment=analysis['sentiment'],
+                    sentiment_score=analysis['sentiment_score'],
+                    impact_score=analysis['impact_score']
                 )
+                saved_posts.append(post)
                 saved_count += 1
                 logger.info(f"Saved article: {article.get('title', 'Untitled')}")
         except Exception as e:
             logger.error(f"Error saving article to database: {e}")
             continue
     
+    # Pull rate quotes out of the new posts and refresh the parallel rate estimates
+    process_new_posts(saved_posts)
+    
     logger.info(f"Saved {saved_count} new articles to database")
     return saved_count
 
@@ -378,19 +401,26 @@ def run_news_scraper(days_back: int = 7, initial_scrape: bool = False, sources:
 
 def train_model_with_initial_data() -> None:
     """
-    Train the model using the initial data scraped from the last 2 years.
-    This is a placeholder for the actual model training functionality.
+    Train the model using the initial data scraped from the last 2 years
+    and store the first set of predictions.
     """
+    from rate_predictor.prediction.online import refit_model
+    
     logger.info("Training model with initial data...")
-    # This would contain the actual model training code
+    saved = refit_model()
+    logger.info(f"Initial training stored {saved} predictions")
 
 def update_model_incrementally(days_back: int = 7) -> None:
     """
-    Update the model incrementally with new data.
-    This is a placeholder for the actual model update functionality.
+    Update the model with new data and refresh the predictions.
+    Only days newer than the persisted model state are read and each one is
+    applied as a constant-time recursive least squares step.
     """
+    from rate_predictor.prediction.online import update_model
+    
     logger.info(f"Incrementally updating model with data from the past {days_back} days...")
-    # This would contain the actual incremental model update code
+    saved = update_model()
+    logger.info(f"Model update stored {saved} predictions")
 
 async def scrape_articles_async(source: Dict[str, Any], days_back: int) -> List[Dict[str, Any]]:
     """
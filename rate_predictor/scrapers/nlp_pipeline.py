@@ -0,0 +1,209 @@
+"""
+spaCy NLP pipeline for ZimRate Predictor
+
+This module provides an opt-in spaCy stage (tokenization, lemmatization and
+named entity recognition) for posts and articles. The model is loaded lazily,
+once per worker process, with the components we don't use disabled, and texts
+are always processed in batches through ``nlp.pipe``.
+
+spaCy is never imported at module level: web processes that import the
+scrapers package (e.g. for ``get_overall_sentiment``) never load it.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger("nlp_pipeline")
+
+# Components the sentiment and relevance scoring never look at
+DISABLED_COMPONENTS = ["parser", "senter", "textcat", "textcat_multilabel"]
+
+# Institutions the statistical NER model tends to miss or mislabel
+ENTITY_PATTERNS = [
+    {"label": "ORG", "pattern": [{"LOWER": "rbz"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "reserve"}, {"LOWER": "bank"}, {"LOWER": "of"}, {"LOWER": "zimbabwe"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "ministry"}, {"LOWER": "of"}, {"LOWER": "finance"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "ministry"}, {"LOWER": "of"}, {"LOWER": "finance"},
+                                 {"LOWER": "and"}, {"LOWER": "economic"}, {"LOWER": "development"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "monetary"}, {"LOWER": "policy"}, {"LOWER": "committee"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "treasury"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "imf"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "world"}, {"LOWER": "bank"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "zimstat"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "zimswitch"}]},
+]
+
+# One model per process; the lock only matters for threaded workers
+_nlp = None
+_nlp_failed = False
+_nlp_lock = threading.Lock()
+
+
+def get_nlp_config() -> Dict[str, Any]:
+    """Get the NLP settings with defaults filled in."""
+    nlp_config = getattr(settings, 'NLP', {})
+    return {
+        'ENABLED': nlp_config.get('ENABLED', False),
+        'SPACY_MODEL': nlp_config.get('SPACY_MODEL', 'en_core_web_sm'),
+        'BATCH_SIZE': nlp_config.get('BATCH_SIZE', 64),
+        'N_PROCESS': nlp_config.get('N_PROCESS', 1),
+    }
+
+
+def is_nlp_enabled() -> bool:
+    """Check whether the spaCy stage has been switched on in settings."""
+    return bool(get_nlp_config()['ENABLED'])
+
+
+def get_nlp():
+    """
+    Get the spaCy pipeline for this process, loading it on first use.
+
+    Returns:
+        spaCy Language object or None if spaCy or the model is unavailable
+    """
+    global _nlp, _nlp_failed
+
+    if _nlp is not None or _nlp_failed:
+        return _nlp
+
+    with _nlp_lock:
+        if _nlp is not None or _nlp_failed:
+            return _nlp
+
+        model_name = get_nlp_config()['SPACY_MODEL']
+        try:
+            import spacy
+
+            nlp = spacy.load(model_name, disable=DISABLED_COMPONENTS)
+
+            # Rule-based entities run before the statistical NER and win on overlap
+            if "entity_ruler" not in nlp.pipe_names:
+                before = "ner" if "ner" in nlp.pipe_names else None
+                ruler = nlp.add_pipe("entity_ruler", before=before, config={"overwrite_ents": True})
+                ruler.add_patterns(ENTITY_PATTERNS)
+
+            _nlp = nlp
+            logger.info(f"Loaded spaCy model '{model_name}' with components: {nlp.pipe_names}")
+        except ImportError:
+            _nlp_failed = True
+            logger.warning("spaCy not found. NLP stage will be disabled.")
+        except OSError as e:
+            _nlp_failed = True
+            logger.warning(f"spaCy model '{model_name}' not available ({e}). NLP stage will be disabled.")
+
+    return _nlp
+
+
+def doc_to_features(doc) -> Dict[str, Any]:
+    """
+    Reduce a spaCy Doc to the plain data the scoring code needs.
+
+    Args:
+        doc: Processed spaCy Doc
+
+    Returns:
+        Dictionary with lowercased lemmas, the joined lemma text and entities
+    """
+    lemmas = [
+        (token.lemma_ or token.text).lower()
+        for token in doc
+        if not token.is_space and not token.is_punct
+    ]
+    return {
+        "lemmas": lemmas,
+        "lemma_text": " ".join(lemmas),
+        "entities": [(ent.text, ent.label_) for ent in doc.ents],
+    }
+
+
+def process_texts(
+    texts: Iterable[str],
+    batch_size: Optional[int] = None,
+    n_process: Optional[int] = None
+) -> Iterator[Optional[Dict[str, Any]]]:
+    """
+    Run texts through the spaCy pipeline in batches.
+
+    Args:
+        texts: Texts to process
+        batch_size: Texts per batch (defaults to NLP['BATCH_SIZE'])
+        n_process: Worker processes for nlp.pipe (defaults to NLP['N_PROCESS'])
+
+    Returns:
+        Iterator of feature dictionaries, or of None per text if spaCy is unavailable
+    """
+    nlp_config = get_nlp_config()
+    nlp = get_nlp()
+
+    if nlp is None:
+        for _ in texts:
+            yield None
+        return
+
+    docs = nlp.pipe(
+        texts,
+        batch_size=batch_size or nlp_config['BATCH_SIZE'],
+        n_process=n_process or nlp_config['N_PROCESS']
+    )
+    for doc in docs:
+        yield doc_to_features(doc)
+
+
+def lemmatize_texts(texts: List[str], **kwargs) -> List[str]:
+    """
+    Get lemma text for each input, falling back to the original text.
+
+    Args:
+        texts: Texts to lemmatize
+        **kwargs: Passed through to process_texts
+
+    Returns:
+        List of lemmatized texts in the same order as the input
+    """
+    return [
+        features["lemma_text"] if features else text
+        for text, features in zip(texts, process_texts(texts, **kwargs))
+    ]
+
+
+def annotate_items(
+    items: List[Dict[str, Any]],
+    content_key: str = "content",
+    title_key: str = "title",
+    **kwargs
+) -> List[Dict[str, Any]]:
+    """
+    Add 'lemma_text', 'lemma_title' and 'entities' to scraped item dictionaries.
+
+    Args:
+        items: Scraped article or post dictionaries
+        content_key: Key holding the main text
+        title_key: Key holding the title (optional on items)
+        **kwargs: Passed through to process_texts
+
+    Returns:
+        The same list, annotated in place
+    """
+    if not items:
+        return items
+
+    texts = []
+    for item in items:
+        texts.append(item.get(title_key) or "")
+        texts.append(item.get(content_key) or "")
+
+    results = process_texts(texts, **kwargs)
+    for item in items:
+        title_features = next(results)
+        content_features = next(results)
+        if content_features is None:
+            continue
+        item["lemma_title"] = title_features["lemma_text"]
+        item["lemma_text"] = content_features["lemma_text"]
+        item["entities"] = title_features["entities"] + content_features["entities"]
+
+    return items
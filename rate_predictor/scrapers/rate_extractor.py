@@ -0,0 +1,263 @@
+"""
+Rate mention extractor for ZimRate Predictor
+
+This module pulls numeric ZWL/USD quotes (e.g. "1 USD = 350 ZWL") out of post
+text, stores them as RateObservation rows linked to their Post, and turns a
+day's observations into a robust parallel market rate estimate.
+
+Quotes are extracted once, when posts are saved, so daily estimates only read
+the indexed observations table and never rescan old posts.
+"""
+
+import re
+import logging
+import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger("rate_extractor")
+
+# Building blocks for the quote patterns
+_NUMBER = r'(?P<rate>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)'
+_ZWL = r'(?:ZWL\$?|Z\$|RTGS\$?|ZW\$)'
+# The 1 must not be the last digit of a larger amount ("11 USD = ...")
+_ONE_USD = r'(?:(?:US)?\$\s?1(?:\.00)?|(?<![\d.,])1\s*(?:USD|US\$|US\s+dollar)|\bone\s+US\s+dollar)'
+_USD = r'(?:USD|US\$|US\s+dollar|\$)'
+_LINK = r'\s*(?:=|:|to|for|is|at|trades\s+at|-)\s*'
+_PER = r'\s*(?:/|per|to\s+(?:the|one|1)?|against\s+the)\s*'
+
+# Each pattern captures the ZWL amount for one US dollar as group 'rate'
+RATE_QUOTE_PATTERNS = [
+    # 1 USD = ZWL 350, US$1 : Z$350
+    rf'{_ONE_USD}{_LINK}{_ZWL}\s*{_NUMBER}',
+    # 1 USD = 350 ZWL, $1 to 350 RTGS
+    rf'{_ONE_USD}{_LINK}{_NUMBER}\s*{_ZWL}',
+    # 350 ZWL/USD, 350 RTGS to the US dollar
+    rf'{_NUMBER}\s*{_ZWL}{_PER}{_USD}',
+    # ZWL350 per US$
+    rf'{_ZWL}\s*{_NUMBER}{_PER}{_USD}',
+    # USD/ZWL 350, ZWL/USD rate of 350
+    rf'(?:{_USD}\s*/\s*{_ZWL}|{_ZWL}\s*/\s*{_USD})\s*(?:rate\s+)?(?:of|at|=|:|is)?\s*{_NUMBER}',
+]
+COMPILED_RATE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in RATE_QUOTE_PATTERNS]
+
+# Cheap pre-check so texts without a ZWL marker skip the full patterns
+_ZWL_MARKER_RE = re.compile(r'zwl|z\$|rtgs|zw\$', re.IGNORECASE)
+
+
+def get_extractor_config() -> Dict:
+    """Get the parallel rate estimation settings with defaults filled in."""
+    extractor_config = getattr(settings, 'PARALLEL_RATE_ESTIMATION', {})
+    return {
+        'MIN_RATE': extractor_config.get('MIN_RATE', 1.0),
+        'MAX_RATE': extractor_config.get('MAX_RATE', 10000000.0),
+        'ESTIMATOR': extractor_config.get('ESTIMATOR', 'median'),
+        'TRIM_FRACTION': extractor_config.get('TRIM_FRACTION', 0.1),
+        'MIN_OBSERVATIONS': extractor_config.get(
+            'MIN_OBSERVATIONS', getattr(settings, 'MIN_SOURCES_REQUIRED', 2)
+        ),
+    }
+
+
+def _parse_rate(value: str) -> Optional[Decimal]:
+    """Parse a captured number like '1,250.50' into a Decimal."""
+    try:
+        return Decimal(value.replace(',', '')).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return None
+
+
+def extract_rate_mentions(text: str) -> List[Tuple[Decimal, str]]:
+    """
+    Extract ZWL per USD quotes from a single text.
+
+    Args:
+        text: Post or article text
+
+    Returns:
+        List of (rate, matched text) tuples, one per distinct quote
+    """
+    if not text or not _ZWL_MARKER_RE.search(text):
+        return []
+
+    extractor_config = get_extractor_config()
+    min_rate = Decimal(str(extractor_config['MIN_RATE']))
+    max_rate = Decimal(str(extractor_config['MAX_RATE']))
+
+    mentions = []
+    seen_spans = []
+    for pattern in COMPILED_RATE_PATTERNS:
+        for match in pattern.finditer(text):
+            start, end = match.span()
+            # Patterns can overlap on the same quote; keep the first one
+            if any(start < seen_end and end > seen_start for seen_start, seen_end in seen_spans):
+                continue
+
+            rate = _parse_rate(match.group('rate'))
+            if rate is None or not (min_rate < rate < max_rate):
+                continue
+
+            seen_spans.append((start, end))
+            mentions.append((rate, match.group(0)[:100]))
+
+    return mentions
+
+
+def extract_rate_mentions_batch(texts: Iterable[str]) -> List[List[Tuple[Decimal, str]]]:
+    """
+    Extract quotes from many texts.
+
+    Args:
+        texts: Post or article texts
+
+    Returns:
+        List of mention lists in the same order as the input
+    """
+    return [extract_rate_mentions(text) for text in texts]
+
+
+def record_rate_observations(posts: List) -> Set[datetime.date]:
+    """
+    Extract quotes from newly saved posts and store them in one bulk insert.
+
+    Args:
+        posts: Saved Post instances
+
+    Returns:
+        Set of dates that received new observations
+    """
+    from rate_predictor.models import RateObservation
+
+    observations = []
+    for post, mentions in zip(posts, extract_rate_mentions_batch(p.content for p in posts)):
+        observed_on = post.published_at.date()
+        for rate, matched_text in mentions:
+            observations.append(RateObservation(
+                post=post,
+                observed_on=observed_on,
+                rate=rate,
+                matched_text=matched_text
+            ))
+
+    if not observations:
+        return set()
+
+    RateObservation.objects.bulk_create(observations)
+    logger.info(f"Recorded {len(observations)} rate observations from {len(posts)} posts")
+    return {observation.observed_on for observation in observations}
+
+
+def robust_rate_estimate(rates: np.ndarray, estimator: str = 'median', trim_fraction: float = 0.1) -> float:
+    """
+    Compute a robust central estimate of a day's quotes.
+
+    Args:
+        rates: Array of quoted rates
+        estimator: 'median' or 'trimmed_mean'
+        trim_fraction: Fraction cut from each tail for the trimmed mean
+
+    Returns:
+        Estimated rate
+    """
+    if estimator == 'trimmed_mean':
+        rates = np.sort(rates)
+        cut = int(len(rates) * trim_fraction)
+        if cut and len(rates) > 2 * cut:
+            rates = rates[cut:len(rates) - cut]
+        return float(rates.mean())
+    return float(np.median(rates))
+
+
+def estimate_parallel_rates(dates: Iterable[datetime.date]) -> Dict[datetime.date, Decimal]:
+    """
+    Estimate the parallel rate for each date from its stored observations.
+
+    Args:
+        dates: Dates to estimate
+
+    Returns:
+        Mapping of date to estimated rate, for dates with enough observations
+    """
+    from rate_predictor.models import RateObservation
+
+    extractor_config = get_extractor_config()
+    dates = list(dates)
+    if not dates:
+        return {}
+
+    rates_by_date: Dict[datetime.date, List[float]] = {}
+    for observed_on, rate in RateObservation.objects.filter(
+        observed_on__in=dates
+    ).values_list('observed_on', 'rate').order_by():
+        rates_by_date.setdefault(observed_on, []).append(float(rate))
+
+    estimates = {}
+    for observed_on, rates in rates_by_date.items():
+        if len(rates) < extractor_config['MIN_OBSERVATIONS']:
+            continue
+        estimate = robust_rate_estimate(
+            np.asarray(rates),
+            extractor_config['ESTIMATOR'],
+            extractor_config['TRIM_FRACTION']
+        )
+        estimates[observed_on] = Decimal(str(estimate)).quantize(Decimal('0.01'))
+
+    return estimates
+
+
+def update_parallel_rates(dates: Iterable[datetime.date]) -> int:
+    """
+    Write parallel rate estimates onto existing ExchangeRate rows.
+
+    Args:
+        dates: Dates whose observations changed
+
+    Returns:
+        Number of ExchangeRate rows updated
+    """
+    from rate_predictor.models import ExchangeRate
+    from rate_predictor.caching import bump_data_version
+
+    estimates = estimate_parallel_rates(dates)
+    if not estimates:
+        return 0
+
+    now = timezone.now()
+    rates = list(ExchangeRate.objects.filter(date__in=estimates.keys()))
+    for rate in rates:
+        rate.parallel_rate = estimates[rate.date]
+        rate.updated_at = now
+
+    ExchangeRate.objects.bulk_update(rates, ['parallel_rate', 'updated_at'])
+    # bulk_update sends no post_save
+    bump_data_version('ExchangeRate')
+
+    missing = len(estimates) - len(rates)
+    if missing:
+        # The observations are kept; the ingester applies them once the official rate is stored
+        logger.warning(f"No official rate stored yet for {missing} dates with parallel estimates")
+
+    logger.info(f"Updated parallel rate estimates for {len(rates)} days")
+    return len(rates)
+
+
+def process_new_posts(posts: List) -> int:
+    """
+    Record quotes from newly saved posts and refresh the affected days.
+
+    Args:
+        posts: Saved Post instances
+
+    Returns:
+        Number of ExchangeRate rows updated
+    """
+    try:
+        touched_dates = record_rate_observations(posts)
+        return update_parallel_rates(touched_dates)
+    except Exception as e:
+        logger.error(f"Error recording rate observations: {e}")
+        return 0
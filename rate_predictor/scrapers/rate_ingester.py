@@ -0,0 +1,293 @@
+"""
+Exchange rate ingester for ZimRate Predictor
+
+This module fills ExchangeRate with official ZWL/USD rates from the sources
+in settings.RATE_SOURCES. It first works out which dates in the requested
+range have no stored rate, then fetches only those: a source URL containing
+a {date} placeholder is requested once per missing date, any other URL is
+requested once and its table filtered to the missing dates. Sources are
+tried in RATE_INGESTION['SOURCES'] order, so later ones only fill the gaps
+left by earlier ones.
+
+Rate tables are read with pandas (lxml parser). A table can either list one
+rate per date (a date column) or one rate per currency on a page for a
+single date (a currency column). Rates are written in one
+bulk_create(update_conflicts=True) on the unique date, so re-ingesting a day
+corrects it in place without touching its parallel rate.
+"""
+
+import re
+import logging
+import datetime
+from io import StringIO
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+from django.conf import settings
+from django.utils import timezone
+
+from rate_predictor.scrapers.web_utils import fetch_url
+
+logger = logging.getLogger("rate_ingester")
+
+DATE_COLUMN_PATTERN = r'date'
+CURRENCY_COLUMN_PATTERN = r'currency|pair|code'
+
+
+def get_ingestion_config() -> Dict[str, Any]:
+    """Get the rate ingestion settings with defaults filled in."""
+    ingestion_config = getattr(settings, 'RATE_INGESTION', {})
+    return {
+        'SOURCES': ingestion_config.get('SOURCES', ['rbz', 'interbank']),
+        'CURRENCY': ingestion_config.get('CURRENCY', 'USD'),
+        'RATE_COLUMN': ingestion_config.get('RATE_COLUMN', r'mid|average|rate'),
+        'DATE_FORMAT': ingestion_config.get('DATE_FORMAT', '%Y-%m-%d'),
+        'BACKFILL_DAYS': ingestion_config.get('BACKFILL_DAYS', 30),
+        'SKIP_WEEKENDS': ingestion_config.get('SKIP_WEEKENDS', True),
+    }
+
+
+def missing_dates(
+    start: datetime.date,
+    end: datetime.date,
+    skip_weekends: bool = True,
+    include_stored: bool = False
+) -> List[datetime.date]:
+    """
+    List the dates in a range that have no stored exchange rate.
+
+    Args:
+        start: First date (inclusive)
+        end: Last date (inclusive)
+        skip_weekends: Leave out Saturdays and Sundays, when no rates are published
+        include_stored: List dates that already have a rate too
+
+    Returns:
+        Sorted list of dates
+    """
+    from rate_predictor.models import ExchangeRate
+
+    stored = set()
+    if not include_stored:
+        stored = set(ExchangeRate.objects.filter(date__range=(start, end)).values_list('date', flat=True))
+    dates = []
+    day = start
+    while day <= end:
+        if day not in stored and not (skip_weekends and day.weekday() >= 5):
+            dates.append(day)
+        day += datetime.timedelta(days=1)
+    return dates
+
+
+def _column_name(column: Any) -> str:
+    if isinstance(column, tuple):
+        return ' '.join(str(part) for part in column if not str(part).startswith('Unnamed'))
+    return str(column)
+
+
+def _find_column(columns: Iterable[str], pattern: str, exclude: Iterable[str] = ()) -> Optional[str]:
+    for column in columns:
+        if column not in exclude and re.search(pattern, column, re.IGNORECASE):
+            return column
+    return None
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    Parse a date column, reading ISO dates as year-month-day.
+
+    Values that are not ISO 8601 are parsed day first (19/01/2024), as the
+    sources publish them. Unparseable values become NaT.
+    """
+    dates = pd.to_datetime(values, format='ISO8601', errors='coerce')
+    rest = dates.isna() & values.notna()
+    if rest.any():
+        dates[rest] = pd.to_datetime(values[rest], dayfirst=True, errors='coerce', format='mixed')
+    return dates
+
+
+def rates_from_table(table: pd.DataFrame, page_date: Optional[datetime.date] = None, config: Optional[Dict[str, Any]] = None) -> Dict[datetime.date, Decimal]:
+    """
+    Extract ZWL per USD rates from one table.
+
+    Args:
+        table: Table with its header as column names
+        page_date: Date the table is for, used when it has no date column
+        config: Ingestion config
+
+    Returns:
+        Mapping of date to rate (empty if the table has no usable columns)
+    """
+    config = config or get_ingestion_config()
+    columns = [_column_name(column) for column in table.columns]
+    table = table.set_axis(columns, axis=1)
+
+    date_column = _find_column(columns, DATE_COLUMN_PATTERN)
+    currency_column = _find_column(columns, CURRENCY_COLUMN_PATTERN, exclude=[date_column])
+    rate_column = _find_column(columns, config['RATE_COLUMN'], exclude=[date_column, currency_column])
+    if rate_column is None or (date_column is None and page_date is None):
+        return {}
+
+    if currency_column is not None:
+        table = table[table[currency_column].astype(str).str.contains(config['CURRENCY'], case=False, na=False)]
+
+    values = pd.to_numeric(
+        table[rate_column].astype(str).str.replace(r'[^\d.]', '', regex=True),
+        errors='coerce'
+    )
+    if date_column is not None:
+        dates = parse_dates(table[date_column])
+    else:
+        dates = pd.Series(pd.Timestamp(page_date), index=table.index)
+
+    rates = {}
+    for date, value in zip(dates, values):
+        if pd.isna(date) or pd.isna(value) or value <= 0:
+            continue
+        rates.setdefault(date.date(), Decimal(str(float(value))).quantize(Decimal('0.01')))
+    return rates
+
+
+def parse_rate_tables(html: str, page_date: Optional[datetime.date] = None, config: Optional[Dict[str, Any]] = None) -> Dict[datetime.date, Decimal]:
+    """
+    Extract ZWL per USD rates from the tables on a page.
+
+    Args:
+        html: Page content
+        page_date: Date the page is for, used for tables without a date column
+        config: Ingestion config
+
+    Returns:
+        Mapping of date to rate; the first table giving a date wins
+    """
+    config = config or get_ingestion_config()
+    try:
+        tables = pd.read_html(StringIO(html), flavor='lxml')
+    except ValueError:
+        # No <table> on the page
+        return {}
+
+    rates = {}
+    for table in tables:
+        for date, rate in rates_from_table(table, page_date, config).items():
+            rates.setdefault(date, rate)
+    return rates
+
+
+def fetch_source_rates(url: str, dates: List[datetime.date], config: Optional[Dict[str, Any]] = None) -> Dict[datetime.date, Decimal]:
+    """
+    Fetch the rates for specific dates from one source.
+
+    Args:
+        url: Source URL, optionally with a {date} placeholder
+        dates: Dates to fetch
+        config: Ingestion config
+
+    Returns:
+        Mapping of date to rate, limited to the requested dates
+    """
+    config = config or get_ingestion_config()
+    wanted = set(dates)
+
+    if '{date}' not in url:
+        html = fetch_url(url)
+        if not html:
+            return {}
+        return {date: rate for date, rate in parse_rate_tables(html, config=config).items() if date in wanted}
+
+    rates = {}
+    for date in dates:
+        html = fetch_url(url.format(date=date.strftime(config['DATE_FORMAT'])))
+        if not html:
+            continue
+        page_rates = parse_rate_tables(html, page_date=date, config=config)
+        if date in page_rates:
+            rates[date] = page_rates[date]
+    return rates
+
+
+def save_rates(rates: Dict[datetime.date, Decimal]) -> int:
+    """
+    Upsert official rates in one statement and refresh what depends on them.
+
+    Parallel rate estimates waiting for these days are written onto the new
+    rows, and the feature store is recomputed from the earliest changed day.
+
+    Args:
+        rates: Mapping of date to official rate
+
+    Returns:
+        Number of rows written
+    """
+    from rate_predictor.models import ExchangeRate
+    from rate_predictor.caching import bump_data_version
+    from rate_predictor.scrapers.rate_extractor import update_parallel_rates
+    from rate_predictor.prediction.feature_store import update_feature_store
+
+    if not rates:
+        return 0
+
+    ExchangeRate.objects.bulk_create(
+        [ExchangeRate(date=date, official_rate=rate) for date, rate in sorted(rates.items())],
+        update_conflicts=True,
+        unique_fields=['date'],
+        update_fields=['official_rate', 'updated_at']
+    )
+    # bulk_create sends no post_save
+    bump_data_version('ExchangeRate')
+    update_parallel_rates(rates.keys())
+    update_feature_store(since=min(rates))
+
+    logger.info(f"Stored official rates for {len(rates)} days ({min(rates)} to {max(rates)})")
+    return len(rates)
+
+
+def ingest_rates(
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    sources: Optional[List[str]] = None,
+    refresh: bool = False
+) -> int:
+    """
+    Fetch and store the official rates missing from a date range.
+
+    Args:
+        start: First date (defaults to BACKFILL_DAYS before end)
+        end: Last date (defaults to today)
+        sources: RATE_SOURCES keys to try, in order
+        refresh: Re-fetch dates that already have a rate, to pick up corrections
+
+    Returns:
+        Number of rows written
+    """
+    from rate_predictor.snapshot import rebuild_dashboard_snapshot
+
+    config = get_ingestion_config()
+    rate_sources = getattr(settings, 'RATE_SOURCES', {})
+    end = end or timezone.now().date()
+    start = start or end - datetime.timedelta(days=config['BACKFILL_DAYS'])
+
+    wanted = missing_dates(start, end, config['SKIP_WEEKENDS'], include_stored=refresh)
+    if not wanted:
+        logger.info(f"No missing exchange rates between {start} and {end}")
+        return 0
+
+    remaining: Set[datetime.date] = set(wanted)
+    found: Dict[datetime.date, Decimal] = {}
+    for source in sources or config['SOURCES']:
+        url = rate_sources.get(source)
+        if not url or not remaining:
+            continue
+        rates = fetch_source_rates(url, sorted(remaining), config)
+        logger.info(f"Fetched {len(rates)} of {len(remaining)} missing rates from {source}")
+        found.update(rates)
+        remaining -= rates.keys()
+
+    if remaining:
+        logger.info(f"No source had rates for {len(remaining)} dates")
+    written = save_rates(found)
+    if written:
+        rebuild_dashboard_snapshot()
+    return written
+
@@ -0,0 +1,330 @@
+"""
+Rate sheet importer for ZimRate Predictor
+
+This module backfills ExchangeRate from a directory of downloaded RBZ rate
+sheets (XLSX and PDF). Files are parsed in a process pool; each result is
+cached on disk under the file's SHA-256 (and the parser settings), so
+re-running over the same directory only parses new or changed files. All
+rates found are then upserted in one bulk step through the rate ingester.
+
+Sheets are read with the same table logic as the rate ingester: a table with
+a date column gives one rate per row, and a per-currency table takes its
+date from the sheet's title text or, failing that, the file name.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from django.conf import settings
+
+from rate_predictor.scrapers.rate_ingester import (
+    CURRENCY_COLUMN_PATTERN,
+    DATE_COLUMN_PATTERN,
+    get_ingestion_config,
+    rates_from_table,
+    save_rates,
+)
+
+logger = logging.getLogger("rate_sheets")
+
+# Flags to track which sheet formats can be read
+OPENPYXL_AVAILABLE = False
+PDFPLUMBER_AVAILABLE = False
+
+try:
+    import openpyxl  # noqa: F401 (engine for pandas.read_excel)
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    logger.warning("openpyxl not found. XLSX rate sheets cannot be imported.")
+
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    logger.warning("pdfplumber not found. PDF rate sheets cannot be imported.")
+
+# Bump when parsing changes so cached results are not reused
+PARSER_VERSION = 2
+
+SHEET_SUFFIXES = ('.xlsx', '.xlsm', '.pdf')
+
+# pdfplumber settings for tables laid out by whitespace only
+TEXT_TABLE_SETTINGS = {'vertical_strategy': 'text', 'horizontal_strategy': 'text'}
+
+_MONTHS = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*'
+ISO_DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+DATE_TEXT_PATTERNS = [
+    ISO_DATE_PATTERN,
+    re.compile(r'\d{1,2}[./-]\d{1,2}[./-]\d{4}'),
+    re.compile(rf'\d{{1,2}}(?:st|nd|rd|th)?[\s_-]+{_MONTHS}[\s_,-]+\d{{4}}', re.IGNORECASE),
+    re.compile(rf'{_MONTHS}[\s_-]+\d{{1,2}}(?:st|nd|rd|th)?,?[\s_-]+\d{{4}}', re.IGNORECASE),
+]
+
+
+def get_sheet_config() -> Dict[str, Any]:
+    """Get the rate sheet import settings with defaults filled in."""
+    sheet_config = getattr(settings, 'RATE_SHEETS', {})
+    return {
+        'CACHE_PATH': Path(sheet_config.get('CACHE_PATH', Path(settings.BASE_DIR) / 'rate_sheet_cache')),
+        'WORKERS': sheet_config.get('WORKERS'),
+    }
+
+
+def find_date(text: str) -> Optional[datetime.date]:
+    """
+    Find the first date written in a piece of text (day first when ambiguous,
+    except in ISO dates).
+
+    Args:
+        text: Title, page text or file name
+
+    Returns:
+        The date, or None if there is none
+    """
+    for pattern in DATE_TEXT_PATTERNS:
+        for match in pattern.finditer(text):
+            if pattern is ISO_DATE_PATTERN:
+                # Year first, never day first
+                try:
+                    return datetime.date.fromisoformat(match.group(0))
+                except ValueError:
+                    continue
+            value = re.sub(r'(?<=\d)(?:st|nd|rd|th)|_', ' ', match.group(0))
+            parsed = pd.to_datetime(value, dayfirst=True, errors='coerce')
+            if not pd.isna(parsed):
+                return parsed.date()
+    return None
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _split_grid(grid: pd.DataFrame, config: Dict[str, Any]) -> Tuple[Optional[pd.DataFrame], str]:
+    """
+    Find the header row of a raw sheet and split it into title text and table.
+
+    Returns:
+        (table with the header row as column names or None, text above the header)
+    """
+    for position, (_, row) in enumerate(grid.iterrows()):
+        cells = [str(cell) for cell in row if not pd.isna(cell)]
+        has_rate = any(re.search(config['RATE_COLUMN'], cell, re.IGNORECASE) for cell in cells)
+        has_key = any(
+            re.search(DATE_COLUMN_PATTERN, cell, re.IGNORECASE) or re.search(CURRENCY_COLUMN_PATTERN, cell, re.IGNORECASE)
+            for cell in cells
+        )
+        if has_rate and has_key:
+            title = ' '.join(str(cell) for cell in grid.iloc[:position].to_numpy().ravel() if not pd.isna(cell))
+            table = grid.iloc[position + 1:].dropna(how='all')
+            table.columns = [str(cell) if not pd.isna(cell) else f'column {i}' for i, cell in enumerate(row)]
+            return table, title
+    return None, ''
+
+
+def _parse_excel(path: Path, config: Dict[str, Any]) -> Dict[datetime.date, Decimal]:
+    rates = {}
+    for grid in pd.read_excel(path, sheet_name=None, header=None).values():
+        table, title = _split_grid(grid, config)
+        if table is None:
+            continue
+        page_date = find_date(title) or find_date(path.stem)
+        for date, rate in rates_from_table(table, page_date, config).items():
+            rates.setdefault(date, rate)
+    return rates
+
+
+def _parse_pdf(path: Path, config: Dict[str, Any]) -> Dict[datetime.date, Decimal]:
+    rates = {}
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            page_date = find_date(page.extract_text() or '') or find_date(path.stem)
+            # Ruled tables first; sheets without cell borders need the text layout
+            tables = page.extract_tables() or page.extract_tables(TEXT_TABLE_SETTINGS)
+            for rows in tables:
+                # Text-layout tables can start with title lines above the header
+                table, _ = _split_grid(pd.DataFrame(rows).replace('', None), config)
+                if table is None:
+                    continue
+                for date, rate in rates_from_table(table, page_date, config).items():
+                    rates.setdefault(date, rate)
+    return rates
+
+
+def parse_sheet(path: str, config: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Parse one rate sheet. Runs in pool workers, so it takes and returns plain data.
+
+    Args:
+        path: Sheet file path
+        config: Ingestion config
+
+    Returns:
+        Mapping of ISO date to rate string
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.pdf':
+        if not PDFPLUMBER_AVAILABLE:
+            raise RuntimeError("pdfplumber is not installed")
+        rates = _parse_pdf(path, config)
+    else:
+        if not OPENPYXL_AVAILABLE:
+            raise RuntimeError("openpyxl is not installed")
+        rates = _parse_excel(path, config)
+    return {date.isoformat(): str(rate) for date, rate in rates.items()}
+
+
+def _parse_task(job: Tuple[str, Dict[str, Any]]) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+    path, config = job
+    try:
+        return parse_sheet(path, config), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _cache_key(digest: str, config: Dict[str, Any]) -> str:
+    settings_key = json.dumps(
+        [PARSER_VERSION, config['CURRENCY'], config['RATE_COLUMN']], sort_keys=True
+    ).encode()
+    return f"{digest}-{hashlib.sha256(settings_key).hexdigest()[:8]}"
+
+
+def _read_cache(cache_path: Path, key: str) -> Optional[Dict[str, str]]:
+    try:
+        with open(cache_path / f'{key}.json') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_cache(cache_path: Path, key: str, rates: Dict[str, str]) -> None:
+    cache_path.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path / f'.{key}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(rates, f)
+    os.replace(tmp_path, cache_path / f'{key}.json')
+
+
+def _changed_rates(rates: Dict[datetime.date, Decimal]) -> Dict[datetime.date, Decimal]:
+    """Drop the rates that are already stored with the same value."""
+    from rate_predictor.models import ExchangeRate
+
+    if not rates:
+        return {}
+    stored = dict(ExchangeRate.objects.filter(
+        date__range=(min(rates), max(rates))
+    ).values_list('date', 'official_rate'))
+    return {date: rate for date, rate in rates.items() if stored.get(date) != rate}
+
+
+def find_sheets(directory: Path, recursive: bool = False) -> List[Path]:
+    """List the rate sheet files in a directory, sorted by path."""
+    pattern = '**/*' if recursive else '*'
+    return sorted(
+        path for path in directory.glob(pattern)
+        if path.is_file() and path.suffix.lower() in SHEET_SUFFIXES and not path.name.startswith('~$')
+    )
+
+
+def import_rate_sheets(
+    directory: Path,
+    workers: Optional[int] = None,
+    recursive: bool = False,
+    use_cache: bool = True,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Parse every rate sheet in a directory and upsert the rates.
+
+    When several files give a rate for the same date, the file that sorts
+    last wins.
+
+    Args:
+        directory: Directory of downloaded sheets
+        workers: Worker processes (defaults to RATE_SHEETS['WORKERS'], then the CPU count)
+        recursive: Include subdirectories
+        use_cache: Reuse cached results for unchanged files
+        dry_run: Parse without writing to the database
+
+    Returns:
+        Summary with 'files', 'cached', 'parsed', 'failed' (list of
+        (path, error)), 'dates', 'changed' and 'written'
+    """
+    from rate_predictor.snapshot import rebuild_dashboard_snapshot
+
+    sheet_config = get_sheet_config()
+    config = get_ingestion_config()
+    cache_path = sheet_config['CACHE_PATH']
+    workers = workers or sheet_config['WORKERS'] or os.cpu_count() or 1
+
+    sheets = find_sheets(Path(directory), recursive)
+    keys = [_cache_key(file_hash(path), config) for path in sheets]
+
+    results: Dict[int, Dict[str, str]] = {}
+    to_parse = []
+    for i, key in enumerate(keys):
+        cached = _read_cache(cache_path, key) if use_cache else None
+        if cached is not None:
+            results[i] = cached
+        else:
+            to_parse.append(i)
+
+    failed = []
+    if to_parse:
+        jobs = [(str(sheets[i]), config) for i in to_parse]
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                outcomes = list(pool.map(_parse_task, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+        else:
+            outcomes = [_parse_task(job) for job in jobs]
+
+        for i, (rates, error) in zip(to_parse, outcomes):
+            if error is not None:
+                logger.error(f"Could not parse {sheets[i]}: {error}")
+                failed.append((str(sheets[i]), error))
+                continue
+            if not rates:
+                logger.warning(f"No {config['CURRENCY']} rate found in {sheets[i]}")
+            results[i] = rates
+            _write_cache(cache_path, keys[i], rates)
+
+    merged: Dict[datetime.date, Decimal] = {}
+    for i in sorted(results):
+        for date, rate in results[i].items():
+            merged[datetime.date.fromisoformat(date)] = Decimal(rate)
+
+    # Rows that already hold the same rate need no write
+    changed = _changed_rates(merged)
+    written = 0 if dry_run else save_rates(changed)
+    if written:
+        rebuild_dashboard_snapshot()
+    summary = {
+        'files': len(sheets),
+        'cached': len(sheets) - len(to_parse),
+        'parsed': len(to_parse) - len(failed),
+        'failed': failed,
+        'dates': len(merged),
+        'changed': len(changed),
+        'written': written,
+    }
+    logger.info(
+        f"Imported rate sheets from {directory}: {summary['files']} files "
+        f"({summary['cached']} cached, {summary['parsed']} parsed, {len(failed)} failed), "
+        f"{written} rates written"
+    )
+    return summary
@@ -5,7 +5,6 @@ This module provides functions to detect whether content is relevant to
 Zimbabwe's currency and exchange rates.
 """
 
-import re
 import logging
 from typing import Optional, List, Dict, Union
 
@@ -78,40 +77,53 @@ def is_relevant(title: str, content: str, threshold: float = 0.4) -> bool:
     Returns:
         Boolean indicating relevance
     """
-    # Combine title and content, with title having more weight
-    full_text = f"{title} {title} {content}".lower()
+    from rate_predictor.scrapers.text_analysis import analyze_text
     
-    # Initialize relevance score
-    relevance_score = 0.0
-    matches_found = 0
-    
-    # Check for currency patterns (high relevance indicators)
-    for pattern in CURRENCY_PATTERNS:
-        if re.search(pattern, full_text, re.IGNORECASE):
-            relevance_score += 0.5
-            matches_found += 1
-            
-    # Check for keyword matches
-    for keyword, weight in KEYWORD_WEIGHTS.items():
-        if keyword.lower() in full_text:
-            relevance_score += weight
-            matches_found += 1
-    
-    # Normalize score based on matches found
-    if matches_found > 0:
-        # Cap at 1.0
-        relevance_score = min(1.0, relevance_score)
+    relevance_score = analyze_text(title, content, threshold)["relevance_score"]
     
     logger.debug(f"Relevance score: {relevance_score:.2f} (threshold: {threshold})")
     return relevance_score >= threshold
 
+def filter_relevant(items: List[Dict], threshold: float = 0.4) -> List[Dict]:
+    """
+    Filter scraped items by relevance in one batch.
+
+    When the spaCy stage is enabled the items are lemmatized together through
+    ``nlp.pipe`` first, so inflected forms ("exchange rates", "devalued") match
+    the keyword lexicon. Each kept item gets its full text analysis attached
+    under 'analysis' so it can be saved without being scored again.
+
+    Args:
+        items: Dictionaries with 'title' and 'content' keys
+        threshold: Minimum relevance score to consider relevant (0.0-1.0)
+
+    Returns:
+        List of relevant items
+    """
+    from rate_predictor.scrapers.nlp_pipeline import annotate_items, is_nlp_enabled
+    from rate_predictor.scrapers.text_analysis import analyze_post
+
+    if is_nlp_enabled():
+        annotate_items(items)
+
+    relevant_items = []
+    for item in items:
+        analysis = analyze_post(item, threshold)
+        if analysis["is_relevant"]:
+            item["analysis"] = analysis
+            relevant_items.append(item)
+
+    return relevant_items
+
 def get_relevance_keywords() -> List[str]:
     """Get a list of relevance keywords for searching."""
     return list(KEYWORD_WEIGHTS.keys())
 
 def calculate_relevance_score(text: str) -> float:
     """Calculate a relevance score for the given text."""
-    return is_relevant("", text, threshold=0.0)  # We want the score, not the boolean
+    from rate_predictor.scrapers.text_analysis import analyze_text
+    
+    return analyze_text("", text, threshold=0.0)["relevance_score"]
 
 if __name__ == "__main__":
     # Test the relevance detector
@@ -5,7 +5,6 @@ This module provides functions to analyze the sentiment of social media posts
 and news articles related to Zimbabwe's currency.
 """
 
-import re
 import logging
 from typing import Dict, List, Any, Tuple, Optional
 from django.utils import timezone
@@ -20,13 +19,13 @@ SENTIMENT_LEXICON = {
     # Positive terms
     "gain": (0.8, 0.0),
     "strengthen": (0.7, 0.0),
-    "strengthen": (0.7, 0.0),
+    "strengthened": (0.7, 0.0),
     "recovery": (0.6, 0.0),
     "positive": (0.6, 0.0),
     "good": (0.5, 0.0),
     "rise": (0.6, 0.0),
     "rising": (0.6, 0.0),
-    "grew": (0.5, 0.0),
+    "grow": (0.5, 0.0),
     "grew": (0.5, 0.0),
     "growth": (0.5, 0.0),
     "profit": (0.7, 0.0),
@@ -104,59 +103,9 @@ def analyze_sentiment(text: str) -> Tuple[str, float]:
     Returns:
         Tuple of (sentiment category, sentiment score)
     """
-    # Clean text
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', ' ', text)
-    words = text.split()
-    
-    positive_score = 0.0
-    negative_score = 0.0
-    
-    # Check for negation in a sliding window
-    window_size = 5
-    negation_active = False
+    from rate_predictor.scrapers.text_analysis import tokenize, score_sentiment
     
-    for i, word in enumerate(words):
-        # Check for negation words
-        if word in NEGATION_WORDS:
-            negation_active = True
-            continue
-            
-        # Reset negation after window size
-        if negation_active and i > 0 and i % window_size == 0:
-            negation_active = False
-            
-        # Check if word is in sentiment lexicon
-        if word in SENTIMENT_LEXICON:
-            pos, neg = SENTIMENT_LEXICON[word]
-            
-            # Flip sentiment if negation is active
-            if negation_active:
-                positive_score += neg
-                negative_score += pos
-            else:
-                positive_score += pos
-                negative_score += neg
-                
-    # Reset negation at the end of analysis
-    negation_active = False
-    
-    # Calculate final sentiment score (-1.0 to 1.0)
-    total = positive_score + negative_score
-    if total > 0:
-        sentiment_score = (positive_score - negative_score) / total
-    else:
-        sentiment_score = 0.0
-    
-    # Determine sentiment category
-    if sentiment_score >= 0.2:
-        sentiment = "positive"
-    elif sentiment_score <= -0.2:
-        sentiment = "negative"
-    else:
-        sentiment = "neutral"
-        
-    return sentiment, sentiment_score
+    return score_sentiment(tokenize(text))
 
 def update_post_sentiment(post_id: int) -> bool:
     """
@@ -207,11 +156,23 @@ def analyze_recent_posts(days_back: int = 7) -> int:
         sentiment_score__gt=0.1
     )
     
+    posts = list(posts)
+    texts = [post.content for post in posts]
+    
+    # Lemmatize in batches so inflected words ("weakened", "shortages") hit the
+    # lexicon; lemmas are scored against the lexicon with its keys lemmatized too
+    from rate_predictor.scrapers.nlp_pipeline import is_nlp_enabled, lemmatize_texts
+    from rate_predictor.scrapers.text_analysis import get_lemma_lexicon, score_sentiment, tokenize
+    lexicon = None
+    if is_nlp_enabled():
+        texts = lemmatize_texts(texts)
+        lexicon = get_lemma_lexicon()
+    
     count = 0
     
-    for post in posts:
+    for post, text in zip(posts, texts):
         try:
-            sentiment, score = analyze_sentiment(post.content)
+            sentiment, score = score_sentiment(tokenize(text), lexicon)
             
             post.sentiment = sentiment
             post.sentiment_score = score
@@ -14,7 +14,10 @@ from typing import List, Dict, Any, Optional
 from django.utils import timezone
 from django.conf import settings
 
-from rate_predictor.scrapers.relevance_detector import is_relevant
+from rate_predictor.scrapers.relevance_detector import filter_relevant
+from rate_predictor.scrapers.text_analysis import analyze_post
+from rate_predictor.scrapers.rate_extractor import process_new_posts
+from rate_predictor.scrapers.nlp_pipeline import is_nlp_enabled
 from rate_predictor.scrapers.web_utils import get_random_headers, safe_get
 
 # Configure logging
@@ -91,6 +94,8 @@ def scrape_twitter_posts(keywords: List[str] = None, days_back: int = 7) -> List
     
     cutoff_date = timezone.now() - datetime.timedelta(days=days_back)
     max_tweets = 300  # Limit the number of tweets to process
+    # With the spaCy stage on, relevance is decided in one batch after the search
+    batch_relevance = is_nlp_enabled()
     
     logger.info(f"Searching Twitter for: {query}")
     
@@ -130,15 +135,9 @@ def scrape_twitter_posts(keywords: List[str] = None, days_back: int = 7) -> List
             if len(content) < 30:
                 continue
                 
-            # Check relevance
-            title = f"Tweet by {tweet.user.screen_name}"
-            if not is_relevant(title, content):
-                continue
-                
-            relevant_count += 1
-            
             # Create post dictionary
             post = {
+                "title": f"Tweet by {tweet.user.screen_name}",
                 "source_name": f"Twitter {tweet.user.screen_name}",
                 "content": content,
                 "published_at": created_at,
@@ -148,12 +147,25 @@ def scrape_twitter_posts(keywords: List[str] = None, days_back: int = 7) -> List
                 "retweets": tweet.retweet_count,
                 "likes": tweet.favorite_count
             }
+            
+            # Score relevance, sentiment and impact in one pass
+            if not batch_relevance:
+                analysis = analyze_post(post)
+                if not analysis["is_relevant"]:
+                    continue
+                post["analysis"] = analysis
+                
+            relevant_count += 1
             posts.append(post)
             
             # Avoid hitting rate limits
             if tweet_count % 50 == 0:
                 time.sleep(1)
                 
+        if batch_relevance:
+            posts = filter_relevant(posts)
+            relevant_count = len(posts)
+            
         logger.info(f"Scraped {tweet_count} tweets, {relevant_count} were relevant")
         
     except tweepy.TweepyException as e:
@@ -174,49 +186,8 @@ def calculate_influence_score(post: Dict[str, Any]) -> float:
     Returns:
         Influence score between 0.0 and 1.0
     """
-    # Base score
-    score = 0.2
-    
-    # Add points based on engagement
-    if post.get('platform') == 'Twitter':
-        followers = post.get('followers', 0)
-        retweets = post.get('retweets', 0)
-        likes = post.get('likes', 0)
-        
-        # Followers impact (capped)
-        if followers > 100000:
-            score += 0.3
-        elif followers > 10000:
-            score += 0.2
-        elif followers > 1000:
-            score += 0.1
-        
-        # Engagement impact
-        engagement = (retweets * 2) + likes
-        if engagement > 1000:
-            score += 0.3
-        elif engagement > 100:
-            score += 0.2
-        elif engagement > 10:
-            score += 0.1
-            
-        # Check for verified accounts
-        if post.get('verified', False):
-            score += 0.1
-    
-    # Check for mentions of banks or government institutions
-    important_entities = [
-        "reserve bank", "rbz", "ministry of finance", "government", 
-        "central bank", "treasury", "imf", "world bank"
-    ]
-    
-    content = post.get('content', '').lower()
-    for entity in important_entities:
-        if entity in content:
-            score += 0.05  # Max 0.25 for entity mentions
-            
-    # Cap the score at 1.0
-    return min(1.0, score)
+    analysis = post.get('analysis') or analyze_post(post)
+    return analysis['impact_score']
 
 
 def save_posts_to_db(posts: List[Dict[str, Any]]) -> int:
@@ -233,6 +204,7 @@ def save_posts_to_db(posts: List[Dict[str, Any]]) -> int:
     from rate_predictor.models import SocialMediaSource, Post
     
     saved_count = 0
+    saved_posts = []
     
     for post_data in posts:
         try:
@@ -253,21 +225,22 @@ def save_posts_to_db(posts: List[Dict[str, Any]]) -> int:
                 }
             )
             
-            # Calculate influence score for this post
-            impact_score = calculate_influence_score(post_data)
+            # Posts scraped by this module are already scored
+            analysis = post_data.get('analysis') or analyze_post(post_data)
             
             # Create the post
-            Post.objects.create(
+            post = Post.objects.create(
                 source_type='social',
                 social_source=source,
                 content=post_data['content'],
                 url=post_data['url'],
                 published_at=post_data['published_at'],
-                sentiment='neutral',  # Default sentiment, will be updated by analyzer
-                sentiment_score=0.0,  # Default sentiment score
-                impact_score=impact_score
+                sentiment=analysis['sentiment'],
+                sentiment_score=analysis['sentiment_score'],
+                impact_score=analysis['impact_score']
             )
             
+            saved_posts.append(post)
             saved_count += 1
             logger.info(f"Saved social media post from {source_name}")
             
@@ -275,6 +248,9 @@ def save_posts_to_db(posts: List[Dict[str, Any]]) -> int:
             logger.error(f"Error saving social media post to database: {e}")
             continue
     
+    # Pull rate quotes out of the new posts and refresh the parallel rate estimates
+    process_new_posts(saved_posts)
+    
     logger.info(f"Saved {saved_count} new social media posts")
     return saved_count
 
@@ -293,6 +269,7 @@ def scrape_key_accounts(days_back: int = 7) -> List[Dict[str, Any]]:
     
     posts = []
     api = get_twitter_api()
+    batch_relevance = is_nlp_enabled()
     
     if not api:
         return posts
@@ -328,13 +305,8 @@ def scrape_key_accounts(days_back: int = 7) -> List[Dict[str, Any]]:
                 else:
                     content = tweet.text
                 
-                # Check relevance - for key accounts, use a lower threshold
-                title = f"Tweet by {tweet.user.screen_name}"
-                if not is_relevant(title, content, threshold=0.3):
-                    continue
-                
-                # Add to our results
-                posts.append({
+                post = {
+                    "title": f"Tweet by {tweet.user.screen_name}",
                     "source_name": f"Twitter {tweet.user.screen_name}",
                     "content": content,
                     "published_at": tweet.created_at,
@@ -344,7 +316,17 @@ def scrape_key_accounts(days_back: int = 7) -> List[Dict[str, Any]]:
                     "retweets": tweet.retweet_count,
                     "likes": tweet.favorite_count,
                     "verified": tweet.user.verified
-                })
+                }
+                
+                # Check relevance - for key accounts, use a lower threshold
+                if not batch_relevance:
+                    analysis = analyze_post(post, threshold=0.3)
+                    if not analysis["is_relevant"]:
+                        continue
+                    post["analysis"] = analysis
+                
+                # Add to our results
+                posts.append(post)
                 
             # Avoid hitting rate limits
             time.sleep(1)
@@ -354,6 +336,9 @@ def scrape_key_accounts(days_back: int = 7) -> List[Dict[str, Any]]:
         except Exception as e:
             logger.error(f"Error scraping tweets from {account.name}: {e}")
     
+    if batch_relevance:
+        posts = filter_relevant(posts, threshold=0.3)
+    
     return posts
 
 
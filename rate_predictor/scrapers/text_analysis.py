@@ -0,0 +1,293 @@
+"""
+Text analysis kernel for ZimRate Predictor
+
+This module scores a post or article in a single pass: the text is lowercased
+and tokenized once, and the same token stream is used for keyword relevance,
+lexicon sentiment and institution mentions. The scrapers call it at ingest
+time so posts are stored with their sentiment and impact already filled in.
+"""
+
+import re
+import json
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from rate_predictor.scrapers.relevance_detector import KEYWORD_WEIGHTS, CURRENCY_PATTERNS
+from rate_predictor.scrapers.sentiment_analyzer import SENTIMENT_LEXICON, NEGATION_WORDS
+
+logger = logging.getLogger("text_analysis")
+
+# Institutions whose mentions make a post more likely to move the market
+IMPORTANT_ENTITIES = [
+    "reserve bank", "rbz", "ministry of finance", "government",
+    "central bank", "treasury", "imf", "world bank"
+]
+
+# Same cleaning the sentiment analyzer has always used
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+COMPILED_CURRENCY_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in CURRENCY_PATTERNS]
+NEGATION_SET = frozenset(NEGATION_WORDS)
+SENTIMENT_WINDOW_SIZE = 5
+
+# Lexicon keyed by lemma as well, built the first time lemma text is scored
+_lemma_lexicon: Optional[Dict[str, Tuple[float, float]]] = None
+
+
+def get_lexicon_version() -> str:
+    """
+    Fingerprint the keyword, sentiment and entity lexicons.
+
+    Models record it so a lexicon change shows up next to their metrics.
+    """
+    lexicons = [sorted(KEYWORD_WEIGHTS.items()), sorted(SENTIMENT_LEXICON.items()),
+                sorted(NEGATION_SET), IMPORTANT_ENTITIES]
+    return hashlib.sha1(json.dumps(lexicons).encode()).hexdigest()[:12]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text, strip punctuation and split it into tokens."""
+    return PUNCTUATION_RE.sub(' ', text.lower()).split()
+
+
+def _build_phrase_index(phrases: Dict[str, Any]) -> Dict[int, Dict[Tuple[str, ...], str]]:
+    """
+    Index phrases by token length for n-gram lookups.
+
+    The plural of the last word is indexed too, so "exchange rates" still
+    matches "exchange rate" the way the old substring check did.
+    """
+    index = {}
+    for phrase in phrases:
+        tokens = tuple(tokenize(phrase))
+        if not tokens:
+            continue
+        bucket = index.setdefault(len(tokens), {})
+        bucket[tokens] = phrase
+        bucket.setdefault(tokens[:-1] + (tokens[-1] + "s",), phrase)
+    return index
+
+
+KEYWORD_INDEX = _build_phrase_index(KEYWORD_WEIGHTS)
+ENTITY_INDEX = _build_phrase_index(dict.fromkeys(IMPORTANT_ENTITIES))
+
+
+def get_lemma_lexicon() -> Dict[str, Tuple[float, float]]:
+    """
+    Get the sentiment lexicon with the lemma of every key added.
+
+    Lemma text has "grew" as "grow", so surface-form keys are lemmatized once
+    through the NLP stage; a key that is itself a lemma keeps its own scores.
+    """
+    global _lemma_lexicon
+    if _lemma_lexicon is None:
+        from rate_predictor.scrapers.nlp_pipeline import lemmatize_texts
+
+        words = list(SENTIMENT_LEXICON)
+        lexicon = dict(SENTIMENT_LEXICON)
+        for word, lemma in zip(words, lemmatize_texts(words)):
+            lexicon.setdefault(lemma.lower(), SENTIMENT_LEXICON[word])
+        _lemma_lexicon = lexicon
+    return _lemma_lexicon
+
+
+def _match_phrases(tokens: List[str], index: Dict[int, Dict[Tuple[str, ...], str]], found: set) -> None:
+    """Add every indexed phrase occurring in the token list to found."""
+    lengths = sorted(index)
+    for i in range(len(tokens)):
+        for n in lengths:
+            if i + n > len(tokens):
+                break
+            phrase = index[n].get(tuple(tokens[i:i + n]))
+            if phrase is not None:
+                found.add(phrase)
+
+
+def score_sentiment(
+    tokens: List[str],
+    lexicon: Optional[Dict[str, Tuple[float, float]]] = None
+) -> Tuple[str, float]:
+    """
+    Score a token list against the sentiment lexicon.
+
+    Args:
+        tokens: Lowercased tokens without punctuation
+        lexicon: Lexicon to score against (defaults to SENTIMENT_LEXICON)
+
+    Returns:
+        Tuple of (sentiment category, sentiment score)
+    """
+    if lexicon is None:
+        lexicon = SENTIMENT_LEXICON
+
+    positive_score = 0.0
+    negative_score = 0.0
+    negation_active = False
+
+    for i, word in enumerate(tokens):
+        # Check for negation words
+        if word in NEGATION_SET:
+            negation_active = True
+            continue
+
+        # Reset negation after window size
+        if negation_active and i > 0 and i % SENTIMENT_WINDOW_SIZE == 0:
+            negation_active = False
+
+        scores = lexicon.get(word)
+        if scores is None:
+            continue
+
+        pos, neg = scores
+        # Flip sentiment if negation is active
+        if negation_active:
+            positive_score += neg
+            negative_score += pos
+        else:
+            positive_score += pos
+            negative_score += neg
+
+    # Calculate final sentiment score (-1.0 to 1.0)
+    total = positive_score + negative_score
+    sentiment_score = (positive_score - negative_score) / total if total > 0 else 0.0
+
+    if sentiment_score >= 0.2:
+        sentiment = "positive"
+    elif sentiment_score <= -0.2:
+        sentiment = "negative"
+    else:
+        sentiment = "neutral"
+
+    return sentiment, sentiment_score
+
+
+def engagement_score(post: Dict[str, Any]) -> float:
+    """
+    Score a post's reach from its platform metadata.
+
+    Args:
+        post: Dictionary with post data
+
+    Returns:
+        Engagement contribution to the impact score (0.0-0.7)
+    """
+    score = 0.0
+
+    if post.get('platform') == 'Twitter':
+        followers = post.get('followers', 0)
+        retweets = post.get('retweets', 0)
+        likes = post.get('likes', 0)
+
+        # Followers impact (capped)
+        if followers > 100000:
+            score += 0.3
+        elif followers > 10000:
+            score += 0.2
+        elif followers > 1000:
+            score += 0.1
+
+        # Engagement impact
+        engagement = (retweets * 2) + likes
+        if engagement > 1000:
+            score += 0.3
+        elif engagement > 100:
+            score += 0.2
+        elif engagement > 10:
+            score += 0.1
+
+        # Check for verified accounts
+        if post.get('verified', False):
+            score += 0.1
+
+    return score
+
+
+def analyze_text(
+    title: str,
+    content: str,
+    threshold: float = 0.4,
+    lemma_title: Optional[str] = None,
+    lemma_text: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Score relevance, sentiment and institution mentions in one pass.
+
+    Args:
+        title: Title or headline of the content
+        content: Main text content
+        threshold: Minimum relevance score to consider relevant (0.0-1.0)
+        lemma_title: Lemmatized title from the NLP stage, if available
+        lemma_text: Lemmatized content from the NLP stage, if available
+
+    Returns:
+        Dictionary with relevance, sentiment and entity results
+    """
+    streams = [tokenize(title), tokenize(content)]
+    # Lemmas are already lowercased and free of punctuation; phrases are
+    # matched on both forms so neither a surface nor a lemma key is missed
+    if lemma_title is not None:
+        streams.append(tokenize(lemma_title))
+    if lemma_text is not None:
+        streams.append(tokenize(lemma_text))
+
+    keywords = set()
+    entities = set()
+    for tokens in streams:
+        _match_phrases(tokens, KEYWORD_INDEX, keywords)
+        _match_phrases(tokens, ENTITY_INDEX, entities)
+
+    # Currency quotes need the raw text (digits next to "$")
+    raw_text = f"{title} {content}"
+    currency_matches = sum(1 for pattern in COMPILED_CURRENCY_PATTERNS if pattern.search(raw_text))
+
+    relevance_score = currency_matches * 0.5 + sum(KEYWORD_WEIGHTS[k] for k in keywords)
+    relevance_score = min(1.0, relevance_score)
+
+    if lemma_text is not None:
+        sentiment, sentiment_score = score_sentiment(tokenize(lemma_text), get_lemma_lexicon())
+    else:
+        sentiment, sentiment_score = score_sentiment(streams[1])
+
+    return {
+        "relevance_score": relevance_score,
+        "is_relevant": relevance_score >= threshold,
+        "sentiment": sentiment,
+        "sentiment_score": sentiment_score,
+        "keywords": sorted(keywords),
+        "entities": sorted(entities),
+    }
+
+
+def analyze_post(post: Dict[str, Any], threshold: float = 0.4) -> Dict[str, Any]:
+    """
+    Fully score a scraped post or article, including its impact.
+
+    Args:
+        post: Scraped item with 'content' and optionally 'title', lemma fields
+              from the NLP stage and platform engagement metadata
+        threshold: Minimum relevance score to consider relevant (0.0-1.0)
+
+    Returns:
+        Dictionary from analyze_text with an added 'impact_score'
+    """
+    analysis = analyze_text(
+        post.get('title', ''),
+        post.get('content', ''),
+        threshold,
+        lemma_title=post.get('lemma_title'),
+        lemma_text=post.get('lemma_text')
+    )
+
+    # Base score
+    impact = 0.2
+    if post.get('platform'):
+        impact += engagement_score(post)
+    else:
+        # Articles have no engagement counts; relevance stands in for reach
+        impact += 0.3 * analysis["relevance_score"]
+
+    # Max 0.25 for entity mentions in practice
+    impact += 0.05 * len(analysis["entities"])
+
+    analysis["impact_score"] = min(1.0, impact)
+    return analysis
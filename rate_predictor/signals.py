@@ -0,0 +1,32 @@
+"""
+Signal handlers for ZimRate Predictor
+
+Saving or deleting an exchange rate, prediction or post bumps its data
+version, so cached API responses and pages built from the old data are no
+longer served. Bulk writes do not send these signals; the bulk writers bump
+the versions themselves.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rate_predictor.caching import bump_data_version
+from rate_predictor.models import ExchangeRate, Post, RatePrediction
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def exchange_rate_changed(sender, **kwargs):
+    bump_data_version('ExchangeRate')
+
+
+@receiver(post_save, sender=RatePrediction)
+@receiver(post_delete, sender=RatePrediction)
+def prediction_changed(sender, **kwargs):
+    bump_data_version('RatePrediction')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, **kwargs):
+    bump_data_version('Post')
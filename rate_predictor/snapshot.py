@@ -0,0 +1,240 @@
+"""
+Dashboard snapshot for ZimRate Predictor
+
+This module precomputes every number the dashboard shows: the latest rates,
+premium and 30-day trend, the chart series, the upcoming predictions with
+their change against the latest official rate, sentiment shares, post counts
+and the backtest report. The snapshot is rebuilt by the rate ingester, the
+forecaster and the refresh tasks, and kept both in the DashboardSnapshot
+table (so it survives cache flushes and restarts) and in the cache, so the
+dashboard renders without a single query.
+
+The stored data is JSON-native; get_dashboard_snapshot() turns the dates
+back into date objects once, before caching.
+"""
+
+import logging
+import datetime
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+logger = logging.getLogger("snapshot")
+
+CACHE_KEY = 'dashboard:snapshot'
+
+
+def get_snapshot_config() -> Dict[str, Any]:
+    """Get the dashboard snapshot settings with defaults filled in."""
+    snapshot_config = getattr(settings, 'DASHBOARD_SNAPSHOT', {})
+    return {
+        'HISTORY_DAYS': snapshot_config.get('HISTORY_DAYS', 90),
+        'TREND_DAYS': snapshot_config.get('TREND_DAYS', 30),
+        'PREDICTION_DAYS': snapshot_config.get('PREDICTION_DAYS', 30),
+        'SENTIMENT_DAYS': snapshot_config.get('SENTIMENT_DAYS', 7),
+        'ANNOUNCEMENT_IMPACT': snapshot_config.get('ANNOUNCEMENT_IMPACT', 0.7),
+        'CACHE_TIMEOUT': snapshot_config.get('CACHE_TIMEOUT', 60 * 60 * 24),
+    }
+
+
+def _change_class(value: Optional[float], rising: str = 'text-danger', falling: str = 'text-success') -> str:
+    if not value:
+        return 'text-muted'
+    return rising if value > 0 else falling
+
+
+def _confidence_class(confidence: float) -> str:
+    if confidence >= 0.7:
+        return 'bg-success'
+    if confidence >= 0.4:
+        return 'bg-warning'
+    return 'bg-danger'
+
+
+def _rate_section(config: Dict[str, Any]) -> Dict[str, Any]:
+    from rate_predictor.models import ExchangeRate
+
+    rows = list(
+        ExchangeRate.objects.order_by('-date').values_list('date', 'official_rate', 'parallel_rate')[:config['HISTORY_DAYS']]
+    )
+    rows.reverse()
+    rates = [
+        {
+            'date': date.isoformat(),
+            'official_rate': float(official),
+            'parallel_rate': float(parallel) if parallel else None,
+        }
+        for date, official, parallel in rows
+    ]
+    if not rates:
+        return {'latest_rate': None, 'rates': [], 'premium_percentage': None,
+                'trend_direction': 'stable', 'trend_percentage': 0.0}
+
+    latest = rates[-1]
+    premium = None
+    if latest['parallel_rate']:
+        premium = (latest['parallel_rate'] - latest['official_rate']) / latest['official_rate'] * 100
+
+    # Change from the first rate within TREND_DAYS of the latest one
+    trend_start = (rows[-1][0] - datetime.timedelta(days=config['TREND_DAYS'])).isoformat()
+    first = next(rate for rate in rates if rate['date'] >= trend_start)
+    trend = (latest['official_rate'] - first['official_rate']) / first['official_rate'] * 100
+
+    return {
+        'latest_rate': latest,
+        'rates': rates,
+        'premium_percentage': round(premium, 2) if premium is not None else None,
+        'trend_direction': 'up' if trend > 0 else 'down' if trend < 0 else 'stable',
+        'trend_percentage': round(abs(trend), 2),
+    }
+
+
+def _prediction_section(latest_rate: Optional[Dict[str, Any]], config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    from rate_predictor.models import CurrentForecast
+
+    official = latest_rate['official_rate'] if latest_rate else None
+    predictions = []
+    last_target = None
+    for forecast in CurrentForecast.objects.filter(target_date__gte=timezone.now().date()):
+        # Rows come per target date with the shortest (most recent) horizon first
+        if forecast.target_date == last_target:
+            continue
+        last_target = forecast.target_date
+
+        predicted = float(forecast.predicted_official_rate)
+        change = round((predicted - official) / official * 100, 2) if official else None
+        predictions.append({
+            'id': forecast.prediction_id,
+            'target_date': forecast.target_date.isoformat(),
+            'predicted_official_rate': predicted,
+            'predicted_parallel_rate': (
+                float(forecast.predicted_parallel_rate) if forecast.predicted_parallel_rate else None
+            ),
+            'confidence_percentage': round(forecast.confidence_score * 100),
+            'confidence_class': _confidence_class(forecast.confidence_score),
+            'change_percentage': change,
+            'change_class': _change_class(change),
+        })
+        if len(predictions) >= config['PREDICTION_DAYS']:
+            break
+    return predictions
+
+
+def _sentiment_section(config: Dict[str, Any]) -> Dict[str, Any]:
+    from rate_predictor.models import Post
+    from rate_predictor.scrapers.sentiment_analyzer import get_overall_sentiment
+
+    try:
+        overall = get_overall_sentiment(days_back=config['SENTIMENT_DAYS'])
+        sentiment = {
+            'positive': round(overall['positive_percent'], 1),
+            'neutral': round(overall['neutral_percent'], 1),
+            'negative': round(overall['negative_percent'], 1),
+            'trend': overall['trend'],
+        }
+    except Exception as e:
+        logger.error(f"Error getting sentiment metrics: {e}")
+        sentiment = {'positive': 30, 'neutral': 50, 'negative': 20, 'trend': 'neutral'}
+
+    counts = Post.objects.filter(
+        published_at__gte=timezone.now() - datetime.timedelta(days=config['SENTIMENT_DAYS'])
+    ).aggregate(
+        social_media_count=Count('id', filter=Q(source_type='social')),
+        news_count=Count('id', filter=Q(source_type='news')),
+        announcements_count=Count('id', filter=Q(impact_score__gte=config['ANNOUNCEMENT_IMPACT'])),
+    )
+    return {'sentiment': sentiment, **counts}
+
+
+def build_snapshot() -> Dict[str, Any]:
+    """
+    Compute the dashboard numbers from the database.
+
+    Returns:
+        JSON-native snapshot data
+    """
+    from rate_predictor.prediction.backtest import get_backtest_report
+
+    config = get_snapshot_config()
+    data = _rate_section(config)
+    data['predictions'] = _prediction_section(data['latest_rate'], config)
+    data.update(_sentiment_section(config))
+    try:
+        data['backtest'] = get_backtest_report()
+    except Exception as e:
+        logger.error(f"Error computing backtest report: {e}")
+        data['backtest'] = None
+    data['built_at'] = timezone.now().isoformat()
+    return data
+
+
+def _hydrate(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the snapshot with its ISO dates turned into dates for the template."""
+    data = dict(
+        data,
+        rates=[dict(rate) for rate in data['rates']],
+        predictions=[dict(prediction) for prediction in data['predictions']],
+    )
+    for rate in data['rates']:
+        rate['date'] = datetime.date.fromisoformat(rate['date'])
+    if data['latest_rate']:
+        # The last entry of 'rates', already converted
+        data['latest_rate'] = data['rates'][-1]
+    for prediction in data['predictions']:
+        prediction['target_date'] = datetime.date.fromisoformat(prediction['target_date'])
+    data['built_at'] = datetime.datetime.fromisoformat(data['built_at'])
+    return data
+
+
+def rebuild_dashboard_snapshot() -> Dict[str, Any]:
+    """
+    Recompute the snapshot, store it and replace the cached copy once committed.
+
+    Returns:
+        The snapshot data (JSON-native)
+    """
+    from rate_predictor.models import DashboardSnapshot
+
+    data = build_snapshot()
+    with transaction.atomic():
+        snapshot = DashboardSnapshot.objects.first()
+        if snapshot is None:
+            DashboardSnapshot.objects.create(data=data)
+        else:
+            snapshot.data = data
+            snapshot.save(update_fields=['data', 'built_at'])
+
+    timeout = get_snapshot_config()['CACHE_TIMEOUT']
+    transaction.on_commit(lambda: cache.set(CACHE_KEY, _hydrate(data), timeout))
+    logger.info(f"Rebuilt dashboard snapshot ({len(data['rates'])} rates, {len(data['predictions'])} predictions)")
+    return data
+
+
+def get_dashboard_snapshot() -> Dict[str, Any]:
+    """
+    Get the dashboard snapshot, from the cache if possible.
+
+    Falls back to the stored snapshot (one query), and builds one only if
+    none has been stored yet. Predictions whose target date has passed since
+    the last rebuild are left out.
+
+    Returns:
+        Snapshot data with dates as date objects
+    """
+    from rate_predictor.models import DashboardSnapshot
+
+    data = cache.get(CACHE_KEY)
+    if data is None:
+        snapshot = DashboardSnapshot.objects.first()
+        stored = snapshot.data if snapshot is not None else rebuild_dashboard_snapshot()
+        data = _hydrate(stored)
+        cache.set(CACHE_KEY, data, get_snapshot_config()['CACHE_TIMEOUT'])
+
+    today = timezone.now().date()
+    if data['predictions'] and data['predictions'][0]['target_date'] < today:
+        data = dict(data, predictions=[p for p in data['predictions'] if p['target_date'] >= today])
+    return data
@@ -4,14 +4,21 @@ from django.utils import timezone
 from rate_predictor.models import RatePrediction, TaskProgress
 from rate_predictor.scrapers.news_scraper import run_news_scraper
 from rate_predictor.scrapers.social_scraper import run_scraper
+from rate_predictor.scrapers.sentiment_analyzer import analyze_recent_posts
+from rate_predictor.scrapers.rate_ingester import ingest_rates
+from rate_predictor.prediction.feature_store import update_feature_store
+from rate_predictor.progress import publish_progress
+from rate_predictor.refresh import refresh_slot
+from rate_predictor.snapshot import rebuild_dashboard_snapshot
+import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
 def update_progress(task_id, task_type, progress, message, status='running'):
-    """Update task progress in database"""
+    """Update task progress in database and push it to the progress streams"""
     try:
-        TaskProgress.objects.update_or_create(
+        task, _ = TaskProgress.objects.update_or_create(
             task_id=task_id,
             defaults={
                 'task_type': task_type,
@@ -20,28 +27,51 @@ def update_progress(task_id, task_type, progress, message, status='running'):
                 'status': status
             }
         )
+        publish_progress(task)
         logger.info(f"Updated progress for task {task_id}: {progress}% - {message}")
     except Exception as e:
         logger.error(f"Error updating progress: {e}")
 
 @shared_task(bind=True)
-def update_model_periodic(self):
+def update_model_periodic(self, lock_token=None, force=False):
     """Periodic task to update the model with new data"""
-    task_id = self.request.id or f'task_{timezone.now().strftime("%Y%m%d_%H%M%S")}'
-    
+    with refresh_slot('model', lock_token, force) as should_run:
+        if not should_run:
+            logger.info("Skipping periodic model update: running or recently completed")
+            return
+        _update_model_periodic(self.request.id or f'task_{timezone.now().strftime("%Y%m%d_%H%M%S")}')
+
+def _update_model_periodic(task_id):
     try:
         # Initialize progress
         update_progress(task_id, 'scraping', 0, "Starting periodic update...")
         
-        # Run news scraper (50% of progress)
+        # Fill in missing official rates
+        update_progress(task_id, 'scraping', 5, "Fetching exchange rates...")
+        ingest_rates()
+        
+        # Run news scraper (50% of progress), unless update_news_scraper just did
         update_progress(task_id, 'scraping', 10, "Scraping news articles...")
-        run_news_scraper(days_back=7)
+        with refresh_slot('news') as should_run:
+            if should_run:
+                run_news_scraper(days_back=7)
         update_progress(task_id, 'scraping', 50, "News articles scraped")
         
         # Run social scraper (next 50% of progress)
         update_progress(task_id, 'scraping', 60, "Scraping social media...")
         run_scraper(days_back=7)
         
+        # Score the new posts (batched through spaCy when NLP is enabled)
+        update_progress(task_id, 'scraping', 90, "Analyzing sentiment...")
+        analyze_recent_posts(days_back=7)
+        
+        # Append the new days to the feature store
+        update_progress(task_id, 'scraping', 95, "Updating features...")
+        update_feature_store()
+        
+        # Precompute the dashboard with the new posts and sentiment
+        rebuild_dashboard_snapshot()
+        
         # Mark as completed
         update_progress(task_id, 'scraping', 100, "Update completed", 'completed')
         logger.info("Completed periodic model update")
@@ -52,14 +82,23 @@ def update_model_periodic(self):
         raise
 
 @shared_task(bind=True)
-def initial_model_training(self):
+def initial_model_training(self, lock_token=None):
     """Task for initial model training with historical data"""
-    task_id = self.request.id or f'task_{timezone.now().strftime("%Y%m%d_%H%M%S")}'
-    
+    with refresh_slot('model', lock_token, force=True) as should_run:
+        if not should_run:
+            logger.info("Skipping initial model training: a refresh is already running")
+            return
+        _initial_model_training(self.request.id or f'task_{timezone.now().strftime("%Y%m%d_%H%M%S")}')
+
+def _initial_model_training(task_id):
     try:
         # Initialize progress tracking
         update_progress(task_id, 'training', 0, "Starting initial training...")
         
+        # Official rate history for the training window
+        update_progress(task_id, 'training', 2, "Fetching historical exchange rates...")
+        ingest_rates(start=timezone.now().date() - datetime.timedelta(days=365 * 2))
+        
         # News data collection (40% of progress)
         update_progress(task_id, 'training', 5, "Collecting historical news data...")
         run_news_scraper(initial_scrape=True)
@@ -72,6 +111,9 @@ def initial_model_training(self):
         
         # Final processing
         update_progress(task_id, 'training', 90, "Processing collected data...")
+        analyze_recent_posts(days_back=365 * 2)
+        update_feature_store()
+        rebuild_dashboard_snapshot()
         
         # Mark as completed
         update_progress(task_id, 'training', 100, "Initial training completed", 'completed')
@@ -83,15 +125,15 @@ def initial_model_training(self):
         raise
 
 @shared_task(bind=True)
-def update_model_task(self, is_initial=False):
+def update_model_task(self, is_initial=False, lock_token=None, force=False):
     """Task to update the model (can be used for both initial and incremental updates)"""
     try:
         if is_initial and not RatePrediction.objects.exists():
             logger.info("Starting initial model training")
-            return initial_model_training.delay()
+            return initial_model_training.delay(lock_token=lock_token)
         else:
             logger.info("Starting periodic model update")
-            return update_model_periodic.delay()
+            return update_model_periodic.delay(lock_token=lock_token, force=force)
     except Exception as e:
         logger.error(f"Error in update_model_task: {e}")
         raise
\ No newline at end of file
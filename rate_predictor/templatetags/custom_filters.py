@@ -26,4 +26,20 @@ def div(value, arg):
             return float(value) / float(arg)
         return None
     except (ValueError, TypeError):
-        return None
\ No newline at end of file
+        return None
+
+@register.filter(name='abs')
+def absolute(value):
+    """Return the absolute value"""
+    try:
+        return abs(value)
+    except TypeError:
+        return None
+
+@register.filter(name='get_item')
+def get_item(mapping, key):
+    """Look up a key in a dictionary"""
+    try:
+        return mapping.get(key)
+    except AttributeError:
+        return None
@@ -1,3 +1,781 @@
-from django.test import TestCase
+import io
+import csv
+import gzip
+import json
+import datetime
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import exports, refresh, views
+from .models import CurrentForecast, ExchangeRate, Post, RateObservation, RatePrediction, TaskProgress
+from .prediction import registry, tuning
+from .prediction.online import step_model, update_model
+from .ratelimit import SlidingWindowLimiter
+from .prediction.backtest import compute_backtest
+from .prediction.current_forecast import rebuild_current_forecast
+from .charts import lttb
+from .prediction.feature_store import get_feature_store, update_feature_store
+from .prediction.forecaster import (
+    build_targets, difference_series, fit_model, get_forecasting_config, lag_matrix, ridge_penalty
+)
+from .scrapers import text_analysis
+from .scrapers.rate_extractor import extract_rate_mentions, process_new_posts
+from .scrapers.rate_ingester import ingest_rates
+from .scrapers import rate_sheets
+
+
+@override_settings(PARALLEL_RATE_ESTIMATION={'MIN_OBSERVATIONS': 2})
+class RateExtractorTests(TestCase):
+    def rates(self, text):
+        return [rate for rate, _ in extract_rate_mentions(text)]
+
+    def test_extracts_quote_forms(self):
+        self.assertEqual(self.rates('1 USD = 3500 ZWL'), [Decimal('3500.00')])
+        self.assertEqual(self.rates('US$1 : Z$350'), [Decimal('350.00')])
+        self.assertEqual(self.rates('$1 to 350 RTGS on the street'), [Decimal('350.00')])
+        self.assertEqual(self.rates('one US dollar is 400 ZWL'), [Decimal('400.00')])
+        self.assertEqual(self.rates('trading at 1,250.50 ZWL/USD'), [Decimal('1250.50')])
+        self.assertEqual(self.rates('USD/ZWL rate of 3600'), [Decimal('3600.00')])
+
+    def test_ignores_amounts_of_more_than_one_dollar(self):
+        self.assertEqual(self.rates('11 USD = 3500 ZWL'), [])
+        self.assertEqual(self.rates('21 US dollar = ZWL 5000'), [])
+        self.assertEqual(self.rates('$11 = 500 ZWL'), [])
+        self.assertEqual(self.rates('2.1 USD = 700 ZWL'), [])
+
+    def test_ignores_text_without_quotes(self):
+        self.assertEqual(self.rates('The RBZ held a press conference'), [])
+        self.assertEqual(self.rates(''), [])
+
+    def test_new_posts_update_parallel_rate(self):
+        day = datetime.date(2024, 3, 1)
+        ExchangeRate.objects.create(date=day, official_rate=Decimal('3000'))
+        published_at = timezone.make_aware(datetime.datetime(2024, 3, 1, 12))
+        posts = [
+            Post.objects.create(source_type='social', content=text, published_at=published_at)
+            for text in ('1 USD = 3500 ZWL today', 'Got $1 to 3700 RTGS', 'Sold 11 USD = 40000 ZWL')
+        ]
+
+        self.assertEqual(process_new_posts(posts), 1)
+        self.assertEqual(RateObservation.objects.count(), 2)
+        self.assertEqual(ExchangeRate.objects.get(date=day).parallel_rate, Decimal('3600.00'))
+
+    def test_estimates_without_official_rate_wait_for_it(self):
+        published_at = timezone.make_aware(datetime.datetime(2024, 3, 2, 12))
+        posts = [
+            Post.objects.create(source_type='social', content=f'1 USD = {rate} ZWL', published_at=published_at)
+            for rate in (3500, 3700)
+        ]
+
+        with self.assertLogs('rate_extractor', 'WARNING'):
+            self.assertEqual(process_new_posts(posts), 0)
+        self.assertEqual(RateObservation.objects.filter(observed_on=datetime.date(2024, 3, 2)).count(), 2)
+
+
+RATE_FIXTURES = Path(__file__).parent / 'scrapers' / 'fixtures' / 'rates'
+
+
+@override_settings(RATE_SOURCES={
+    'rbz': 'fixture:rbz/{date}.html', 'interbank': 'fixture:interbank.html', 'market': 'fixture:market.html'
+})
+class RateIngesterTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(FEATURE_STORE={'PATH': directory.name})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.fetched = []
+        patcher = mock.patch('rate_predictor.scrapers.rate_ingester.fetch_url', self.fetch_fixture)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fetch_fixture(self, url):
+        self.fetched.append(url)
+        path = RATE_FIXTURES / url.removeprefix('fixture:')
+        return path.read_text() if path.exists() else None
+
+    def test_later_sources_fill_gaps(self):
+        written = ingest_rates(datetime.date(2024, 1, 8), datetime.date(2024, 1, 19))
+
+        # Ten weekdays; RBZ published no page for Jan 17
+        self.assertEqual(written, 10)
+        rates = dict(ExchangeRate.objects.values_list('date', 'official_rate'))
+        self.assertEqual(rates[datetime.date(2024, 1, 8)], Decimal('8950.00'))
+        self.assertEqual(rates[datetime.date(2024, 1, 17)], Decimal('9219.00'))
+        self.assertEqual(self.fetched[-1], 'fixture:interbank.html')
+        self.assertEqual(get_feature_store().n_days, 12)
+
+    def test_only_missing_dates_are_fetched(self):
+        ExchangeRate.objects.create(date=datetime.date(2024, 1, 8), official_rate=Decimal('9000'))
+        self.assertEqual(ingest_rates(datetime.date(2024, 1, 8), datetime.date(2024, 1, 9), sources=['rbz']), 1)
+        self.assertEqual(self.fetched, ['fixture:rbz/2024-01-09.html'])
+        self.assertEqual(ExchangeRate.objects.get(date=datetime.date(2024, 1, 8)).official_rate, Decimal('9000.00'))
+
+        self.assertEqual(ingest_rates(datetime.date(2024, 1, 8), datetime.date(2024, 1, 9), sources=['rbz']), 0)
+        self.assertEqual(len(self.fetched), 1)
+
+    def test_iso_dates_are_not_read_day_first(self):
+        self.assertEqual(ingest_rates(datetime.date(2024, 3, 1), datetime.date(2024, 3, 31), sources=['market']), 3)
+        self.assertEqual(dict(ExchangeRate.objects.values_list('date', 'official_rate')), {
+            datetime.date(2024, 3, 5): Decimal('12185.00'),
+            datetime.date(2024, 3, 6): Decimal('12210.40'),
+            datetime.date(2024, 3, 13): Decimal('12420.15'),
+        })
+
+
+@unittest.skipUnless(rate_sheets.OPENPYXL_AVAILABLE, 'openpyxl is not installed')
+class RateSheetTests(TestCase):
+    def setUp(self):
+        directories = []
+        for _ in range(3):
+            directory = tempfile.TemporaryDirectory()
+            self.addCleanup(directory.cleanup)
+            directories.append(Path(directory.name))
+        self.sheets, cache_path, store_path = directories
+        settings_override = override_settings(
+            RATE_SHEETS={'CACHE_PATH': str(cache_path)}, FEATURE_STORE={'PATH': str(store_path)}
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def write_sheet(self, name, rows):
+        import openpyxl
+
+        workbook = openpyxl.Workbook()
+        for row in rows:
+            workbook.active.append(row)
+        workbook.save(self.sheets / name)
+
+    def test_find_date(self):
+        self.assertEqual(rate_sheets.find_date('RBZ_2024-03-05'), datetime.date(2024, 3, 5))
+        self.assertEqual(rate_sheets.find_date('rates 05.03.2024'), datetime.date(2024, 3, 5))
+        self.assertEqual(rate_sheets.find_date('Rates for 5th March 2024'), datetime.date(2024, 3, 5))
+        self.assertIsNone(rate_sheets.find_date('Interbank rates'))
+
+    def test_import_is_cached_and_skips_unchanged_rates(self):
+        # Per-currency sheets dated by their title and by their file name
+        self.write_sheet('interbank.xlsx', [
+            ['Reserve Bank of Zimbabwe'],
+            ['Interbank rates for 2024-03-05'],
+            [],
+            ['Currency', 'Bid', 'Ask', 'Mid Rate'],
+            ['GBP', 15400, 15600, 15500],
+            ['USD', 12000, 12100, 12050.5],
+        ])
+        self.write_sheet('RBZ_2024-03-06.xlsx', [
+            ['Exchange rates'],
+            ['Currency', 'Mid Rate'],
+            ['USD', '12,100.00'],
+        ])
+        # One rate per row of a date column
+        self.write_sheet('history.xlsx', [
+            ['Date', 'Average Rate'],
+            [datetime.datetime(2024, 3, 7), 12150],
+            ['08/03/2024', 12200],
+        ])
+        ExchangeRate.objects.create(date=datetime.date(2024, 3, 7), official_rate=Decimal('12150.00'))
+
+        summary = rate_sheets.import_rate_sheets(self.sheets, workers=1)
+        self.assertEqual(
+            [summary[key] for key in ('files', 'cached', 'parsed', 'dates', 'changed', 'written')],
+            [3, 0, 3, 4, 3, 3]
+        )
+        self.assertEqual(summary['failed'], [])
+        self.assertEqual(dict(ExchangeRate.objects.values_list('date', 'official_rate')), {
+            datetime.date(2024, 3, 5): Decimal('12050.50'),
+            datetime.date(2024, 3, 6): Decimal('12100.00'),
+            datetime.date(2024, 3, 7): Decimal('12150.00'),
+            datetime.date(2024, 3, 8): Decimal('12200.00'),
+        })
+
+        summary = rate_sheets.import_rate_sheets(self.sheets, workers=1)
+        self.assertEqual(
+            [summary[key] for key in ('files', 'cached', 'parsed', 'changed', 'written')],
+            [3, 3, 0, 0, 0]
+        )
+
+
+class TextAnalysisTests(SimpleTestCase):
+    LEMMAS = {'grew': 'grow', 'improved': 'improve', 'strengthened': 'strengthen', 'us': 'we'}
+
+    def lemmatize(self, texts):
+        return [' '.join(self.LEMMAS.get(word, word) for word in text.split()) for text in texts]
+
+    def setUp(self):
+        patcher = mock.patch('rate_predictor.scrapers.nlp_pipeline.lemmatize_texts', self.lemmatize)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, text_analysis, '_lemma_lexicon', None)
+        text_analysis._lemma_lexicon = None
+
+    def test_lemma_text_matches_surface_form_keys(self):
+        content = 'Exports grew and the currency improved'
+        analysis = text_analysis.analyze_text('', content, lemma_text=self.lemmatize([content.lower()])[0])
+        self.assertEqual(analysis['sentiment'], 'positive')
+        self.assertEqual(analysis['sentiment_score'], text_analysis.analyze_text('', content)['sentiment_score'])
+
+    def test_keywords_match_surface_or_lemma(self):
+        # Lowercased "us" lemmatizes to "we"
+        content = 'The RBZ sold us dollar reserves'
+        analysis = text_analysis.analyze_text('', content, lemma_text=self.lemmatize([content.lower()])[0])
+        self.assertEqual(analysis['keywords'], ['rbz', 'us dollar'])
+        self.assertEqual(analysis['entities'], ['rbz'])
+
+
+class BacktestTests(TestCase):
+    def test_horizons_count_from_last_seen_rate(self):
+        start = datetime.date(2024, 1, 1)
+        for day, rate in enumerate([100, 110, 105, 120]):
+            ExchangeRate.objects.create(date=start + datetime.timedelta(days=day), official_rate=Decimal(rate))
+        # Forecast run two days after the last rate it saw (Jan 1)
+        for horizon, predicted in ((1, 108), (2, 95), (3, 125)):
+            RatePrediction.objects.create(
+                prediction_date=start + datetime.timedelta(days=2),
+                target_date=start + datetime.timedelta(days=horizon),
+                horizon=horizon,
+                predicted_official_rate=Decimal(predicted),
+                confidence_score=0.8
+            )
+
+        report = compute_backtest()
+        self.assertEqual([row['horizon'] for row in report['by_horizon']], [1, 2, 3])
+        # Every move is measured from the Jan 1 rate; horizon 2 called a fall that did not happen
+        self.assertEqual([row['directional_accuracy'] for row in report['by_horizon']], [1.0, 0.0, 1.0])
+        self.assertEqual(report['by_horizon'][0]['mae'], 2.0)
+
+    def test_no_realized_targets_yet(self):
+        ExchangeRate.objects.create(date=datetime.date(2024, 1, 1), official_rate=Decimal('100'))
+        RatePrediction.objects.create(
+            prediction_date=datetime.date(2024, 1, 1),
+            target_date=datetime.date(2024, 1, 2),
+            horizon=1,
+            predicted_official_rate=Decimal('101'),
+            confidence_score=0.8
+        )
+        report = compute_backtest()
+        self.assertEqual((report['count'], report['overall']), (0, None))
+
+
+class FeatureStoreTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(FEATURE_STORE={'PATH': directory.name, 'REFRESH_DAYS': 2})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_updates_leave_mapped_generations_untouched(self):
+        start = datetime.date(2024, 1, 1)
+        for day, rate in enumerate([100, 110, 120]):
+            ExchangeRate.objects.create(date=start + datetime.timedelta(days=day), official_rate=Decimal(rate))
+        self.assertEqual(update_feature_store(), 3)
+        reader = get_feature_store()
+
+        # A late correction inside the refreshed tail, and a new day
+        ExchangeRate.objects.filter(date=datetime.date(2024, 1, 3)).update(official_rate=Decimal('130'))
+        ExchangeRate.objects.create(date=datetime.date(2024, 1, 4), official_rate=Decimal('140'))
+        self.assertEqual(update_feature_store(), 3)
+
+        self.assertEqual(reader.column('official_rate').tolist(), [100.0, 110.0, 120.0])
+        self.assertEqual(get_feature_store().column('official_rate').tolist(), [100.0, 110.0, 130.0, 140.0])
+        self.assertEqual(get_feature_store().column('official_rate_lag_1').tolist()[1:], [100.0, 110.0, 130.0])
+
+
+class ChartTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(FEATURE_STORE={'PATH': directory.name})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_lttb_keeps_extremes(self):
+        x = np.arange(100, dtype=np.float64)
+        y = np.zeros(100)
+        y[37], y[71] = 50.0, -50.0
+        kept = lttb(x, y, 10)
+        self.assertEqual(len(kept), 10)
+        self.assertEqual((kept[0], kept[-1]), (0, 99))
+        self.assertTrue(np.all(np.diff(kept) > 0))
+        self.assertIn(37, kept)
+        self.assertIn(71, kept)
+
+    def test_chart_downsamples_and_revalidates(self):
+        start = datetime.date(2024, 1, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            ExchangeRate.objects.bulk_create(
+                ExchangeRate(date=start + datetime.timedelta(days=day), official_rate=Decimal(100 + day % 7))
+                for day in range(50)
+            )
+            update_feature_store()
+        url = reverse('rate_predictor:api_chart_rates')
+
+        response = self.client.get(url, {'points': 10})
+        data = response.json()['data']
+        self.assertEqual((data['start'], data['total'], len(data['day'])), ('2024-01-01', 50, 10))
+        self.assertEqual(data['official'][0], 100.0)
+        self.assertEqual(data['parallel'], [None] * 10)
+        self.assertEqual(self.client.get(url, {'points': 10}, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        # A new rate is charted once the feature store has been updated
+        with self.captureOnCommitCallbacks(execute=True):
+            ExchangeRate.objects.create(date=start + datetime.timedelta(days=50), official_rate=Decimal('200'))
+            update_feature_store()
+        response = self.client.get(url, {'points': 10}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['official'][-1], 200.0)
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ExchangeRate.objects.create(date=datetime.date(2024, 1, 1), official_rate=Decimal('100'))
+
+    def test_rate_list_fragment_varies_on_filters(self):
+        self.client.force_login(User.objects.create_user('viewer'))
+        url = reverse('rate_predictor:rate_list')
+
+        self.assertContains(self.client.get(url, {'start_date': '2024-01-01'}), 'value="2024-01-01"')
+        response = self.client.get(url, {'start_date': '2099-09-09'})
+        self.assertContains(response, 'value="2099-09-09"')
+        self.assertNotContains(response, 'value="2024-01-01"')
+
+
+def random_walk(days, seed=3):
+    rng = np.random.default_rng(seed)
+    return 1000 * np.exp(np.cumsum(rng.normal(0.002, 0.01, days)))
+
+
+class OnlineUpdateTests(SimpleTestCase):
+    @override_settings(FORECASTING={'MA_ORDER': 0, 'FORGETTING_FACTOR': 1.0})
+    def test_rls_step_matches_refit_on_one_more_day(self):
+        config = get_forecasting_config()
+        rates = random_walk(121)
+        sentiment = np.random.default_rng(4).normal(0, 0.3, 121)
+
+        model = fit_model(rates[:-1], sentiment[:-1], config)
+        step_model(model, rates[-1], sentiment[-1], config)
+        refit = fit_model(rates, sentiment, config)
+
+        np.testing.assert_allclose(model['coefficients'], refit['coefficients'], rtol=1e-7, atol=1e-10)
+        np.testing.assert_allclose(model['P'], refit['P'], rtol=1e-6, atol=1e-12)
+        np.testing.assert_allclose(model['last_features'], refit['last_features'])
+        self.assertEqual(model['n_obs'], refit['n_obs'])
+
+
+class ModelRegistryTests(TestCase):
+    def setUp(self):
+        for name in ('registry', 'store'):
+            directory = tempfile.TemporaryDirectory()
+            self.addCleanup(directory.cleanup)
+            setattr(self, name, directory.name)
+        settings_override = override_settings(
+            MODEL_REGISTRY={'PATH': self.registry, 'AUTO_PROMOTE': False},
+            FEATURE_STORE={'PATH': self.store},
+            MODEL_RETRAINING_FREQUENCY=7
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.start = datetime.date(2024, 1, 1)
+        ExchangeRate.objects.bulk_create(
+            ExchangeRate(date=self.start + datetime.timedelta(days=day), official_rate=Decimal(str(round(rate, 2))))
+            for day, rate in enumerate(random_walk(91))
+        )
+
+    def add_rate(self, date):
+        ExchangeRate.objects.create(date=date, official_rate=Decimal('1500'))
+
+    def run_update(self, today):
+        now = timezone.make_aware(datetime.datetime.combine(today, datetime.time(12)))
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            return update_model()
+
+    def kinds(self):
+        return sorted(meta['kind'] for meta in registry.list_versions())
+
+    def test_unpromoted_refit_is_not_repeated(self):
+        today = datetime.date(2024, 4, 1)
+        self.assertEqual(self.run_update(today), 0)
+        self.assertEqual(self.run_update(today), 0)
+        self.assertEqual(self.kinds(), ['refit'])
+        self.assertIsNone(registry.get_active_version())
+
+        first_refit = registry.list_versions()[0]['version']
+        registry.promote(first_refit)
+        self.add_rate(today)
+        self.assertGreater(self.run_update(today), 0)
+        update = registry.get_metadata(registry.get_active_version())
+        self.assertEqual((update['kind'], update['parent']), ('update', first_refit))
+
+        # A week later a refit is due: it is registered once, and the
+        # active model keeps taking the new days until it is promoted
+        for day in (2, 3):
+            self.add_rate(datetime.date(2024, 4, day))
+            self.assertGreater(self.run_update(datetime.date(2024, 4, 10)), 0)
+        self.assertEqual(self.kinds(), ['refit', 'refit', 'update', 'update', 'update'])
+        active = registry.get_metadata(registry.get_active_version())
+        self.assertEqual((active['kind'], active['last_date']), ('update', '2024-04-03'))
+
+
+class TuningTests(SimpleTestCase):
+    def test_ma_backtest_estimates_shocks_from_past_data_only(self):
+        rng = np.random.default_rng(1)
+        shocks = rng.normal(0, 0.01, 300)
+        changes = np.zeros(300)
+        for t in range(1, 300):
+            changes[t] = 0.3 * changes[t - 1] + shocks[t] + 0.5 * shocks[t - 1]
+        levels = np.cumsum(changes) + 5
+        sentiment = rng.normal(0, 1, 300)
+        candidate = {'AR_ORDER': 2, 'DIFFERENCE': 1, 'MA_ORDER': 2, 'SENTIMENT_LAGS': 1}
+        window, horizon, ridge, min_rows = 120, 3, 1e-3, 30
+
+        matrices = tuning.precompute_matrices(levels, sentiment, [candidate])
+        targets = build_targets(levels, horizon)
+        scores = tuning.rolling_origin_backtest(
+            tuning.candidate_features(candidate, matrices), targets, window, ridge, min_rows,
+            tuning.candidate_shocks(candidate, matrices)
+        )
+
+        # Refit everything at each origin, with the long AR fit on rows up to the origin
+        differenced = difference_series(levels, 1)
+        Z = np.column_stack([np.ones(299), lag_matrix(differenced, 4)[:-1]])
+        y = differenced[1:]
+        complete = np.isfinite(Z).all(axis=1) & np.isfinite(y)
+        errors = []
+        for origin in range(window - 1, 300 - horizon):
+            low = origin - window + 1
+            stage_rows = complete & (np.arange(1, 300) >= low) & (np.arange(1, 300) <= origin)
+            beta = np.linalg.lstsq(Z[stage_rows], y[stage_rows], rcond=None)[0]
+            residuals = np.full(300, np.nan)
+            residuals[1:][complete] = y[complete] - Z[complete] @ beta
+            X = np.column_stack([np.ones(300), lag_matrix(differenced, 2), lag_matrix(sentiment, 1), lag_matrix(residuals, 2)])
+            rows = np.isfinite(X).all(axis=1) & np.isfinite(targets).all(axis=1)
+            rows[:low] = rows[origin - horizon + 1:] = False
+            if rows.sum() < min_rows or not np.isfinite(X[origin]).all():
+                continue
+            coefficients = np.linalg.solve(X[rows].T @ X[rows] + ridge_penalty(X.shape[1], ridge), X[rows].T @ targets[rows])
+            errors.append(X[origin] @ coefficients - targets[origin])
+
+        self.assertEqual(scores['origins'], len(errors))
+        self.assertAlmostEqual(scores['mape'], float(np.abs(np.expm1(np.array(errors))).mean() * 100))
+
+
+@override_settings(CURRENT_FORECAST={'MAX_DAYS': 3})
+class CurrentForecastTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def save_run(self, prediction_date, last_rate_date, base):
+        for day in range(6):
+            target_date = timezone.now().date() + datetime.timedelta(days=day)
+            RatePrediction.objects.create(
+                prediction_date=prediction_date,
+                target_date=target_date,
+                horizon=(target_date - last_rate_date).days,
+                predicted_official_rate=Decimal(base + day),
+                confidence_score=0.8
+            )
+
+    def test_newest_prediction_per_target_date_up_to_max_days(self):
+        today = timezone.now().date()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.save_run(today - datetime.timedelta(days=1), today - datetime.timedelta(days=2), 100)
+            self.save_run(today, today - datetime.timedelta(days=1), 200)
+            rebuild_current_forecast()
+        # Both runs are kept per horizon; the API shows one row per target date
+        self.assertEqual(CurrentForecast.objects.count(), 12)
+
+        response = self.client.get(reverse('rate_predictor:api_predictions'), {'days': 1000})
+        data = response.json()['data']
+        self.assertEqual(
+            [(row['target_date'], row['horizon'], row['predicted_official_rate']) for row in data],
+            [((today + datetime.timedelta(days=day)).isoformat(), day + 1, 200.0 + day) for day in range(3)]
+        )
+
+
+class ApiCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ExchangeRate.objects.create(date=datetime.date(2024, 1, 1), official_rate=Decimal('100'))
+
+    def test_not_modified_until_rates_change(self):
+        url = reverse('rate_predictor:api_latest_rate')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Versions are bumped when the transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            ExchangeRate.objects.create(date=datetime.date(2024, 1, 2), official_rate=Decimal('101'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['official_rate'], 101.0)
+
+    def test_sync_and_async_views_share_etags(self):
+        url = reverse('rate_predictor:api_latest_rate')
+        response = self.client.get(url)
+
+        request = RequestFactory().get(url)
+        async_response = async_to_sync(views.latest_rate_api_async)(request)
+        self.assertEqual(async_response['ETag'], response['ETag'])
+        self.assertEqual(async_response.content, response.content)
+
+
+class HistoryApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(TIME_ZONE='Africa/Harare')
+    def test_post_dates_are_local_days(self):
+        for hour, minute in ((0, 0), (23, 30), (24, 30)):
+            published_at = timezone.make_aware(datetime.datetime(2024, 3, 1) + datetime.timedelta(hours=hour, minutes=minute))
+            Post.objects.create(source_type='news', content=f'{hour}:{minute}', published_at=published_at)
+
+        response = self.client.get(reverse('rate_predictor:api_posts'), {'start': '2024-03-01', 'end': '2024-03-01'})
+        self.assertEqual([post['content'] for post in response.json()['data']], ['0:0', '23:30'])
+
+
+    def pages(self, url, **params):
+        ids, cursor = [], None
+        while True:
+            body = self.client.get(url, {**params, **({'cursor': cursor} if cursor else {})}).json()
+            ids.extend(row['id'] for row in body['data'])
+            cursor = body['next_cursor']
+            if cursor is None:
+                return ids
+
+    def test_post_pages_round_trip(self):
+        # Ties on published_at are broken by id, microseconds included
+        published_at = timezone.make_aware(datetime.datetime(2024, 3, 1, 9, 30, 0, 123456))
+        posts = [
+            Post.objects.create(source_type='social', content=str(i), published_at=published_at + datetime.timedelta(microseconds=i // 3))
+            for i in range(7)
+        ]
+        url = reverse('rate_predictor:api_posts')
+
+        ids = [post.id for post in posts]
+        self.assertEqual(self.pages(url, limit=2), ids)
+        self.assertEqual(self.pages(url, limit=3, order='desc'), ids[::-1])
+
+        exported = self.client.get(url, {'format': 'ndjson'})
+        lines = b''.join(exported.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], ids)
+
+    def test_rate_pages_round_trip(self):
+        start = datetime.date(2024, 1, 1)
+        rates = [
+            ExchangeRate.objects.create(date=start + datetime.timedelta(days=day), official_rate=Decimal(100 + day))
+            for day in range(5)
+        ]
+        url = reverse('rate_predictor:api_rates')
+
+        self.assertEqual(self.pages(url, limit=2), [rate.id for rate in rates])
+        self.assertEqual(self.pages(url, limit=2, start='2024-01-02', end='2024-01-04'), [rate.id for rate in rates[1:4]])
+        self.assertEqual(self.client.get(url, {'cursor': 'not-a-cursor'}).status_code, 400)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        start = datetime.date(2024, 1, 1)
+        self.rates = [
+            ExchangeRate.objects.create(
+                date=start + datetime.timedelta(days=day),
+                official_rate=Decimal('100.25') + day,
+                parallel_rate=None if day % 2 else Decimal('150.50') + day
+            )
+            for day in range(5)
+        ]
+
+    def expected_rows(self):
+        return [
+            (rate.id, rate.date, float(rate.official_rate), float(rate.parallel_rate) if rate.parallel_rate else None, rate.updated_at)
+            for rate in self.rates
+        ]
+
+    def test_csv_round_trip(self):
+        content = gzip.decompress(b''.join(exports.export_stream('rates', 'csv', chunk_size=2)))
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        self.assertEqual(rows[0], ['id', 'date', 'official_rate', 'parallel_rate', 'updated_at'])
+        self.assertEqual(rows[1:], [
+            [str(id_), date.isoformat(), str(official), '' if parallel is None else str(parallel), updated_at.isoformat()]
+            for id_, date, official, parallel, updated_at in self.expected_rows()
+        ])
+
+    @unittest.skipUnless(exports.PYARROW_AVAILABLE, 'pyarrow is not installed')
+    def test_columnar_round_trips(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        parquet = pq.read_table(io.BytesIO(b''.join(exports.export_stream('rates', 'parquet', chunk_size=2))))
+        arrow = pa.ipc.open_stream(b''.join(exports.export_stream('rates', 'arrow', chunk_size=2))).read_all()
+        for table in (parquet, arrow):
+            self.assertEqual(table.schema, exports.arrow_schema('rates'))
+            self.assertEqual(list(zip(*table.to_pydict().values())), self.expected_rows())
+        self.assertEqual(parquet.num_rows, 5)
+
+    def test_download_is_cached_until_rates_change(self):
+        url = reverse('rate_predictor:api_export', args=['rates'])
+        response = self.client.get(url)
+        content = b''.join(response.streaming_content)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="rates.csv.gz"')
+
+        cached = self.client.get(url)
+        self.assertEqual(cached.content, content)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=cached['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ExchangeRate.objects.create(date=datetime.date(2024, 2, 1), official_rate=Decimal('200'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=cached['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(gzip.decompress(b''.join(response.streaming_content)).splitlines()), 7)
+        self.assertEqual(self.client.get(url, {'format': 'xlsx'}).status_code, 400)
+
+
+class ProgressStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_wsgi_stream_backs_off_while_idle(self):
+        url = reverse('rate_predictor:task_progress_stream')
+        self.assertTrue(self.client.get(url).content.startswith(b'retry: 60000\n\n'))
+
+        TaskProgress.objects.create(task_id='t1', task_type='scraping', status='running', progress=40)
+        response = self.client.get(url)
+        self.assertTrue(response.content.startswith(b'retry: 2000\n\n'))
+        self.assertIn(b'"progress": 40', response.content)
+
+
+@override_settings(REFRESH={'INTERVAL': 3600, 'LOCK_TIMEOUT': 600})
+class RefreshTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_only_one_refresh_holds_the_lock(self):
+        token = refresh.begin_refresh('model')
+        self.assertIsNotNone(token)
+        self.assertIsNone(refresh.begin_refresh('model'))
+        self.assertIsNone(refresh.begin_refresh('model', force=True))
+        # Other kinds of refresh have their own lock
+        self.assertIsNotNone(refresh.begin_refresh('news'))
+
+        refresh.finish_refresh('model', token)
+        self.assertFalse(refresh.is_running('model'))
+
+    def test_completed_refresh_is_skipped_within_the_interval(self):
+        refresh.finish_refresh('model', refresh.begin_refresh('model'))
+        with refresh.refresh_slot('model') as run:
+            self.assertFalse(run)
+        with refresh.refresh_slot('model', force=True) as run:
+            self.assertTrue(run)
+
+        with mock.patch('rate_predictor.refresh.time.time', return_value=refresh.last_success('model') + 3600):
+            self.assertTrue(refresh.is_due('model'))
+
+    def test_failed_block_releases_the_lock_without_recording_success(self):
+        with self.assertRaises(RuntimeError):
+            with refresh.refresh_slot('model') as run:
+                self.assertTrue(run)
+                raise RuntimeError('scrape failed')
+
+        self.assertFalse(refresh.is_running('model'))
+        self.assertIsNone(refresh.last_success('model'))
+        self.assertIsNotNone(refresh.begin_refresh('model'))
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    def test_eager_trigger_does_not_run_the_task_in_the_request(self):
+        from rate_predictor.tasks import initial_model_training
+
+        request_thread = threading.current_thread()
+        started, release = threading.Event(), threading.Event()
+        runs = []
+
+        def apply(kwargs, task_id):
+            runs.append((threading.current_thread(), kwargs))
+            started.set()
+            release.wait(5)
+
+        with mock.patch.object(initial_model_training, 'apply', apply):
+            task_id = refresh.trigger_refresh()
+            self.assertIsNotNone(task_id)
+            # Returned while the task is still running, and nobody else can start one
+            self.assertTrue(started.wait(5))
+            self.assertTrue(refresh.is_running('model'))
+            self.assertIsNone(refresh.trigger_refresh())
+            release.set()
+            for thread in threading.enumerate():
+                if thread.name == f'refresh-{task_id}':
+                    thread.join(5)
+
+        [(thread, kwargs)] = runs
+        self.assertIsNot(thread, request_thread)
+        self.assertEqual(kwargs['lock_token'], cache.get(f'{refresh.LOCK_KEY_PREFIX}:model'))
+        self.assertEqual(TaskProgress.objects.get(task_id=task_id).status, 'pending')
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_retry_after_admits_the_retry(self):
+        limiter = SlidingWindowLimiter()
+        results = [limiter.hit('DEFAULT', 'client', 5, 60, now=600.0) for _ in range(6)]
+        self.assertEqual(results[:5], [0.0] * 5)
+        self.assertEqual(results[5], 80.0)
+
+        self.assertGreater(limiter.hit('DEFAULT', 'client', 5, 60, now=679.0), 0)
+        self.assertEqual(limiter.hit('DEFAULT', 'client', 5, 60, now=680.0), 0.0)
+        self.assertGreater(limiter.hit('DEFAULT', 'client', 5, 60, now=680.0), 0)
+
+    def test_retry_after_within_the_window(self):
+        limiter = SlidingWindowLimiter()
+        for _ in range(4):
+            limiter.hit('DEFAULT', 'client', 5, 60, now=610.0)
+        # 4 from the previous window, 3/4 of which still overlap, plus 3 now
+        limiter.hit('DEFAULT', 'client', 5, 60, now=675.0)
+        limiter.hit('DEFAULT', 'client', 5, 60, now=675.0)
+        wait = limiter.hit('DEFAULT', 'client', 5, 60, now=675.0)
+        self.assertEqual(wait, 30.0)
+        self.assertEqual(limiter.hit('DEFAULT', 'client', 5, 60, now=675.0 + wait), 0.0)
+
+    def test_async_hits_share_the_count(self):
+        limiter = SlidingWindowLimiter()
+        for _ in range(3):
+            limiter.hit('DEFAULT', 'client', 4, 60, now=600.0)
+        self.assertEqual(async_to_sync(limiter.ahit)('DEFAULT', 'client', 4, 60, now=600.0), 0.0)
+        self.assertGreater(async_to_sync(limiter.ahit)('DEFAULT', 'client', 4, 60, now=600.0), 0)
+
+    @override_settings(
+        API_RATE_LIMIT={'DEFAULT': '2/minute', 'LATEST_RATE': 'none', 'PREDICTIONS': 'none'},
+        API_RATE_LIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR'
+    )
+    def test_middleware_refuses_with_retry_after(self):
+        url = reverse('rate_predictor:api_rates')
+        statuses = [
+            self.client.get(url, HTTP_X_FORWARDED_FOR=f'10.0.0.{i}, 192.0.2.1').status_code
+            for i in range(3)
+        ]
+        # Forged leading addresses do not give a client a new budget
+        self.assertEqual(statuses, [200, 200, 429])
+        response = self.client.get(url, HTTP_X_FORWARDED_FOR='192.0.2.1')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+        self.assertEqual(self.client.get(url, HTTP_X_FORWARDED_FOR='192.0.2.2').status_code, 200)
+        self.assertEqual(self.client.get(reverse('rate_predictor:api_latest_rate')).status_code, 404)
@@ -1,8 +1,19 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'rate_predictor'
 
+# Under ASGI the polled JSON endpoints are served by their async versions
+if getattr(settings, 'ASYNC_API_VIEWS', False):
+    latest_rate_api = views.latest_rate_api_async
+    prediction_api = views.prediction_api_async
+    task_progress_api = views.task_progress_api_async
+else:
+    latest_rate_api = views.latest_rate_api
+    prediction_api = views.prediction_api
+    task_progress_api = views.task_progress_api
+
 urlpatterns = [
     # Main site URLs
     path('', views.HomeView.as_view(), name='home'),
@@ -13,7 +24,13 @@ urlpatterns = [
     path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
     
     # API endpoints
-    path('api/latest-rate/', views.latest_rate_api, name='api_latest_rate'),
-    path('api/predictions/', views.prediction_api, name='api_predictions'),
-    path('api/task-progress/', views.task_progress_api, name='task_progress_api'),
+    path('api/latest-rate/', latest_rate_api, name='api_latest_rate'),
+    path('api/predictions/', prediction_api, name='api_predictions'),
+    path('api/backtest/', views.backtest_api, name='api_backtest'),
+    path('api/rates/', views.rates_api, name='api_rates'),
+    path('api/posts/', views.posts_api, name='api_posts'),
+    path('api/export/<str:dataset>/', views.export_api, name='api_export'),
+    path('api/chart/rates/', views.chart_rates_api, name='api_chart_rates'),
+    path('api/task-progress/', task_progress_api, name='task_progress_api'),
+    path('api/task-progress/stream/', views.task_progress_stream, name='task_progress_stream'),
 ]
\ No newline at end of file
@@ -1,34 +1,39 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.generic import ListView, DetailView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import F
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
 from .models import ExchangeRate, RatePrediction, Post, SocialMediaSource, NewsSource
+from .caching import VersionedCacheMixin, cache_api_response
+from .charts import parse_points, rate_chart_payload
+from .exports import DATASETS as EXPORT_DATASETS, export_response
+from .pagination import InvalidCursor, keyset_page, ndjson_response, parse_limit
+from .progress import aget_latest_progress, broadcaster, get_latest_progress, get_progress_config
+from .prediction.current_forecast import acurrent_forecast_payload, current_forecast_payload, get_current_forecast
 
 
-class HomeView(TemplateView):
+# Querysets in the cached views stay lazy, so nothing is queried when a cached fragment is used
+class HomeView(VersionedCacheMixin, TemplateView):
     template_name = 'rate_predictor/home.html'
+    cache_models = ('ExchangeRate', 'RatePrediction', 'Post')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get latest exchange rates
-        try:
-            latest_rate = ExchangeRate.objects.latest('date')
-            context['latest_rate'] = latest_rate
-        except ExchangeRate.DoesNotExist:
-            context['latest_rate'] = None
+        # Get latest exchange rates (None if there are none)
+        context['latest_rate'] = SimpleLazyObject(lambda: ExchangeRate.objects.order_by('-date').first())
         
-        # Get latest predictions
-        latest_predictions = RatePrediction.objects.filter(
-            target_date__gte=timezone.now().date()
-        ).order_by('target_date')[:5]
-        context['latest_predictions'] = latest_predictions
+        # Get latest predictions from the cached current forecast
+        context['latest_predictions'] = get_current_forecast()[:5]
         
         # Recent influential posts
         recent_posts = Post.objects.filter(
@@ -39,18 +44,38 @@ class HomeView(TemplateView):
         return context
 
 
-class RateListView(ListView):
+class RateListView(VersionedCacheMixin, ListView):
     model = ExchangeRate
     template_name = 'rate_predictor/rate_list.html'
     context_object_name = 'rates'
     ordering = ['-date']
     paginate_by = 20
+    cache_models = ('ExchangeRate',)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Evaluated once the template uses it, so only when the table is rendered
+        self.page_rates = context['rates']
+        context['previous_rates'] = SimpleLazyObject(self.get_previous_rates)
+        return context
+    
+    def get_previous_rates(self):
+        """Map each listed date to the official rate of the day before it"""
+        rates = list(self.page_rates)  # Already fetched by the template loop
+        if not rates:
+            return {}
+        older = ExchangeRate.objects.filter(date__lt=rates[-1].date).order_by('-date').values_list(
+            'official_rate', flat=True
+        ).first()
+        previous = [rate.official_rate for rate in rates[1:]] + [older]
+        return {rate.date: prev for rate, prev in zip(rates, previous) if prev is not None}
 
 
-class RateDetailView(DetailView):
+class RateDetailView(VersionedCacheMixin, DetailView):
     model = ExchangeRate
     template_name = 'rate_predictor/rate_detail.html'
     context_object_name = 'rate'
+    cache_models = ('ExchangeRate', 'RatePrediction', 'Post')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -69,12 +94,13 @@ class RateDetailView(DetailView):
         return context
 
 
-class PredictionListView(ListView):
+class PredictionListView(VersionedCacheMixin, ListView):
     model = RatePrediction
     template_name = 'rate_predictor/prediction_list.html'
     context_object_name = 'predictions'
     ordering = ['-prediction_date', 'target_date']
     paginate_by = 20
+    cache_models = ('RatePrediction',)
 
 
 class PredictionDetailView(DetailView):
@@ -84,8 +110,12 @@ class PredictionDetailView(DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Get the influencing posts
-        context['influencing_posts'] = self.object.influencing_posts.all().order_by('-impact_score')
+        # Get the influencing posts, heaviest first, with their attribution weight
+        context['influencing_posts'] = Post.objects.filter(
+            influences__prediction=self.object
+        ).select_related('social_source', 'news_source').annotate(
+            attribution_weight=F('influences__weight')
+        ).order_by('-attribution_weight')
         return context
 
 
@@ -96,154 +126,22 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # Get historical rates for chart
-        try:
-            historical_rates = ExchangeRate.objects.all().order_by('date')[:90]  # Last 90 days
-            context['historical_rates'] = historical_rates
-            logger.info(f"Fetched {len(historical_rates)} historical rates")
-        except Exception as e:
-            logger.error(f"Error fetching historical rates: {e}")
-        
-        # Get future predictions for chart
-        try:
-            future_predictions = RatePrediction.objects.filter(
-                target_date__gte=timezone.now().date()
-            ).order_by('target_date')[:30]  # Next 30 days
-            context['future_predictions'] = future_predictions
-            logger.info(f"Fetched {len(future_predictions)} future predictions")
-        except Exception as e:
-            logger.error(f"Error fetching future predictions: {e}")
-        
-        # Get sentiment metrics from recent content
-        try:
-            sentiment_metrics = self.get_sentiment_metrics()
-            context.update(sentiment_metrics)
-            logger.info("Fetched sentiment metrics")
-        except Exception as e:
-            logger.error(f"Error fetching sentiment metrics: {e}")
-        
-        # Calculate trend
-        try:
-            if len(historical_rates) >= 2:
-                oldest_rate = historical_rates.first().official_rate
-                newest_rate = historical_rates.last().official_rate
-                trend_pct = ((newest_rate - oldest_rate) / oldest_rate) * 100
-                context['trend_percentage'] = abs(trend_pct)
-                context['trend_direction'] = 'up' if trend_pct > 0 else 'down' if trend_pct < 0 else 'stable'
-                logger.info(f"Calculated trend: {context['trend_direction']} ({context['trend_percentage']}%)")
-        except Exception as e:
-            logger.error(f"Error calculating trend: {e}")
-        
-        # Calculate premium if parallel rate exists
-        try:
-            if historical_rates and historical_rates[0].parallel_rate:
-                premium = ((historical_rates[0].parallel_rate - historical_rates[0].official_rate) 
-                          / historical_rates[0].official_rate * 100)
-                context['premium_percentage'] = premium
-                logger.info(f"Calculated premium: {context['premium_percentage']}%")
-        except Exception as e:
-            logger.error(f"Error calculating premium: {e}")
+        # Every number on the page is precomputed when rates or predictions change
+        from rate_predictor.snapshot import get_dashboard_snapshot
+        context['snapshot'] = get_dashboard_snapshot()
         
         return context
     
-    def get_sentiment_metrics(self):
-        """Get sentiment analysis metrics for the dashboard"""
-        # Safely import sentiment analyzer handling potential import errors
-        try:
-            from rate_predictor.scrapers.sentiment_analyzer import get_overall_sentiment
-            sentiment_metrics = get_overall_sentiment(days_back=7)
-            logger.info("Sentiment metrics fetched successfully")
-        except ImportError as e:
-            logger.warning(f"Could not import sentiment analyzer: {e}")
-            sentiment_metrics = {
-                'positive': 30,
-                'neutral': 50,
-                'negative': 20
-            }
-        except Exception as e:
-            logger.error(f"Error getting sentiment metrics: {e}")
-            sentiment_metrics = {
-                'positive': 30,
-                'neutral': 50,
-                'negative': 20
-            }
-        
-        # Count posts by source type
-        try:
-            social_count = Post.objects.filter(
-                source_type='social',
-                published_at__gte=timezone.now() - datetime.timedelta(days=7)
-            ).count()
-            news_count = Post.objects.filter(
-                source_type='news',
-                published_at__gte=timezone.now() - datetime.timedelta(days=7)
-            ).count()
-            announcements_count = Post.objects.filter(
-                published_at__gte=timezone.now() - datetime.timedelta(days=7),
-                impact_score__gte=0.7
-            ).count()
-            logger.info(f"Post counts - Social: {social_count}, News: {news_count}, Announcements: {announcements_count}")
-        except Exception as e:
-            logger.error(f"Error counting posts: {e}")
-            social_count = news_count = announcements_count = 0
-        
-        return {
-            'sentiment_metrics': sentiment_metrics,
-            'social_media_count': social_count,
-            'news_count': news_count,
-            'announcements_count': announcements_count
-        }
-    
     def get(self, request, *args, **kwargs):
         """Handle GET requests and trigger updates"""
-        from rate_predictor.tasks import update_model_task
-        from rate_predictor.models import RatePrediction, TaskProgress
-        from kombu.exceptions import OperationalError
+        from rate_predictor.refresh import trigger_refresh
         
         try:
-            # Check if initial training is needed
-            initial_training_needed = not RatePrediction.objects.exists()
-            logger.info(f"Initial training needed: {initial_training_needed}")
-            
-            # Create task progress record
-            task_id = 'task_' + timezone.now().strftime('%Y%m%d_%H%M%S')
-            task_type = 'training' if initial_training_needed else 'scraping'
-            
-            task_progress, created = TaskProgress.objects.get_or_create(
-                task_id=task_id,
-                defaults={
-                    'task_type': task_type,
-                    'status': 'pending',
-                    'message': 'Task starting...'
-                }
-            )
-            logger.info(f"Task progress record created: {task_id}")
-            
-            try:
-                # Execute task - handle Celery connection errors gracefully
-                task = update_model_task.delay(is_initial=initial_training_needed)
-                
-                # Update task ID with actual Celery task ID if available
-                if hasattr(task, 'id') and task.id:
-                    task_progress.task_id = task.id
-                    task_progress.save()
-                    logger.info(f"Task ID updated: {task.id}")
-                
-            except OperationalError as e:
-                # Update the task progress with the error
-                task_progress.status = 'failed'
-                task_progress.message = f"Connection error: {str(e)}. Is the message broker running?"
-                task_progress.save()
-                logger.error(f"Error in dashboard task execution: {e}")
-                
-                # Continue with the page load despite the error
-            except Exception as e:
-                # Update the task progress with the error
-                task_progress.status = 'failed'
-                task_progress.message = f"Error: {str(e)}"
-                task_progress.save()
-                logger.error(f"Error in dashboard task execution: {e}")
-            
+            # Starts a refresh only if none is running or ran within REFRESH['INTERVAL'];
+            # the task never runs inside this request
+            task_id = trigger_refresh()
+            if task_id:
+                logger.info(f"Dashboard started refresh {task_id}")
         except Exception as e:
             logger.error(f"Error in dashboard task execution: {e}")
         
@@ -252,61 +150,255 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 
 
 # API Views
+# The JSON endpoints have async versions (same responses) for ASGI deployments; see urls.py
+def _latest_rate_response(latest):
+    data = {
+        'date': latest.date.isoformat(),
+        'official_rate': float(latest.official_rate),
+        'parallel_rate': float(latest.parallel_rate) if latest.parallel_rate else None,
+        'last_updated': latest.updated_at.isoformat()
+    }
+    return JsonResponse({'status': 'success', 'data': data})
+
+
+def _no_rates_response():
+    return JsonResponse({'status': 'error', 'message': 'No exchange rates available'}, status=404)
+
+
+@cache_api_response('ExchangeRate')
 def latest_rate_api(request):
     """API endpoint to get the latest exchange rate"""
     try:
-        latest = ExchangeRate.objects.latest('date')
-        data = {
-            'date': latest.date.isoformat(),
-            'official_rate': float(latest.official_rate),
-            'parallel_rate': float(latest.parallel_rate) if latest.parallel_rate else None,
-            'last_updated': latest.updated_at.isoformat()
-        }
-        return JsonResponse({'status': 'success', 'data': data})
+        return _latest_rate_response(ExchangeRate.objects.latest('date'))
     except ExchangeRate.DoesNotExist:
-        return JsonResponse({'status': 'error', 'message': 'No exchange rates available'}, status=404)
+        return _no_rates_response()
 
 
+@cache_api_response('ExchangeRate')
+async def latest_rate_api_async(request):
+    """Async version of latest_rate_api"""
+    try:
+        return _latest_rate_response(await ExchangeRate.objects.alatest('date'))
+    except ExchangeRate.DoesNotExist:
+        return _no_rates_response()
+
+
+def _days_param(request):
+    days = request.GET.get('days', 7)
+    try:
+        return int(days)
+    except ValueError:
+        return 7
+
+
+@cache_api_response('RatePrediction')
 def prediction_api(request):
     """API endpoint to get future predictions"""
-    days = request.GET.get('days', 7)
+    # Rows are serialized once per forecast; days is capped at CURRENT_FORECAST['MAX_DAYS']
+    return HttpResponse(current_forecast_payload(_days_param(request)), content_type='application/json')
+
+
+@cache_api_response('RatePrediction')
+async def prediction_api_async(request):
+    """Async version of prediction_api"""
+    return HttpResponse(await acurrent_forecast_payload(_days_param(request)), content_type='application/json')
+
+
+def _date_param(request, name):
+    """Parse an optional YYYY-MM-DD query parameter (raises ValueError if malformed)"""
+    value = request.GET.get(name)
+    return datetime.date.fromisoformat(value) if value else None
+
+
+def _start_of_day(date):
+    """Aware datetime at midnight of a date in the current time zone"""
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+def _serialize_rate(row):
+    return {
+        'id': row['id'],
+        'date': row['date'].isoformat(),
+        'official_rate': float(row['official_rate']),
+        'parallel_rate': float(row['parallel_rate']) if row['parallel_rate'] else None,
+    }
+
+
+def _serialize_post(row):
+    return {
+        'id': row['id'],
+        'published_at': row['published_at'].isoformat(),
+        'source_type': row['source_type'],
+        'source': row['social_source__name'] or row['news_source__name'],
+        'url': row['url'],
+        'content': row['content'],
+        'sentiment': row['sentiment'],
+        'sentiment_score': row['sentiment_score'],
+        'impact_score': row['impact_score'],
+    }
+
+
+def _history_response(request, queryset, key, serialize, export_name):
+    """Page through a values() queryset by (key, id) cursor, or stream all of it as NDJSON"""
+    descending = request.GET.get('order') == 'desc'
+    
+    if request.GET.get('format') == 'ndjson':
+        prefix = '-' if descending else ''
+        return ndjson_response(queryset.order_by(f'{prefix}{key}', f'{prefix}id'), serialize, export_name)
+    
     try:
-        days = int(days)
+        rows, next_cursor = keyset_page(
+            queryset, key, request.GET.get('cursor'), parse_limit(request.GET.get('limit')), descending
+        )
+    except InvalidCursor as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    
+    return JsonResponse({
+        'status': 'success',
+        'data': [serialize(row) for row in rows],
+        'next_cursor': next_cursor
+    })
+
+
+def rates_api(request):
+    """API endpoint to page through or export the exchange rate history"""
+    try:
+        start, end = _date_param(request, 'start'), _date_param(request, 'end')
     except ValueError:
-        days = 7
-        
-    predictions = RatePrediction.objects.filter(
-        target_date__gte=timezone.now().date()
-    ).order_by('target_date')[:days]
+        return JsonResponse({'status': 'error', 'message': 'Dates must be YYYY-MM-DD'}, status=400)
     
-    data = []
-    for pred in predictions:
-        data.append({
-            'prediction_date': pred.prediction_date.isoformat(),
-            'target_date': pred.target_date.isoformat(),
-            'predicted_official_rate': float(pred.predicted_official_rate),
-            'predicted_parallel_rate': float(pred.predicted_parallel_rate) if pred.predicted_parallel_rate else None,
-            'confidence_score': pred.confidence_score
-        })
+    rates = ExchangeRate.objects.values('id', 'date', 'official_rate', 'parallel_rate')
+    if start:
+        rates = rates.filter(date__gte=start)
+    if end:
+        rates = rates.filter(date__lte=end)
     
-    return JsonResponse({'status': 'success', 'data': data})
+    return _history_response(request, rates, 'date', _serialize_rate, 'exchange_rates.ndjson')
+
+
+def posts_api(request):
+    """API endpoint to page through or export collected posts"""
+    try:
+        start, end = _date_param(request, 'start'), _date_param(request, 'end')
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Dates must be YYYY-MM-DD'}, status=400)
+    
+    posts = Post.objects.values(
+        'id', 'published_at', 'source_type', 'social_source__name', 'news_source__name', 'url',
+        'content', 'sentiment', 'sentiment_score', 'impact_score'
+    )
+    # Whole days as datetime bounds, so the (published_at, id) index is used
+    if start:
+        posts = posts.filter(published_at__gte=_start_of_day(start))
+    if end:
+        posts = posts.filter(published_at__lt=_start_of_day(end + datetime.timedelta(days=1)))
+    source_type = request.GET.get('source_type')
+    if source_type:
+        posts = posts.filter(source_type=source_type)
+    
+    return _history_response(request, posts, 'published_at', _serialize_post, 'posts.ndjson')
+
+
+def export_api(request, dataset):
+    """API endpoint to download a whole history table as gzip CSV, Parquet or Arrow IPC"""
+    if dataset not in EXPORT_DATASETS:
+        return JsonResponse({'status': 'error', 'message': f'Unknown dataset: {dataset}'}, status=404)
+    
+    try:
+        return export_response(request, dataset, request.GET.get('format', 'csv'))
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+
+@cache_api_response('ExchangeRate', 'FeatureStore')
+def chart_rates_api(request):
+    """API endpoint to get the rate history downsampled to a number of chart points"""
+    try:
+        start, end = _date_param(request, 'start'), _date_param(request, 'end')
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Dates must be YYYY-MM-DD'}, status=400)
+    points = parse_points(request.GET.get('points'))
+    
+    return HttpResponse(rate_chart_payload(start, end, points), content_type='application/json')
+
+
+def backtest_api(request):
+    """API endpoint to get prediction accuracy against realized rates"""
+    from rate_predictor.prediction.backtest import get_backtest_report
+    
+    report = get_backtest_report()
+    
+    model_version = request.GET.get('model_version')
+    if model_version:
+        report = dict(report)
+        report['by_model_version'] = [
+            row for row in report['by_model_version'] if row['model_version'] == model_version
+        ]
+        report['by_model_version_horizon'] = [
+            row for row in report['by_model_version_horizon'] if row['model_version'] == model_version
+        ]
+    
+    return JsonResponse({'status': 'success', 'data': report})
 
 
 def task_progress_api(request):
     """API endpoint to get task progress"""
-    from .models import TaskProgress
-    
-    # Get the latest task
-    latest_task = TaskProgress.objects.first()
+    # The latest task's state, as last published by update_progress
+    event = get_latest_progress()
     
-    if latest_task:
-        data = {
-            'task_id': latest_task.task_id,
-            'task_type': latest_task.task_type,
-            'status': latest_task.status,
-            'progress': latest_task.progress,
-            'message': latest_task.message,
-            'updated_at': latest_task.updated_at.isoformat()
-        }
-        return JsonResponse({'status': 'success', 'data': data})
+    return _task_progress_response(event)
+
+
+async def task_progress_api_async(request):
+    """Async version of task_progress_api"""
+    return _task_progress_response(await aget_latest_progress())
+
+
+def _task_progress_response(event):
+    if event:
+        return JsonResponse({'status': 'success', 'data': event['data']})
     return JsonResponse({'status': 'error', 'message': 'No tasks found'}, status=404)
+
+
+def _sse_message(event):
+    """Format a progress event as a Server-Sent Events message"""
+    data = DjangoJSONEncoder().encode(event['data'])
+    return f"id: {event['id']}\nevent: progress\ndata: {data}\n\n"
+
+
+async def task_progress_stream(request):
+    """Server-Sent Events stream of task progress, pushed from the shared broadcaster"""
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI an open stream would hold a worker: send the current state
+        # and let the browser reconnect, which makes it poll every 2 seconds
+        # while a task is pending or running and only every IDLE_RETRY otherwise
+        latest = await aget_latest_progress()
+        active = latest is not None and latest['data']['status'] in ('pending', 'running')
+        retry = 2000 if active else get_progress_config()['IDLE_RETRY'] * 1000
+        body = f'retry: {retry}\n\n' + (_sse_message(latest) if latest else '')
+        return HttpResponse(body, content_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
+    
+    async def stream():
+        # Subscribed before reading the latest event, so nothing published in between is missed
+        subscription = broadcaster.subscribe()
+        try:
+            yield 'retry: 5000\n\n'
+            last_id = 0
+            latest = await aget_latest_progress()
+            if latest:
+                last_id = latest['id']
+                yield _sse_message(latest)
+            
+            async for event in subscription:
+                if event is None:
+                    yield ': keep-alive\n\n'
+                elif event['id'] > last_id:
+                    last_id = event['id']
+                    yield _sse_message(event)
+        finally:
+            subscription.close()
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+    return response